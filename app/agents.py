@@ -1,12 +1,47 @@
-from groq import Groq
+import asyncio
+
+from groq import AsyncGroq, Groq
+from app.client_registry import async_groq_client, groq_client
+from app.context_builder import ContextBuilder
 from app.embedding_service import EmbeddingService
 from app.vector_store import VectorStore
 
 class RAGAgent:
-    def __init__(self, groq_api_key, embedding_service: EmbeddingService, vector_store: VectorStore):
-        self.groq_client = Groq(api_key=groq_api_key)
+    def __init__(self, groq_api_key, embedding_service: EmbeddingService, vector_store: VectorStore,
+                 model="llama3-8b-8192", context_builder=None):
+        self.groq_api_key = groq_api_key
         self.embedding_service = embedding_service
         self.vector_store = vector_store
+        self.model = model
+        self.context_builder = context_builder or ContextBuilder()
+
+    @property
+    def groq_client(self):
+        """The Groq client shared by every agent with this API key."""
+        return groq_client(Groq, self.groq_api_key)
+
+    @property
+    def async_groq_client(self):
+        """The async Groq client shared by every agent with this API key on the running event loop."""
+        return async_groq_client(AsyncGroq, self.groq_api_key)
+
+    def build_context(self, search_results):
+        """
+        Deduplicates the retrieved chunks and packs the best ones into the context token budget.
+        """
+        return self.context_builder.build((result.payload["text"], result.score) for result in search_results).text
+
+    def _messages(self, question, context):
+        return [
+            {
+                "role": "system",
+                "content": f"You are a helpful assistant. Use the following context to answer the question:\n\n{context}",
+            },
+            {
+                "role": "user",
+                "content": question,
+            },
+        ]
 
     def answer(self, question):
         """
@@ -17,20 +52,45 @@ class RAGAgent:
 
         # 2. Search for relevant context in the vector store
         search_results = self.vector_store.search(question_embedding)
-        context = " ".join([result.payload["text"] for result in search_results])
+        context = self.build_context(search_results)
 
         # 3. Generate an answer using Groq API
         chat_completion = self.groq_client.chat.completions.create(
-            messages=[
-                {
-                    "role": "system",
-                    "content": f"You are a helpful assistant. Use the following context to answer the question:\n\n{context}",
-                },
-                {
-                    "role": "user",
-                    "content": question,
-                },
-            ],
-            model="llama3-8b-8192",
+            messages=self._messages(question, context),
+            model=self.model,
         )
         return chat_completion.choices[0].message.content
+
+    async def aanswer(self, question):
+        """
+        Async version of `answer`. Embedding and search run in worker threads and the
+        completion is awaited on the async Groq client, so the event loop is never blocked.
+        """
+        question_embedding = await self.embedding_service.acreate_embeddings([question])
+        search_results = await asyncio.to_thread(self.vector_store.search, question_embedding[0])
+        context = self.build_context(search_results)
+        return await self.agenerate(question, context)
+
+    async def agenerate(self, question, context):
+        """
+        Generates an answer to `question` from an already retrieved `context`.
+        """
+        chat_completion = await self.async_groq_client.chat.completions.create(
+            messages=self._messages(question, context),
+            model=self.model,
+        )
+        return chat_completion.choices[0].message.content
+
+    async def astream(self, question, context):
+        """
+        Streams the answer to `question` token by token as the completion is generated.
+        """
+        stream = await self.async_groq_client.chat.completions.create(
+            messages=self._messages(question, context),
+            model=self.model,
+            stream=True,
+        )
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
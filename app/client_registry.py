@@ -0,0 +1,160 @@
+import asyncio
+import inspect
+import os
+import random
+import threading
+import time
+import weakref
+
+import httpx
+
+# Connection pool limits for the HTTP clients handed out here.
+MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", 100))
+MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20))
+KEEPALIVE_EXPIRY = float(os.environ.get("HTTP_KEEPALIVE_SECONDS", 60))
+
+
+def http_limits():
+    return httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=KEEPALIVE_EXPIRY)
+
+
+class ClientRegistry:
+    """
+    Hands out one shared client per key, created on first use.
+
+    API clients hold a pool of keep-alive connections, so sharing one client
+    between all agents and worker threads means the TCP and TLS handshakes are
+    paid once per connection instead of once per agent. Async clients are bound
+    to the event loop they are first used on, so `get_async` keeps one per loop;
+    await `aclose` before a loop ends to close its clients.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._async_clients = weakref.WeakKeyDictionary()
+
+    def get(self, key, create):
+        """The client registered under `key`, calling `create()` to make it the first time."""
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = create()
+            return client
+
+    def get_async(self, key, create):
+        """Like `get`, with one client per running event loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self.get(("async", key), create)
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None:
+                client = clients[key] = create()
+            return client
+
+    def close(self):
+        """Closes and forgets the synchronous clients."""
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            close = getattr(client, "close", None)
+            if callable(close):
+                close()
+
+    async def aclose(self):
+        """Closes and forgets the async clients of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_clients.pop(loop, {})
+        for client in clients.values():
+            close = getattr(client, "aclose", None) or getattr(client, "close", None)
+            if callable(close):
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+
+
+REGISTRY = ClientRegistry()
+
+
+def env_seconds(name, default=None):
+    """A duration in seconds from the environment variable `name`, or `default` if it is unset."""
+    value = os.environ.get(name)
+    if not value:
+        return default
+    try:
+        seconds = float(value)
+    except ValueError:
+        seconds = -1.0
+    if not seconds > 0:
+        raise ValueError(f"{name} must be a positive number of seconds, got {value!r}.")
+    return seconds
+
+
+def groq_client(factory, api_key, timeout=None, max_retries=None):
+    """
+    A shared Groq client from `factory` (groq.Groq) with a pooled keep-alive HTTP
+    client. Failed requests are retried by the Groq client, with exponential
+    backoff, up to `max_retries` times.
+    """
+    timeout = timeout if timeout is not None else env_seconds("GROQ_TIMEOUT_SECONDS", 60.0)
+    max_retries = max_retries if max_retries is not None else int(os.environ.get("GROQ_MAX_RETRIES", 2))
+    return REGISTRY.get(
+        (factory, api_key, timeout, max_retries),
+        lambda: factory(api_key=api_key, timeout=timeout, max_retries=max_retries,
+                        http_client=httpx.Client(limits=http_limits(), timeout=timeout)),
+    )
+
+
+def async_groq_client(factory, api_key, timeout=None, max_retries=None):
+    """Async version of `groq_client` (groq.AsyncGroq), one per event loop."""
+    timeout = timeout if timeout is not None else env_seconds("GROQ_TIMEOUT_SECONDS", 60.0)
+    max_retries = max_retries if max_retries is not None else int(os.environ.get("GROQ_MAX_RETRIES", 2))
+    return REGISTRY.get_async(
+        (factory, api_key, timeout, max_retries),
+        lambda: factory(api_key=api_key, timeout=timeout, max_retries=max_retries,
+                        http_client=httpx.AsyncClient(limits=http_limits(), timeout=timeout)),
+    )
+
+
+def qdrant_client(factory, url, api_key, **options):
+    """
+    A shared Qdrant client from `factory` (qdrant_client.QdrantClient). `options`
+    are passed on to it; QDRANT_PREFER_GRPC, QDRANT_GRPC_PORT and
+    QDRANT_TIMEOUT_SECONDS add gRPC and timeout options, and HTTP_MAX_CONNECTIONS
+    the pool limits, when they are set.
+    """
+    if os.environ.get("QDRANT_PREFER_GRPC", "").lower() in ("1", "true", "yes"):
+        options.setdefault("prefer_grpc", True)
+        if os.environ.get("QDRANT_GRPC_PORT"):
+            options.setdefault("grpc_port", int(os.environ["QDRANT_GRPC_PORT"]))
+    timeout = env_seconds("QDRANT_TIMEOUT_SECONDS")
+    if timeout is not None:
+        options.setdefault("timeout", timeout)
+    if os.environ.get("HTTP_MAX_CONNECTIONS") and not options.get("prefer_grpc"):
+        options.setdefault("limits", http_limits())
+    key = (factory, url, api_key, tuple(sorted((name, repr(value)) for name, value in options.items())))
+    return REGISTRY.get(key, lambda: factory(url=url, api_key=api_key, **options))
+
+
+# Errors worth retrying: the request may not have reached the server, or it was overloaded.
+TRANSIENT_ERRORS = (httpx.TransportError, ConnectionError, TimeoutError)
+
+
+def retry(func, *args, attempts=3, backoff=0.1, max_backoff=2.0, retry_on=TRANSIENT_ERRORS, **kwargs):
+    """
+    Calls `func(*args, **kwargs)`, retrying up to `attempts` times in all on
+    `retry_on` errors. Waits grow exponentially from `backoff` seconds, up to
+    `max_backoff`, with full jitter so concurrent callers do not retry in step.
+    """
+    for attempt in range(attempts):
+        try:
+            return func(*args, **kwargs)
+        except retry_on:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(random.uniform(0, min(max_backoff, backoff * 2 ** attempt)))
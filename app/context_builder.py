@@ -0,0 +1,127 @@
+import re
+from typing import NamedTuple
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+_WORD = re.compile(r"\w+")
+
+
+def estimate_tokens(text):
+    """
+    A fast local estimate of the number of LLM tokens in `text`.
+
+    Counts words and punctuation marks, or a quarter of the characters when that
+    is larger (long words split into several sub-word tokens).
+    """
+    return max(len(_TOKEN.findall(text)), (len(text) + 3) // 4)
+
+
+def _shingles(text, size=3):
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {tuple(words)}
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _suffix_prefix_overlap(left, right, min_overlap):
+    """Length of the longest suffix of `left` that is a prefix of `right`, if at least `min_overlap`."""
+    if min(len(left), len(right)) < min_overlap:
+        return 0
+    probe = right[:min_overlap]
+    start = left.find(probe, max(0, len(left) - len(right)))
+    while start != -1:
+        if right.startswith(left[start:]):
+            return len(left) - start
+        start = left.find(probe, start + 1)
+    return 0
+
+
+class Context(NamedTuple):
+    text: str
+    chunks: list
+    tokens: int
+    input_tokens: int
+
+
+class ContextBuilder:
+    """
+    Assembles the LLM context from scored search results.
+
+    Chunks are taken in decreasing score order. A chunk is dropped when it is
+    contained in, or a near-duplicate of (word 3-gram Jaccard similarity of at
+    least `similarity_threshold`), a chunk already kept. When a chunk overlaps a
+    kept chunk by at least `min_overlap` characters, as neighbouring chunks from
+    DocumentProcessor do, only its new text is kept. The result is packed greedily into
+    `max_tokens` estimated tokens; if even the best chunk does not fit, it is
+    truncated.
+    """
+
+    def __init__(self, max_tokens=2000, similarity_threshold=0.8, min_overlap=30, separator="\n\n"):
+        self.max_tokens = max_tokens
+        self.similarity_threshold = similarity_threshold
+        self.min_overlap = min_overlap
+        self.separator = separator
+
+    def build(self, chunks):
+        """
+        Builds the context from `chunks`, an iterable of (text, score) pairs.
+        Returns a Context with the text, the kept (text, score) chunks and their
+        estimated token count before and after assembly.
+        """
+        chunks = [(text, float(score)) for text, score in chunks if text]
+        input_tokens = sum(estimate_tokens(text) for text, _ in chunks)
+        kept = self.deduplicate(chunks)
+
+        packed, tokens = [], 0
+        separator_tokens = estimate_tokens(self.separator) if self.separator.strip() else 0
+        for text, score in kept:
+            cost = estimate_tokens(text) + (separator_tokens if packed else 0)
+            if tokens + cost <= self.max_tokens:
+                packed.append((text, score))
+                tokens += cost
+        if not packed and kept:
+            text = self._truncate(kept[0][0], self.max_tokens)
+            packed, tokens = [(text, kept[0][1])], estimate_tokens(text)
+
+        return Context(self.separator.join(text for text, _ in packed), packed, tokens, input_tokens)
+
+    def deduplicate(self, chunks):
+        """
+        Drops duplicate and contained chunks and trims the parts of a chunk that
+        overlap a better-scored one, best score first.
+        """
+        kept, shingles = [], []
+        for text, score in sorted(chunks, key=lambda chunk: -chunk[1]):
+            candidate = _shingles(text)
+            for i, kept_text in enumerate(kept_text for kept_text, _ in kept):
+                if text in kept_text:
+                    break
+                if kept_text in text:
+                    kept[i], shingles[i] = (text, kept[i][1]), candidate
+                    break
+                union = len(candidate | shingles[i])
+                if union and len(candidate & shingles[i]) / union >= self.similarity_threshold:
+                    break
+                # Keep only what this chunk adds to a neighbouring chunk that is already kept.
+                head = _suffix_prefix_overlap(kept_text, text, self.min_overlap)
+                tail = _suffix_prefix_overlap(text, kept_text, self.min_overlap)
+                if head or tail:
+                    text = text[head:len(text) - tail].strip()
+                    if not text:
+                        break
+                    candidate = _shingles(text)
+            else:
+                kept.append((text, score))
+                shingles.append(candidate)
+        return kept
+
+    @staticmethod
+    def _truncate(text, max_tokens):
+        """Longest prefix of `text` within `max_tokens`, found by bisection on its length."""
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if estimate_tokens(text[:middle]) <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        return text[:low].rstrip()
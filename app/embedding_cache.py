@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+KEY_SIZE = 16
+
+
+def normalize_text(text):
+    """
+    Normalizes text for cache lookups: NFC unicode form and collapsed whitespace.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingCache:
+    """
+    A content-addressed cache for embeddings.
+
+    Entries are keyed by a hash of (model_name, normalized text). The memory tier
+    is an LRU bounded by `max_bytes` of vector data. When `path` is given, every
+    entry is also appended to an on-disk tier in that directory: a file of 16-byte
+    keys and a memory-mapped float32 matrix whose rows line up with the keys. The
+    disk tier survives restarts; entries evicted from memory are served from it.
+
+    All vectors share one dimension. Storing a vector of another size, as after
+    switching to an encoder with a different dim, drops every cached entry
+    (including the disk tier) and starts over at the new size.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, path=None):
+        self.max_bytes = max_bytes
+        self.path = path
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        self.dim = None
+        self._disk_rows = {}
+        self._disk_vectors = None
+        self._keys_file = None
+        self._vectors_file = None
+        if path is not None:
+            self._open_disk_tier(path)
+
+    @staticmethod
+    def key(model_name, text):
+        """
+        Returns the cache key for `text` embedded by `model_name`.
+        """
+        digest = hashlib.blake2b(digest_size=KEY_SIZE)
+        digest.update(model_name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(normalize_text(text).encode("utf-8"))
+        return digest.digest()
+
+    def get(self, key):
+        """
+        Returns the cached vector for `key`, or None on a miss.
+        """
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.stats["hits"] += 1
+                return vector
+
+            row = self._disk_rows.get(key)
+            if row is not None:
+                vector = np.array(self._disk_matrix(row)[row])
+                self._remember(key, vector)
+                self.stats["disk_hits"] += 1
+                return vector
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key, vector):
+        """
+        Stores `vector` under `key` in memory and, if enabled, on disk.
+        A vector of a different size than the cached ones invalidates the cache.
+        """
+        # Copy, so the cache never holds a view into a caller's matrix.
+        vector = np.array(vector, dtype=np.float32)
+        with self._lock:
+            if self.dim is not None and vector.shape[0] != self.dim:
+                self._invalidate()
+            if self.dim is None:
+                self._set_dim(vector.shape[0])
+
+            self._remember(key, vector)
+            if self._keys_file is not None and key not in self._disk_rows:
+                self._vectors_file.write(vector.tobytes())
+                self._vectors_file.flush()
+                self._keys_file.write(key)
+                self._keys_file.flush()
+                self._disk_rows[key] = len(self._disk_rows)
+
+    def info(self):
+        """
+        Returns the counters together with the current size of each tier.
+        """
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["disk_hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_rate": (lookups - self.stats["misses"]) / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk_rows),
+            }
+
+    def close(self):
+        """
+        Closes the files of the disk tier.
+        """
+        with self._lock:
+            for f in (self._keys_file, self._vectors_file):
+                if f is not None:
+                    f.close()
+            self._keys_file = self._vectors_file = None
+            self._disk_vectors = None
+
+    def _remember(self, key, vector):
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous.nbytes
+        if vector.nbytes > self.max_bytes:
+            return
+        self._memory[key] = vector
+        self._memory_bytes += vector.nbytes
+        while self._memory_bytes > self.max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.nbytes
+            self.stats["evictions"] += 1
+
+    def _open_disk_tier(self, path):
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, "meta.json")
+        keys_path = os.path.join(path, "keys.bin")
+        vectors_path = os.path.join(path, "vectors.f32")
+
+        mode = "wb"
+        if os.path.exists(meta_path):
+            mode = "ab"
+            with open(meta_path) as f:
+                self.dim = json.load(f)["dim"]
+            with open(keys_path, "rb") as f:
+                keys = f.read()
+            # A crash between the two appends can leave one file longer than the other;
+            # only rows present in both are valid.
+            rows = min(len(keys) // KEY_SIZE, os.path.getsize(vectors_path) // (self.dim * 4))
+            self._disk_rows = {keys[i * KEY_SIZE:(i + 1) * KEY_SIZE]: i for i in range(rows)}
+            for file_path, size in ((keys_path, rows * KEY_SIZE), (vectors_path, rows * self.dim * 4)):
+                with open(file_path, "r+b") as f:
+                    f.truncate(size)
+
+        self._keys_file = open(keys_path, mode)
+        self._vectors_file = open(vectors_path, mode)
+
+    def _invalidate(self):
+        self._memory.clear()
+        self._memory_bytes = 0
+        self._disk_rows = {}
+        self._disk_vectors = None
+        if self._keys_file is not None:
+            for f in (self._keys_file, self._vectors_file):
+                f.truncate(0)
+        self.dim = None
+
+    def _set_dim(self, dim):
+        self.dim = dim
+        if self.path is not None:
+            with open(os.path.join(self.path, "meta.json"), "w") as f:
+                json.dump({"dim": dim}, f)
+
+    def _disk_matrix(self, row):
+        # Remap only when a row beyond the current mapping is requested.
+        if self._disk_vectors is None or row >= self._disk_vectors.shape[0]:
+            self._disk_vectors = np.memmap(
+                os.path.join(self.path, "vectors.f32"),
+                dtype=np.float32,
+                mode="r",
+                shape=(len(self._disk_rows), self.dim),
+            )
+        return self._disk_vectors
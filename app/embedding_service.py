@@ -1,13 +1,80 @@
+import asyncio
+
 import numpy as np
 
+from app.encoders import HashingEncoder
+
 class EmbeddingService:
-    def __init__(self, model_name="all-MiniLM-L6-v2"):
+    def __init__(self, model_name="all-MiniLM-L6-v2", encoder=None, batch_size=64, cache=None):
+        """
+        `encoder` is any object with a `dim` attribute and an `encode(texts)` method
+        returning a (len(texts), dim) float32 matrix, e.g. a SentenceTransformerEncoder.
+        Defaults to the offline HashingEncoder.
+
+        `cache` is an optional EmbeddingCache; texts found in it are not re-encoded.
+        Its keys name the encoder actually used (its `name`, or its class) and `dim`.
+        """
         self.model_name = model_name
+        self.encoder = encoder or HashingEncoder()
+        self.dim = self.encoder.dim
+        self.cache_namespace = f"{getattr(self.encoder, 'name', type(self.encoder).__qualname__)}/{self.dim}"
+        self.batch_size = batch_size
+        self.cache = cache
 
     def create_embedding(self, text):
         """
-        Creates an embedding for the given text.
-        In a real application, this would use a sentence-transformer model.
-        For this example, we'll return a fixed-size random vector.
+        Creates an embedding for the given text and returns it as a list of floats.
+        """
+        return self.create_embeddings([text])[0].tolist()
+
+    def create_embeddings(self, texts, batch_size=None):
+        """
+        Creates embeddings for many texts at once.
+
+        Texts are sorted by length before being split into batches, so each batch
+        holds texts of similar length and padding in the encoder is minimal. The
+        result rows are in the same order as `texts`.
+
+        Returns a C-contiguous float32 matrix of shape (len(texts), dim).
+        """
+        texts = list(texts)
+        embeddings = np.empty((len(texts), self.dim), dtype=np.float32)
+        if self.cache is None:
+            self._encode_into(embeddings, texts, range(len(texts)), batch_size)
+            return embeddings
+
+        # Encode each distinct missing key once and fill every row that shares it.
+        missing = {}
+        keys = [self.cache.key(self.cache_namespace, text) for text in texts]
+        for i, key in enumerate(keys):
+            if key in missing:
+                missing[key].append(i)
+                continue
+            vector = self.cache.get(key)
+            if vector is None:
+                missing[key] = [i]
+            else:
+                embeddings[i] = vector
+
+        if missing:
+            firsts = [rows[0] for rows in missing.values()]
+            self._encode_into(embeddings, texts, firsts, batch_size)
+            for key, rows in missing.items():
+                self.cache.put(key, embeddings[rows[0]])
+                embeddings[rows[1:]] = embeddings[rows[0]]
+        return embeddings
+
+    async def acreate_embeddings(self, texts, batch_size=None):
         """
-        return np.random.rand(384).tolist()
+        Async version of `create_embeddings`. Encoding is CPU-bound, so it runs in a
+        worker thread instead of blocking the event loop.
+        """
+        return await asyncio.to_thread(self.create_embeddings, list(texts), batch_size)
+
+    def _encode_into(self, embeddings, texts, indices, batch_size=None):
+        batch_size = batch_size or self.batch_size
+        indices = np.asarray(indices, dtype=np.intp)
+        order = indices[np.argsort([len(texts[i]) for i in indices], kind="stable")]
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            embeddings[batch] = self.encoder.encode([texts[i] for i in batch])
@@ -0,0 +1,75 @@
+import re
+import zlib
+
+import numpy as np
+
+_TOKEN = re.compile(r"\w+")
+
+
+class HashingEncoder:
+    """
+    A dependency-free encoder that runs fully offline.
+
+    Word unigrams and bigrams are hashed into a fixed number of signed buckets and
+    the result is L2-normalized, so texts sharing vocabulary get a high cosine
+    similarity. Encoding is deterministic across processes and restarts.
+    """
+
+    def __init__(self, dim=384):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text):
+        tokens = _TOKEN.findall(text.lower())
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def encode(self, texts):
+        """
+        Encodes a batch of texts into a (len(texts), dim) float32 matrix.
+        """
+        rows, hashes = [], []
+        for row, text in enumerate(texts):
+            features = self._features(text)
+            rows.extend([row] * len(features))
+            hashes.extend(zlib.crc32(f.encode("utf-8")) for f in features)
+
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if hashes:
+            hashes = np.asarray(hashes, dtype=np.uint32)
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(matrix, (np.asarray(rows), hashes % self.dim), signs)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+
+class SentenceTransformerEncoder:
+    """
+    Wraps a locally available sentence-transformers model.
+
+    Requires the optional `sentence-transformers` package. Pass a local path or a
+    model already in the Hugging Face cache to run offline.
+    """
+
+    def __init__(self, model_name="all-MiniLM-L6-v2", device=None):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "SentenceTransformerEncoder requires the 'sentence-transformers' package."
+            ) from e
+
+        self.model = SentenceTransformer(model_name, device=device)
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = model_name
+
+    def encode(self, texts):
+        """
+        Encodes a batch of texts into a (len(texts), dim) float32 matrix.
+        """
+        return self.model.encode(
+            list(texts),
+            batch_size=max(len(texts), 1),
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        ).astype(np.float32, copy=False)
@@ -0,0 +1,136 @@
+import numpy as np
+
+
+def kmeans(vectors, k, iterations=20, seed=0, spherical=True):
+    """
+    k-means clustering of the rows of `vectors`.
+
+    Spherical by default: rows are expected to be L2-normalized, points join the
+    centroid with the highest dot product and centroids are re-normalized. With
+    `spherical=False` it is plain Euclidean k-means.
+
+    Returns a (k, dim) float32 matrix of centroids. Clusters that become empty are
+    re-seeded with random points.
+    """
+    rng = np.random.default_rng(seed)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    k = min(k, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = assign(vectors, centroids, spherical=spherical)
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=k)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        nonempty = counts > 0
+        sums = np.add.reduceat(vectors[order], starts[nonempty], axis=0)
+        centroids[nonempty] = sums if spherical else sums / counts[nonempty, None]
+        empty = np.flatnonzero(~nonempty)
+        if len(empty):
+            centroids[empty] = vectors[rng.choice(len(vectors), size=len(empty), replace=False)]
+        if spherical:
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            np.divide(centroids, norms, out=centroids, where=norms > 0)
+    return centroids
+
+
+def assign(vectors, centroids, block=65536, spherical=True):
+    """
+    Returns the index of the closest centroid for every row of `vectors`: the
+    highest dot product if `spherical`, else the smallest Euclidean distance.
+    """
+    # argmin |x - c|^2 == argmax (x.c - |c|^2 / 2)
+    bias = 0 if spherical else -0.5 * np.einsum("ij,ij->i", centroids, centroids)
+    assignments = np.empty(len(vectors), dtype=np.intp)
+    for start in range(0, len(vectors), block):
+        assignments[start:start + block] = np.argmax(vectors[start:start + block] @ centroids.T + bias, axis=1)
+    return assignments
+
+
+def recall_at_k(approximate, exact):
+    """
+    Mean fraction of the exact top-k ids found in the approximate top-k, over queries.
+
+    Both arguments are sequences (one per query) of id sequences.
+    """
+    recalls = [len(set(a) & set(e)) / len(e) for a, e in zip(approximate, exact) if len(e)]
+    return float(np.mean(recalls)) if recalls else 1.0
+
+
+class IVFIndex:
+    """
+    An inverted-file index over the rows of a normalized vector matrix.
+
+    `build` clusters the rows with k-means into `n_lists` lists. A search scores the
+    query against the centroids, scans only the rows of the `nprobe` closest lists
+    and returns their exact top-k. Rows added after `build` are scanned on every
+    query until the index is rebuilt. Higher `nprobe` trades latency for recall;
+    `nprobe == n_lists` is an exact search.
+
+    The index stores row numbers only; callers pass the vector matrix to `search`.
+    """
+
+    def __init__(self, n_lists=None, nprobe=8, iterations=20, train_size=64, seed=0):
+        """
+        `n_lists` defaults to sqrt(n) at build time. k-means is trained on at most
+        `train_size` sampled rows per list.
+        """
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self.iterations = iterations
+        self.train_size = train_size
+        self.seed = seed
+        self.centroids = None
+        self.size = 0
+        self._rows = None
+        self._offsets = None
+
+    def build(self, vectors):
+        """
+        Trains the centroids and assigns every row of `vectors` to a list.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n_lists = self.n_lists or max(1, int(np.sqrt(len(vectors))))
+        n_lists = min(n_lists, len(vectors))
+        if n_lists == 0:
+            raise ValueError("Cannot build an index over an empty collection.")
+
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(len(vectors), n_lists * self.train_size)
+        sample = vectors[np.sort(rng.choice(len(vectors), size=sample_size, replace=False))]
+        self.centroids = kmeans(sample, n_lists, iterations=self.iterations, seed=self.seed)
+
+        assignments = assign(vectors, self.centroids)
+        self._rows = np.argsort(assignments, kind="stable")
+        self._offsets = np.concatenate(([0], np.cumsum(np.bincount(assignments, minlength=len(self.centroids)))))
+        self.size = len(vectors)
+        return self
+
+    def search(self, vectors, queries, limit, nprobe=None):
+        """
+        Approximate top-k for each query.
+
+        Returns one (rows, scores) pair of arrays per query, sorted by decreasing score.
+        """
+        if self.centroids is None:
+            raise RuntimeError("The index has not been built.")
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        coarse = queries @ self.centroids.T
+        if nprobe < len(self.centroids):
+            probes = np.argpartition(-coarse, nprobe - 1, axis=1)[:, :nprobe]
+        else:
+            probes = np.broadcast_to(np.arange(len(self.centroids)), coarse.shape)
+        tail = np.arange(self.size, len(vectors))
+
+        results = []
+        for query, lists in zip(queries, probes):
+            candidates = np.concatenate(
+                [self._rows[self._offsets[l]:self._offsets[l + 1]] for l in lists] + [tail]
+            )
+            scores = vectors[candidates] @ query
+            if limit < len(scores):
+                top = np.argpartition(-scores, limit - 1)[:limit]
+            else:
+                top = np.arange(len(scores))
+            top = top[np.argsort(-scores[top], kind="stable")]
+            results.append((candidates[top], scores[top]))
+        return results
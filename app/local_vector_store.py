@@ -0,0 +1,214 @@
+import threading
+from typing import NamedTuple
+
+import numpy as np
+
+from app.ivf_index import IVFIndex, recall_at_k
+from app.payload_filter import PayloadIndex
+from app.vector_store import iter_batches
+
+
+class ScoredPoint(NamedTuple):
+    """A search hit with the same attributes as qdrant's ScoredPoint."""
+    id: str
+    score: float
+    payload: dict
+
+
+def normalize_rows(matrix):
+    """
+    L2-normalizes the rows of a float32 matrix in place; zero rows stay zero.
+    """
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+class LocalVectorStore:
+    """
+    An in-process, pure-NumPy drop-in for VectorStore.
+
+    Vectors are normalized on insert and kept in one growable contiguous float32
+    array, so cosine top-k is a single matrix product followed by argpartition.
+    Suited to tests, CI and small collections that don't need a server.
+
+    Searches can be filtered on payload fields (see app.payload_filter); the
+    `indexed_fields` are kept in a PayloadIndex so that a filtered search only
+    scores the matching points.
+    """
+
+    def __init__(self, collection_name="my_collection", dim=384, batch_size=256, max_scores=1 << 26,
+                 indexed_fields=()):
+        """
+        `max_scores` bounds the size of the query-by-vector score matrix computed at
+        once; larger query batches are split into blocks.
+        """
+        self.collection_name = collection_name
+        self.dim = dim
+        self.batch_size = batch_size
+        self.max_scores = max_scores
+        self._vectors = np.empty((0, dim), dtype=np.float32)
+        self._size = 0
+        self._ids = []
+        self._payloads = []
+        self._rows = {}
+        self.index = None
+        self.payload_index = PayloadIndex(indexed_fields)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def vectors(self):
+        """
+        The normalized vectors currently stored, one row per point.
+        """
+        return self._vectors[:self._size]
+
+    def upsert(self, vectors, payloads, ids=None, batch_size=None, wait=True):
+        """
+        Upserts vectors and their payloads, accepting the same inputs as
+        VectorStore.upsert. Points with an existing id are overwritten in place.
+
+        Upserts are serialized; searches run concurrently with them and see each
+        batch once it is fully written. Returns the ids of the upserted points.
+        """
+        with self._lock:
+            if isinstance(vectors, np.ndarray):
+                # The final size is known up front; allocate once instead of doubling.
+                self._reserve(self._size, self._size + len(vectors), exact=True)
+            upserted = []
+            batches = iter_batches(vectors, payloads, ids, batch_size or self.batch_size)
+            for matrix, batch_payloads, batch_ids in batches:
+                if matrix.ndim != 2 or matrix.shape[1] != self.dim:
+                    raise ValueError(f"Expected vectors of size {self.dim}.")
+                # Validate the batch and assign its rows before changing anything, so a
+                # rejected batch leaves the store as it was.
+                size = self._size
+                rows = np.empty(len(batch_ids), dtype=np.intp)
+                added = {}
+                for i, (point_id, payload) in enumerate(zip(batch_ids, batch_payloads)):
+                    self.payload_index.check(payload)
+                    row = self._rows.get(point_id, added.get(point_id))
+                    if row is None:
+                        row = added[point_id] = size
+                        size += 1
+                    rows[i] = row
+                self._reserve(self._size, size)
+                normalized = normalize_rows(matrix.copy())
+
+                for row, point_id, payload in zip(rows.tolist(), batch_ids, batch_payloads):
+                    if row == len(self._ids):
+                        self._rows[point_id] = row
+                        self._ids.append(point_id)
+                        self._payloads.append(payload)
+                        self.payload_index.add(row, payload)
+                    else:
+                        self.payload_index.add(row, payload, previous=self._payloads[row])
+                        self._payloads[row] = payload
+                self._vectors[rows] = normalized
+                # Publish new rows only once their vectors are written, so concurrent
+                # searches never read uninitialized rows.
+                self._size = size
+                upserted.extend(batch_ids)
+            return upserted
+
+    def save(self, path, quantization=None):
+        """
+        Writes the collection to a memory-mapped segment; open it with app.segment.Segment.
+        `quantization` ("int8" or "pq") also stores compact codes to search with.
+        """
+        from app.segment import write_segment  # app.segment imports this module
+
+        write_segment(path, self.vectors, self._ids, self._payloads, quantization=quantization,
+                      indexed_fields=self.payload_index.fields)
+
+    def build_index(self, n_lists=None, nprobe=8, **kwargs):
+        """
+        Builds an approximate IVF index over the current vectors; later searches
+        scan only `nprobe` of the `n_lists` clusters. Points upserted afterwards are
+        still found (they are scanned exactly) until the index is rebuilt.
+        """
+        self.index = IVFIndex(n_lists=n_lists, nprobe=nprobe, **kwargs).build(self.vectors)
+        return self.index
+
+    def search(self, query_vector, limit=5, filters=None):
+        """
+        Searches for similar vectors in the collection.
+        """
+        return self.search_many([query_vector], limit=limit, filters=filters)[0]
+
+    def search_many(self, query_matrix, limit=5, filters=None, nprobe=None, exact=False):
+        """
+        Searches for many query vectors at once.
+
+        Uses the IVF index when one has been built, unless `exact` is set; `nprobe`
+        overrides the index default. `filters` is a payload filter spec (see
+        app.payload_filter); filtered searches score only the matching points,
+        exactly. Returns one list of ScoredPoint per query, in input order, each
+        sorted by decreasing cosine similarity.
+        """
+        queries = normalize_rows(np.array(query_matrix, dtype=np.float32, ndmin=2))
+        if self._size == 0 or limit <= 0:
+            return [[] for _ in range(len(queries))]
+
+        if filters is not None:
+            size = self._size
+            with self._lock:
+                rows = self.payload_index.select(filters, size, self._payloads.__getitem__)
+            rows = rows[rows < size]
+            vectors = self._vectors[rows]
+            results = []
+            block = max(1, self.max_scores // max(1, len(rows)))
+            for start in range(0, len(queries), block):
+                scores = queries[start:start + block] @ vectors.T
+                for row_scores in scores:
+                    top = self._top_rows(row_scores, limit)
+                    results.append(self._points(rows[top], row_scores[top]))
+            return results
+
+        if self.index is not None and not exact:
+            return [self._points(rows, scores) for rows, scores in
+                    self.index.search(self.vectors, queries, limit, nprobe=nprobe)]
+
+        results = []
+        block = max(1, self.max_scores // self._size)
+        for start in range(0, len(queries), block):
+            scores = queries[start:start + block] @ self.vectors.T
+            for row_scores in scores:
+                results.append(self._top_k(row_scores, limit))
+        return results
+
+    def measure_recall(self, query_matrix, limit=10, nprobe=None):
+        """
+        Returns the mean recall@limit of the index against exact search.
+        """
+        approximate = self.search_many(query_matrix, limit=limit, nprobe=nprobe)
+        exact = self.search_many(query_matrix, limit=limit, exact=True)
+        return recall_at_k([[p.id for p in hits] for hits in approximate],
+                           [[p.id for p in hits] for hits in exact])
+
+    def _top_k(self, scores, limit):
+        candidates = self._top_rows(scores, limit)
+        return self._points(candidates, scores[candidates])
+
+    @staticmethod
+    def _top_rows(scores, limit):
+        """Positions of the `limit` best scores, best first."""
+        if limit < len(scores):
+            candidates = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            candidates = np.arange(len(scores))
+        return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+    def _points(self, rows, scores):
+        return [ScoredPoint(self._ids[row], float(score), self._payloads[row]) for row, score in zip(rows, scores)]
+
+    def _reserve(self, filled, size, exact=False):
+        # Grow geometrically so that appending n points costs O(n) copies overall.
+        if size > len(self._vectors):
+            capacity = size if exact else max(size, 2 * len(self._vectors), 1024)
+            grown = np.empty((capacity, self.dim), dtype=np.float32)
+            grown[:filled] = self._vectors[:filled]
+            self._vectors = grown
@@ -1,22 +1,34 @@
 import os
+from app.embedding_cache import EmbeddingCache
 from app.embedding_service import EmbeddingService
+from app.local_vector_store import LocalVectorStore
+from app.segment import Segment
 from app.vector_store import VectorStore
 from app.agents import RAGAgent
 
 def main():
     # 1. Initialize services
-    embedding_service = EmbeddingService()
-    vector_store = VectorStore()
+    # Set EMBEDDING_CACHE_PATH to keep embeddings across runs
+    cache = EmbeddingCache(path=os.environ.get("EMBEDDING_CACHE_PATH"))
+    embedding_service = EmbeddingService(cache=cache)
+    # Set VECTOR_INDEX_PATH to persist the index; later runs open it instead of re-embedding
+    index_path = os.environ.get("VECTOR_INDEX_PATH")
+    if index_path and os.path.exists(index_path):
+        vector_store = Segment(index_path)
+    else:
+        vector_store = LocalVectorStore() if index_path else VectorStore()
 
-    # 2. Add some data to the vector store
-    documents = [
-        "The sky is blue.",
-        "The grass is green.",
-        "The sun is bright.",
-    ]
-    embeddings = [embedding_service.create_embedding(doc) for doc in documents]
-    payloads = [{"text": doc} for doc in documents]
-    vector_store.upsert(embeddings, payloads)
+        # 2. Add some data to the vector store
+        documents = [
+            "The sky is blue.",
+            "The grass is green.",
+            "The sun is bright.",
+        ]
+        embeddings = embedding_service.create_embeddings(documents)
+        payloads = [{"text": doc} for doc in documents]
+        vector_store.upsert(embeddings, payloads)
+        if index_path:
+            vector_store.save(index_path)
 
     # 3. Initialize the RAG agent
     # Make sure to set the GROQ_API_KEY environment variable
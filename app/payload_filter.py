@@ -0,0 +1,188 @@
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+from qdrant_client import models
+
+RANGE_OPERATORS = ("gt", "gte", "lt", "lte")
+
+
+def _conditions(spec):
+    """
+    Normalizes a filter spec into (field, kind, argument) conditions.
+
+    A spec maps payload fields to conditions, all of which must hold: a plain
+    value or {"eq": value} means equality, {"in": [...]} set membership and a
+    dict of "gt", "gte", "lt" and "lte" bounds a range, e.g.
+    {"tenant": "acme", "source": {"in": ["a.md", "b.md"]}, "year": {"gte": 2020}}.
+    A field holding a list matches when any of its elements does.
+    """
+    conditions = []
+    for field, condition in spec.items():
+        if isinstance(condition, dict):
+            if "in" in condition:
+                conditions.append((field, "in", list(condition["in"])))
+            elif "eq" in condition:
+                conditions.append((field, "eq", condition["eq"]))
+            else:
+                unknown = set(condition) - set(RANGE_OPERATORS)
+                if unknown or not condition:
+                    raise ValueError(f"Unknown filter operators for {field!r}: {sorted(unknown) or '{}'}.")
+                conditions.append((field, "range", condition))
+        else:
+            conditions.append((field, "eq", condition))
+    return conditions
+
+
+def _values(payload, field):
+    value = payload.get(field) if isinstance(payload, dict) else None
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _in_range(value, bounds):
+    try:
+        return (("gt" not in bounds or value > bounds["gt"]) and ("gte" not in bounds or value >= bounds["gte"])
+                and ("lt" not in bounds or value < bounds["lt"]) and ("lte" not in bounds or value <= bounds["lte"]))
+    except TypeError:
+        return False
+
+
+def _holds(values, kind, argument):
+    if kind == "eq":
+        return argument in values
+    if kind == "in":
+        return any(value in argument for value in values)
+    return any(_in_range(value, argument) for value in values)
+
+
+def matches(payload, spec):
+    """Whether `payload` satisfies every condition of the filter `spec`."""
+    return all(_holds(_values(payload, field), kind, argument) for field, kind, argument in _conditions(spec))
+
+
+def qdrant_filter(spec):
+    """
+    The qdrant models.Filter for a filter spec (see `_conditions`); None and
+    models.Filter instances are returned unchanged.
+    """
+    if spec is None or isinstance(spec, models.Filter):
+        return spec
+    must = []
+    for field, kind, argument in _conditions(spec):
+        if kind == "eq":
+            must.append(models.FieldCondition(key=field, match=models.MatchValue(value=argument)))
+        elif kind == "in":
+            must.append(models.FieldCondition(key=field, match=models.MatchAny(any=argument)))
+        else:
+            must.append(models.FieldCondition(key=field, range=models.Range(**argument)))
+    return models.Filter(must=must)
+
+
+def qdrant_payload_schema(kind):
+    """qdrant's payload index type for `kind`: "keyword", "integer", "float", "bool" or "datetime"."""
+    try:
+        return models.PayloadSchemaType(kind)
+    except ValueError:
+        raise ValueError(f"Unknown payload index type: {kind}. Supported values are "
+                         f"{', '.join(repr(t.value) for t in models.PayloadSchemaType)}.") from None
+
+
+class PayloadIndex:
+    """
+    An inverted index from payload field values to rows, for the local backends.
+
+    Equality and membership conditions on an indexed field are dictionary
+    lookups and numeric ranges bisect its sorted distinct values, so a selective
+    filter yields its candidate rows without looking at the other payloads.
+    Conditions on fields that are not indexed are checked on the candidates'
+    payloads.
+    """
+
+    def __init__(self, fields=()):
+        self.fields = tuple(fields)
+        self._rows = {field: {} for field in self.fields}
+        self._sorted = {}
+
+    def check(self, payload):
+        """Raises ValueError unless every value of an indexed field in `payload` can be indexed."""
+        for field in self.fields:
+            for value in _values(payload, field):
+                try:
+                    hash(value)
+                except TypeError:
+                    raise ValueError(f"Indexed payload field {field!r} holds an unhashable value: {value!r}.") from None
+
+    def add(self, row, payload, previous=None):
+        """
+        Indexes `payload` at `row`, replacing the `previous` payload stored there.
+        A payload that fails `check` raises before the index is changed.
+        """
+        self.check(payload)
+        for field, values in self._rows.items():
+            if previous is not None:
+                for value in _values(previous, field):
+                    rows = values.get(value)
+                    if rows is not None:
+                        rows.discard(row)
+            for value in _values(payload, field):
+                rows = values.get(value)
+                if rows is None:
+                    rows = values[value] = set()
+                    self._sorted.pop(field, None)
+                rows.add(row)
+
+    def state(self):
+        """The index as JSON-serializable [field, [[value, rows], ...]] pairs."""
+        return [[field, [[value, sorted(rows)] for value, rows in values.items() if rows]]
+                for field, values in self._rows.items()]
+
+    @classmethod
+    def from_state(cls, state):
+        index = cls(field for field, _ in state)
+        for field, values in state:
+            index._rows[field] = {value: set(rows) for value, rows in values}
+        return index
+
+    def select(self, spec, size, payload):
+        """
+        The sorted rows, out of `size`, whose payload matches `spec`. `payload(row)`
+        returns a row's payload, for the conditions the index can't answer.
+        """
+        candidates, remaining = None, []
+        for field, kind, argument in _conditions(spec):
+            if field not in self._rows or (kind == "range" and not all(map(_is_number, argument.values()))):
+                remaining.append((field, kind, argument))
+                continue
+            rows = self._lookup(field, kind, argument)
+            candidates = rows if candidates is None else candidates & rows
+        rows = np.arange(size) if candidates is None else np.array(sorted(candidates), dtype=np.int64)
+        if remaining:
+            rows = np.array([row for row in rows if all(_holds(_values(payload(row), field), kind, argument)
+                                                        for field, kind, argument in remaining)], dtype=np.int64)
+        return rows
+
+    def _lookup(self, field, kind, argument):
+        values = self._rows[field]
+        if kind == "eq":
+            return set(values.get(argument, ()))
+        if kind == "in":
+            return set().union(*(values.get(value, ()) for value in argument))
+        keys = self._sorted.get(field)
+        if keys is None:
+            keys = self._sorted[field] = sorted(value for value in values if _is_number(value))
+        low = 0
+        if "gte" in argument:
+            low = bisect_left(keys, argument["gte"])
+        if "gt" in argument:
+            low = max(low, bisect_right(keys, argument["gt"]))
+        high = len(keys)
+        if "lte" in argument:
+            high = bisect_right(keys, argument["lte"])
+        if "lt" in argument:
+            high = min(high, bisect_left(keys, argument["lt"]))
+        return set().union(*(values[key] for key in keys[low:high]))
@@ -0,0 +1,155 @@
+import numpy as np
+from qdrant_client import models
+
+from app.ivf_index import kmeans
+
+
+def qdrant_quantization_config(kind, always_ram=True):
+    """
+    Returns qdrant's quantization config for `kind`: None, "int8" (4x smaller)
+    or "pq" (product quantization, 16x smaller).
+    """
+    if kind is None:
+        return None
+    if kind == "int8":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, always_ram=always_ram)
+        )
+    if kind == "pq":
+        return models.ProductQuantization(
+            product=models.ProductQuantizationConfig(compression=models.CompressionRatio.X16, always_ram=always_ram)
+        )
+    raise ValueError(f"Unknown quantization: {kind}. Supported values are 'int8' and 'pq'.")
+
+
+def qdrant_search_params(oversampling):
+    """
+    Search params that score quantized vectors, fetch `oversampling` times the limit
+    and re-score those candidates with the original vectors.
+    """
+    return models.SearchParams(
+        quantization=models.QuantizationSearchParams(rescore=True, oversampling=oversampling)
+    )
+
+
+class ScalarQuantizer:
+    """
+    int8 scalar quantization: each dimension is mapped linearly onto 0..255
+    between its minimum and maximum, cutting float32 storage by 4x.
+    """
+
+    kind = "int8"
+
+    def fit(self, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.offset = vectors.min(axis=0)
+        self.scale = (vectors.max(axis=0) - self.offset) / 255
+        self.scale[self.scale == 0] = 1
+        return self
+
+    def encode(self, vectors):
+        codes = np.rint((np.asarray(vectors, dtype=np.float32) - self.offset) / self.scale)
+        return np.clip(codes, 0, 255).astype(np.uint8)
+
+    def decode(self, codes):
+        return codes.astype(np.float32) * self.scale + self.offset
+
+    def scores(self, codes, queries):
+        """
+        Approximate dot products between `queries` (q, dim) and the encoded rows,
+        without decoding them: q.x ~= (q * scale).code + q.offset.
+        """
+        return (queries * self.scale) @ codes.T.astype(np.float32) + (queries @ self.offset)[:, None]
+
+    def state(self):
+        return {"offset": self.offset, "scale": self.scale}
+
+    @classmethod
+    def from_state(cls, state):
+        quantizer = cls()
+        quantizer.offset, quantizer.scale = state["offset"], state["scale"]
+        return quantizer
+
+
+class ProductQuantizer:
+    """
+    Product quantization: vectors are split into `m` sub-vectors and each is
+    replaced by the id of its nearest of 256 k-means centroids, so a vector is
+    stored in `m` bytes. The default of 4 dimensions per sub-vector cuts float32
+    storage by 16x. Scores use per-query lookup tables (asymmetric distance).
+    """
+
+    kind = "pq"
+
+    def __init__(self, m=None, iterations=20, train_size=65536, seed=0):
+        self.m = m
+        self.iterations = iterations
+        self.train_size = train_size
+        self.seed = seed
+
+    def fit(self, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        dim = vectors.shape[1]
+        self.m = self.m or max(1, dim // 4)
+        if dim % self.m:
+            raise ValueError(f"Vector size {dim} is not divisible by m={self.m}.")
+
+        rng = np.random.default_rng(self.seed)
+        if len(vectors) > self.train_size:
+            vectors = vectors[np.sort(rng.choice(len(vectors), size=self.train_size, replace=False))]
+        sub = dim // self.m
+        codebooks = np.zeros((self.m, 256, sub), dtype=np.float32)
+        for j in range(self.m):
+            centroids = kmeans(np.ascontiguousarray(vectors[:, j * sub:(j + 1) * sub]), 256,
+                               iterations=self.iterations, seed=self.seed + j, spherical=False)
+            codebooks[j, :len(centroids)] = centroids
+            # With fewer than 256 training points, pad with duplicates; argmin keeps the first.
+            codebooks[j, len(centroids):] = centroids[0]
+        self.codebooks = codebooks
+        return self
+
+    def _split(self, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        return vectors.reshape(len(vectors), self.m, -1)
+
+    def encode(self, vectors):
+        parts = self._split(vectors)
+        codes = np.empty((len(parts), self.m), dtype=np.uint8)
+        norms = np.einsum("jcd,jcd->jc", self.codebooks, self.codebooks)
+        for j in range(self.m):
+            # argmin |x - c|^2 == argmin (|c|^2 - 2 x.c)
+            codes[:, j] = np.argmin(norms[j] - 2 * parts[:, j] @ self.codebooks[j].T, axis=1)
+        return codes
+
+    def decode(self, codes):
+        return self.codebooks[np.arange(self.m), codes].reshape(len(codes), -1)
+
+    def scores(self, codes, queries):
+        """
+        Approximate dot products between `queries` (q, dim) and the encoded rows.
+        """
+        # tables[q, j, c] = queries[q, sub-vector j] . centroid c of sub-space j
+        tables = np.einsum("qjd,jcd->qjc", self._split(queries), self.codebooks)
+        subspaces = np.arange(self.m)
+        return np.stack([table[subspaces, codes].sum(axis=1) for table in tables])
+
+    def state(self):
+        return {"codebooks": self.codebooks}
+
+    @classmethod
+    def from_state(cls, state):
+        quantizer = cls(m=state["codebooks"].shape[0])
+        quantizer.codebooks = state["codebooks"]
+        return quantizer
+
+
+QUANTIZERS = {cls.kind: cls for cls in (ScalarQuantizer, ProductQuantizer)}
+
+
+def make_quantizer(kind):
+    """
+    Returns an unfitted quantizer for `kind` ("int8" or "pq").
+    """
+    if kind not in QUANTIZERS:
+        raise ValueError(f"Unknown quantization: {kind}. Supported values are {', '.join(QUANTIZERS)}.")
+    return QUANTIZERS[kind]()
@@ -0,0 +1,208 @@
+import json
+import mmap
+import os
+import shutil
+import time
+
+import numpy as np
+
+from app.local_vector_store import ScoredPoint, normalize_rows
+from app.payload_filter import PayloadIndex
+from app.quantization import QUANTIZERS, make_quantizer
+
+FORMAT_VERSION = 1
+
+
+def _write_blob(directory, name, items):
+    """Writes JSON-encoded items back to back, plus an offsets array delimiting them."""
+    offsets = np.zeros(len(items) + 1, dtype=np.int64)
+    with open(os.path.join(directory, f"{name}.bin"), "wb") as f:
+        for i, item in enumerate(items):
+            offsets[i + 1] = offsets[i] + f.write(json.dumps(item, default=str).encode("utf-8"))
+    np.save(os.path.join(directory, f"{name}_offsets.npy"), offsets)
+
+
+def write_segment(path, vectors, ids, payloads, quantization=None, indexed_fields=()):
+    """
+    Writes an immutable segment directory that `Segment` can open.
+
+    The segment holds normalized float32 vectors in `vectors.npy`, and JSON-encoded
+    ids and payloads in `ids.bin` / `payloads.bin` with int64 offset arrays. With
+    `quantization` ("int8" or "pq") it also holds the quantized codes in `codes.npy`
+    and the fitted quantizer in `quantizer.npz`, and with `indexed_fields` a
+    PayloadIndex of those fields in `payload_index.json`.
+
+    Each write goes to a new versioned directory next to `path`, and `path` is a
+    symlink to the current version, swapped atomically with os.replace, so `path`
+    always names a complete segment. The replaced version is then removed;
+    readers that already have it open keep a consistent view, and an open that
+    resolved it just before removal fails with FileNotFoundError and can be retried.
+    """
+    vectors = normalize_rows(np.array(vectors, dtype=np.float32, ndmin=2))
+    ids, payloads = list(ids), list(payloads)
+    if not len(vectors) == len(ids) == len(payloads):
+        raise ValueError("vectors, ids and payloads must have the same length.")
+
+    path = os.path.abspath(path)
+    staging = f"{path}.v{time.time_ns()}-{os.getpid()}"
+    os.makedirs(staging)
+    np.save(os.path.join(staging, "vectors.npy"), vectors)
+    _write_blob(staging, "ids", ids)
+    _write_blob(staging, "payloads", payloads)
+    if quantization is not None:
+        quantizer = make_quantizer(quantization).fit(vectors)
+        np.save(os.path.join(staging, "codes.npy"), quantizer.encode(vectors))
+        np.savez(os.path.join(staging, "quantizer.npz"), **quantizer.state())
+    if indexed_fields:
+        index = PayloadIndex(indexed_fields)
+        for row, payload in enumerate(payloads):
+            index.add(row, payload)
+        with open(os.path.join(staging, "payload_index.json"), "w") as f:
+            json.dump(index.state(), f, default=str)
+    with open(os.path.join(staging, "meta.json"), "w") as f:
+        json.dump({"version": FORMAT_VERSION, "count": len(ids), "dim": vectors.shape[1],
+                   "quantization": quantization}, f)
+
+    retired = os.path.realpath(path) if os.path.islink(path) else None
+    if os.path.isdir(path) and retired is None:
+        # A segment written before versioning: move it aside once.
+        retired = f"{path}.old-{os.getpid()}"
+        os.rename(path, retired)
+    link = f"{path}.link-{os.getpid()}"
+    os.symlink(os.path.basename(staging), link)
+    os.replace(link, path)
+    if retired is not None and os.path.isdir(retired):
+        shutil.rmtree(retired)
+
+
+class Segment:
+    """
+    A read-only vector collection searched straight from memory-mapped files.
+
+    Opening a segment only maps its files, so it takes milliseconds regardless of
+    its size, and processes that open the same segment share the page cache.
+    Vectors are scanned in blocks and ids/payloads are decoded only for hits.
+    Implements the search interface of LocalVectorStore.
+
+    In a quantized segment, searches scan the compact codes instead of the vectors
+    and only the `oversample * limit` best candidates are re-scored exactly, so the
+    full vectors are barely paged in.
+
+    Filtered searches scan only the matching rows, block by block. Conditions on the
+    fields indexed when the segment was written are answered from its payload
+    index; others decode every candidate's payload.
+    """
+
+    def __init__(self, path, block_size=65536, oversample=4):
+        # Resolve the version `path` points to once, so every file comes from it.
+        path = os.path.realpath(path)
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported segment version: {meta['version']}")
+
+        self.path = path
+        self.dim = meta["dim"]
+        self.block_size = block_size
+        self.oversample = oversample
+        self.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        self._id_offsets = np.load(os.path.join(path, "ids_offsets.npy"), mmap_mode="r")
+        self._payload_offsets = np.load(os.path.join(path, "payloads_offsets.npy"), mmap_mode="r")
+        self._ids = self._map(os.path.join(path, "ids.bin"))
+        self._payloads = self._map(os.path.join(path, "payloads.bin"))
+
+        self.payload_index = PayloadIndex()
+        if os.path.exists(os.path.join(path, "payload_index.json")):
+            with open(os.path.join(path, "payload_index.json")) as f:
+                self.payload_index = PayloadIndex.from_state(json.load(f))
+
+        self.quantizer = self.codes = None
+        if meta.get("quantization"):
+            self.codes = np.load(os.path.join(path, "codes.npy"), mmap_mode="r")
+            with np.load(os.path.join(path, "quantizer.npz")) as state:
+                self.quantizer = QUANTIZERS[meta["quantization"]].from_state(dict(state))
+
+    @staticmethod
+    def _map(filepath):
+        with open(filepath, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def id(self, row):
+        return json.loads(self._ids[self._id_offsets[row]:self._id_offsets[row + 1]])
+
+    def payload(self, row):
+        return json.loads(self._payloads[self._payload_offsets[row]:self._payload_offsets[row + 1]])
+
+    def search(self, query_vector, limit=5, filters=None):
+        """
+        Searches for similar vectors in the segment.
+        """
+        return self.search_many([query_vector], limit=limit, filters=filters)[0]
+
+    def search_many(self, query_matrix, limit=5, filters=None, exact=False):
+        """
+        Searches for many query vectors, one block of rows at a time.
+
+        Quantized segments are searched through their codes unless `exact` is set.
+        `filters` (a payload filter spec, see app.payload_filter) restricts the scan
+        to the matching rows. Returns one list of ScoredPoint per query, in input order.
+        """
+        queries = normalize_rows(np.array(query_matrix, dtype=np.float32, ndmin=2))
+        if len(self) == 0 or limit <= 0:
+            return [[] for _ in range(len(queries))]
+
+        matching = None if filters is None else self.payload_index.select(filters, len(self), self.payload)
+        if self.quantizer is None or exact:
+            rows, scores = self._scan(self.vectors, lambda block: queries @ block.T, len(queries), limit, matching)
+        else:
+            candidates, _ = self._scan(self.codes, lambda block: self.quantizer.scores(block, queries),
+                                       len(queries), limit * self.oversample, matching)
+            rows, scores = self._rescore(queries, candidates, limit)
+
+        order = np.argsort(-scores, axis=1, kind="stable")
+        rows = np.take_along_axis(rows, order, axis=1)
+        scores = np.take_along_axis(scores, order, axis=1)
+        return [[ScoredPoint(self.id(row), float(score), self.payload(row)) for row, score in zip(r, s)]
+                for r, s in zip(rows, scores)]
+
+    def _scan(self, matrix, score_block, n_queries, limit, rows=None):
+        """
+        Keeps the running top `limit` rows per query while scoring `matrix` block by
+        block; only the sorted `rows` of it are scored when given.
+        """
+        best_rows = np.empty((n_queries, 0), dtype=np.int64)
+        best_scores = np.empty((n_queries, 0), dtype=np.float32)
+        for start in range(0, len(matrix) if rows is None else len(rows), self.block_size):
+            if rows is None:
+                block_rows = np.arange(start, min(start + self.block_size, len(matrix)))
+                scores = score_block(matrix[start:start + self.block_size])
+            else:
+                block_rows = rows[start:start + self.block_size]
+                scores = score_block(matrix[block_rows])
+            block_rows = np.broadcast_to(block_rows, scores.shape)
+            best_rows, best_scores = self._merge(np.hstack([best_rows, block_rows]),
+                                                 np.hstack([best_scores, scores]), limit)
+        return best_rows, best_scores
+
+    def _rescore(self, queries, candidates, limit):
+        """Re-scores candidate rows with the full-precision vectors."""
+        rows = np.sort(candidates, axis=1)  # read the mapping in file order
+        scores = np.stack([self.vectors[r] @ query for query, r in zip(queries, rows)])
+        return self._merge(rows, scores, limit)
+
+    @staticmethod
+    def _merge(rows, scores, limit):
+        if scores.shape[1] <= limit:
+            return rows, scores
+        top = np.argpartition(-scores, limit - 1, axis=1)[:, :limit]
+        return np.take_along_axis(rows, top, axis=1), np.take_along_axis(scores, top, axis=1)
+
+    def close(self):
+        for blob in (self._ids, self._payloads):
+            if isinstance(blob, mmap.mmap):
+                blob.close()
@@ -1,25 +1,119 @@
+import hashlib
+import json
+import uuid
+from itertools import islice
+
+import numpy as np
 from qdrant_client import QdrantClient, models
 
+from app.payload_filter import qdrant_filter, qdrant_payload_schema
+from app.quantization import qdrant_quantization_config, qdrant_search_params
+
+
+def content_id(payload):
+    """
+    Derives a stable point id from a payload's "text" and "source", or from the
+    whole payload if it has no text. Upserting the same content from the same
+    source twice overwrites a single point; the same text from two sources gets
+    two points.
+    """
+    if isinstance(payload, dict) and isinstance(payload.get("text"), str):
+        content = payload["text"]
+        if payload.get("source") is not None:
+            content = f"{payload['source']}\0{content}"
+    else:
+        content = json.dumps(payload, sort_keys=True, default=str)
+    return str(uuid.UUID(bytes=hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()))
+
+
+def iter_batches(vectors, payloads, ids, batch_size):
+    """
+    Yields (vector_matrix, payloads, ids) batches from matrices, lists or iterators.
+    Raises ValueError if payloads or ids don't match the vectors one to one;
+    sized inputs are checked before the first batch.
+    """
+    for name, items in (("payloads", payloads), ("ids", ids)):
+        if hasattr(vectors, "__len__") and hasattr(items, "__len__") and len(items) != len(vectors):
+            raise ValueError(f"vectors and {name} must have the same length.")
+
+    if isinstance(vectors, np.ndarray):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        row_batches = (vectors[start:start + batch_size] for start in range(0, len(vectors), batch_size))
+    else:
+        vectors = iter(vectors)
+        row_batches = iter(lambda: list(islice(vectors, batch_size)), [])
+
+    payloads = iter(payloads)
+    ids = iter(ids) if ids is not None else None
+    for rows in row_batches:
+        batch_payloads = list(islice(payloads, len(rows)))
+        if len(batch_payloads) != len(rows):
+            raise ValueError("vectors and payloads must have the same length.")
+        if ids is None:
+            batch_ids = [content_id(payload) for payload in batch_payloads]
+        else:
+            batch_ids = list(islice(ids, len(rows)))
+            if len(batch_ids) != len(rows):
+                raise ValueError("vectors and ids must have the same length.")
+        yield np.asarray(rows, dtype=np.float32), batch_payloads, batch_ids
+
+    end = object()
+    for name, items in (("payloads", payloads), ("ids", ids)):
+        if items is not None and next(items, end) is not end:
+            raise ValueError(f"vectors and {name} must have the same length.")
+
+
 class VectorStore:
-    def __init__(self, collection_name="my_collection"):
+    def __init__(self, collection_name="my_collection", batch_size=256, search_batch_size=256,
+                 quantization=None, oversampling=2.0, indexed_fields=None):
+        """
+        `quantization` ("int8" or "pq") stores the vectors quantized in RAM; searches
+        then fetch `oversampling` times the limit and re-score with the originals.
+        `indexed_fields` maps payload fields to index types ("keyword", "integer",
+        ...) for filtered searches.
+        """
         self.client = QdrantClient(":memory:")  # Use in-memory storage for simplicity
         self.collection_name = collection_name
+        self.batch_size = batch_size
+        self.search_batch_size = search_batch_size
+        self.search_params = qdrant_search_params(oversampling) if quantization else None
         self.client.recreate_collection(
             collection_name=self.collection_name,
             vectors_config=models.VectorParams(size=384, distance=models.Distance.COSINE),
+            quantization_config=qdrant_quantization_config(quantization),
         )
+        for field, kind in (indexed_fields or {}).items():
+            self.client.create_payload_index(collection_name=self.collection_name, field_name=field,
+                                             field_schema=qdrant_payload_schema(kind))
 
-    def upsert(self, vectors, payloads):
+    def upsert(self, vectors, payloads, ids=None, batch_size=None, wait=True):
         """
         Upserts vectors and their payloads into the collection.
+
+        `vectors` may be a NumPy matrix, a list of vectors or any iterable of vectors;
+        it is sent in batches of `batch_size` points. Every batch but the last is sent
+        without waiting for it to be applied, so batches are pipelined; the last one
+        honours `wait`. Ids default to `content_id(payload)`, so re-upserting the same
+        content is idempotent and separate calls never overwrite each other.
+
+        Returns the ids of the upserted points.
         """
-        points = [
-            models.PointStruct(id=i, vector=vector, payload=payload)
-            for i, (vector, payload) in enumerate(zip(vectors, payloads))
-        ]
-        self.client.upsert(collection_name=self.collection_name, points=points, wait=True)
+        batches = iter_batches(vectors, payloads, ids, batch_size or self.batch_size)
+        upserted = []
+        batch = next(batches, None)
+        while batch is not None:
+            following = next(batches, None)
+            matrix, batch_payloads, batch_ids = batch
+            self.client.upsert(
+                collection_name=self.collection_name,
+                points=models.Batch(ids=batch_ids, vectors=matrix.tolist(), payloads=batch_payloads),
+                wait=wait if following is None else False,
+            )
+            upserted.extend(batch_ids)
+            batch = following
+        return upserted
 
-    def search(self, query_vector, limit=5):
+    def search(self, query_vector, limit=5, filters=None):
         """
         Searches for similar vectors in the collection.
         """
@@ -27,5 +121,27 @@ class VectorStore:
             collection_name=self.collection_name,
             query_vector=query_vector,
             limit=limit,
+            search_params=self.search_params,
+            query_filter=qdrant_filter(filters),
         )
         return search_result
+
+    def search_many(self, query_matrix, limit=5, filters=None):
+        """
+        Searches for many query vectors using the backend's batch search.
+
+        Queries are sent `search_batch_size` at a time, so N queries cost about
+        N / search_batch_size round trips. `filters` is an optional payload filter
+        spec (see app.payload_filter) or models.Filter applied to every query. Returns one result list per query, in input order.
+        """
+        query_matrix = np.asarray(query_matrix, dtype=np.float32)
+        filters = qdrant_filter(filters)
+        results = []
+        for start in range(0, len(query_matrix), self.search_batch_size):
+            requests = [
+                models.SearchRequest(vector=vector, limit=limit, filter=filters, params=self.search_params,
+                                     with_payload=True)
+                for vector in query_matrix[start:start + self.search_batch_size].tolist()
+            ]
+            results.extend(self.client.search_batch(collection_name=self.collection_name, requests=requests))
+        return results
@@ -0,0 +1,70 @@
+"""
+Recall/latency trade-off of LocalVectorStore's IVF index against exact search.
+
+Run from the repository root:
+
+    python benchmarks/bench_ann.py --size 1000000 --nprobe 1 4 16 64
+
+Uses clustered synthetic vectors, which resemble real embeddings far more than
+uniform noise does (on uniform noise no partitioning index can do well).
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from app.local_vector_store import LocalVectorStore
+
+
+def synthetic_vectors(n, dim, clusters, rng):
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    vectors = centers[rng.integers(clusters, size=n)]
+    for start in range(0, n, 65536):
+        block = vectors[start:start + 65536]
+        block += 0.5 * rng.standard_normal(block.shape, dtype=np.float32)
+    return vectors
+
+
+def per_query_ms(store, queries, limit, **kwargs):
+    start = time.perf_counter()
+    for query in queries:
+        store.search_many([query], limit=limit, **kwargs)
+    return 1000 * (time.perf_counter() - start) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=1000)
+    parser.add_argument("--n-lists", type=int, default=None)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    store = LocalVectorStore(dim=args.dim, batch_size=65536)
+    store.upsert(synthetic_vectors(args.size, args.dim, args.clusters, rng),
+                 ({"text": str(i)} for i in range(args.size)), ids=range(args.size))
+    queries = synthetic_vectors(args.queries, args.dim, args.clusters, rng)
+
+    start = time.perf_counter()
+    index = store.build_index(n_lists=args.n_lists)
+    print(f"{args.size} vectors, {len(index.centroids)} lists, built in {time.perf_counter() - start:.1f}s")
+
+    exact_ms = per_query_ms(store, queries, args.limit, exact=True)
+    print(f"{'nprobe':>8} {f'recall@{args.limit}':>10} {'ms/query':>9} {'speedup':>8}")
+    print(f"{'exact':>8} {1.0:>10.3f} {exact_ms:>9.2f} {1.0:>8.1f}")
+    for nprobe in args.nprobe:
+        recall = store.measure_recall(queries, limit=args.limit, nprobe=nprobe)
+        ms = per_query_ms(store, queries, args.limit, nprobe=nprobe)
+        print(f"{nprobe:>8} {recall:>10.3f} {ms:>9.2f} {exact_ms / ms:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
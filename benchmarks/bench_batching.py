@@ -0,0 +1,66 @@
+"""
+Query throughput of RAGOrchestrator with and without retrieval micro-batching.
+
+Runs --concurrency queries at a time against a store of --size documents and
+reports queries per second and latency percentiles for each batch size. A batch
+size of 1 processes every query on its own. Run from the repository root:
+
+    python benchmarks/bench_batching.py --size 100000 --concurrency 64
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from src.api.rag_orchestrator import RAGOrchestrator
+
+
+async def run_queries(orchestrator, questions, concurrency):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(question):
+        async with semaphore:
+            start = time.perf_counter()
+            await orchestrator.aquery(question)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(q) for q in questions))
+    return len(questions) / (time.perf_counter() - start), latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    words = [f"w{i}" for i in range(5000)]
+    documents = [" ".join(rng.choice(words, size=20)) for _ in range(args.size)]
+    questions = [" ".join(rng.choice(words, size=8)) for _ in range(args.queries)]
+
+    print(f"{'batch':>6} {'QPS':>8} {'p50 ms':>8} {'p99 ms':>8} {'mean batch':>10}")
+    for batch_size in args.batch_sizes:
+        orchestrator = RAGOrchestrator(max_batch_size=batch_size, max_wait_ms=args.max_wait_ms)
+        with contextlib.redirect_stdout(io.StringIO()):
+            orchestrator.add_documents(documents)
+            qps, latencies = asyncio.run(run_queries(orchestrator, questions, args.concurrency))
+        batching = orchestrator.stats()["batching"]
+        print(f"{batch_size:>6} {qps:>8.0f} {1000 * np.percentile(latencies, 50):>8.1f} "
+              f"{1000 * np.percentile(latencies, 99):>8.1f} {batching['mean_batch_size']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Throughput benchmark for DocumentProcessor's sentence-aware chunking.
+
+Compares the prefix-sum chunker against the previous implementation, which
+re-accumulated sentence lengths from the start of every chunk, on a synthetic
+corpus. Run from the repository root:
+
+    python benchmarks/bench_chunking.py --size-mb 100
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from src.utils.document_processor import DocumentProcessor
+
+WORDS = ("the system retrieves relevant context from the vector store before generating an answer "
+         "chunks overlap so that sentences near a boundary keep their meaning error code E1042 "
+         "indicates a timeout while the embedding model is loading").split()
+
+
+def legacy_sentence_chunking(text, chunk_size, overlap):
+    """The sentence-aware chunker as it was before the prefix-sum rewrite."""
+    sentences = [s for s in re.split(r'(?<=[.!?])\s+', text.strip()) if s]
+    if not sentences:
+        return []
+
+    chunks = []
+    i = 0
+    while i < len(sentences):
+        chunk_sentences = []
+        current_len = 0
+        j = i
+        while j < len(sentences):
+            sentence = sentences[j]
+            if current_len + len(sentence) + (1 if chunk_sentences else 0) > chunk_size and chunk_sentences:
+                break
+            chunk_sentences.append(sentence)
+            current_len += len(sentence) + (1 if len(chunk_sentences) > 1 else 0)
+            j += 1
+
+        chunks.append(" ".join(chunk_sentences))
+        if j == len(sentences):
+            break
+        i = max(i + 1, j - overlap)
+
+    return chunks
+
+
+def synthetic_text(size_mb, seed=0):
+    """Builds roughly `size_mb` megabytes of sentences of 5-30 words."""
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    sentences = []
+    total = 0
+    while total < target:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 30))).capitalize()
+        sentence += rng.choice(".!?") + rng.choice((" ", " ", "\n", "\n\n"))
+        sentences.append(sentence)
+        total += len(sentence)
+    return "".join(sentences)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=100)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--overlap", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--skip-legacy", action="store_true", help="Only time the current implementation.")
+    args = parser.parse_args()
+
+    processor = DocumentProcessor()
+    text = synthetic_text(args.size_mb)
+    size_mb = len(text.encode("utf-8")) / (1024 * 1024)
+    print(f"Synthetic corpus: {size_mb:.1f} MB, chunk_size={args.chunk_size}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "corpus.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+        print(f"{'overlap':>8} {'implementation':>16} {'seconds':>9} {'MB/s':>8} {'chunks':>9}")
+        for overlap in args.overlap:
+            runs = [("prefix-sum", processor.chunk_text, (text, args.chunk_size, overlap, 'sentence')),
+                    ("streaming", lambda *a: sum(1 for _ in processor.iter_chunks(*a)),
+                     (path, args.chunk_size, overlap, 'sentence'))]
+            if not args.skip_legacy:
+                runs.insert(0, ("legacy", legacy_sentence_chunking, (text, args.chunk_size, overlap)))
+
+            expected = None
+            for name, fn, fn_args in runs:
+                result, seconds = timed(fn, *fn_args)
+                count = result if isinstance(result, int) else len(result)
+                if isinstance(result, list):
+                    if expected is not None and result != expected:
+                        raise AssertionError(f"{name} produced different chunks than the reference")
+                    expected = result
+                print(f"{overlap:>8} {name:>16} {seconds:>9.2f} {size_mb / seconds:>8.1f} {count:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Indexing throughput and query latency of the BM25 LexicalIndex.
+
+Documents are random 20-word chunks drawn from a Zipf-distributed vocabulary, so
+the postings lengths look like natural text. Every document also holds a unique
+identifier such as 'ERR-123456', and 'rare' queries look one up. Run from the
+repository root:
+
+    python benchmarks/bench_lexical.py --sizes 100000 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from src.retrieval.lexical_index import LexicalIndex
+
+
+def documents(n, vocabulary, rng):
+    words = np.minimum(rng.zipf(1.3, size=(n, 20)), vocabulary)
+    for i, row in enumerate(words):
+        yield " ".join(f"w{w}" for w in row) + f" ERR-{i}"
+
+
+def latency_ms(index, queries, limit):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, limit=limit)
+        latencies.append(1000 * (time.perf_counter() - start))
+    return np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--vocabulary", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'size':>9} {'docs/s':>8} {'query':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for size in args.sizes:
+        rng = np.random.default_rng(0)
+        index = LexicalIndex()
+        start = time.perf_counter()
+        index.add(documents(size, args.vocabulary, rng))
+        docs_per_s = size / (time.perf_counter() - start)
+
+        workloads = {
+            "rare": [f"what does ERR-{i} mean" for i in rng.integers(size, size=args.queries)],
+            "mixed": [" ".join(f"w{w}" for w in rng.integers(50, args.vocabulary, size=4))
+                      for _ in range(args.queries)],
+            "common": [" ".join(f"w{w}" for w in rng.integers(1, 5, size=3)) for _ in range(args.queries)],
+        }
+        for name, queries in workloads.items():
+            p50, p99 = latency_ms(index, queries, args.limit)
+            print(f"{size:>9} {docs_per_s:>8.0f} {name:>8} {p50:>8.3f} {p99:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
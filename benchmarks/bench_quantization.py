@@ -0,0 +1,75 @@
+"""
+Memory and recall of quantized segments, scored with SimpleEvaluator.
+
+For every query the exact top-k ids are the relevant documents, so the
+evaluator's top_k_accuracy is recall@k. Run from the repository root:
+
+    python benchmarks/bench_quantization.py --size 100000 --oversample 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from app.local_vector_store import LocalVectorStore
+from app.segment import Segment
+from src.evaluation.evaluator import SimpleEvaluator
+
+
+def synthetic_vectors(n, dim, clusters, rng):
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    vectors = centers[rng.integers(clusters, size=n)]
+    vectors += 0.5 * rng.standard_normal(vectors.shape, dtype=np.float32)
+    return vectors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--oversample", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    store = LocalVectorStore(dim=args.dim, batch_size=65536)
+    store.upsert(synthetic_vectors(args.size, args.dim, args.clusters, rng),
+                 ({"text": str(i)} for i in range(args.size)), ids=range(args.size))
+    queries = synthetic_vectors(args.queries, args.dim, args.clusters, rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'mode':>6} {'oversample':>10} {'bytes/vec':>9} {'memory cut':>10} "
+              f"{f'recall@{args.limit}':>10} {'ms/query':>9}")
+        exact = None
+        for kind in (None, "int8", "pq"):
+            path = os.path.join(tmp, kind or "float32")
+            store.save(path, quantization=kind)
+            segment = Segment(path)
+            if exact is None:
+                exact = [[p.id for p in hits] for hits in segment.search_many(queries, limit=args.limit)]
+
+            searched = segment.codes if kind else segment.vectors
+            bytes_per_vector = searched.nbytes / len(segment)
+            for oversample in (args.oversample if kind else [1]):
+                segment.oversample = oversample
+                evaluator = SimpleEvaluator()
+                start = time.perf_counter()
+                for query, relevant in zip(queries, exact):
+                    retrieved = [p.id for p in segment.search(query, limit=args.limit)]
+                    evaluator.evaluate_retrieval(retrieved, relevant, k=args.limit)
+                ms = 1000 * (time.perf_counter() - start) / len(queries)
+                recall = evaluator.generate_report()["retrieval"]["top_k_accuracy"]
+                print(f"{kind or 'float32':>6} {oversample:>10} {bytes_per_vector:>9.0f} "
+                      f"{4 * args.dim / bytes_per_vector:>9.0f}x {recall:>10.3f} {ms:>9.2f}")
+            segment.close()
+
+
+if __name__ == "__main__":
+    main()
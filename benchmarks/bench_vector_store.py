@@ -0,0 +1,74 @@
+"""
+Upsert and search benchmark: LocalVectorStore against Qdrant's in-memory mode.
+
+Run from the repository root:
+
+    python benchmarks/bench_vector_store.py --sizes 10000 100000 1000000
+
+Qdrant's in-memory mode is a pure-Python reference implementation and becomes
+very slow on large collections, so by default it is only measured up to
+--qdrant-max-size vectors.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from app.local_vector_store import LocalVectorStore
+from app.vector_store import VectorStore
+
+
+def bench(store, vectors, payloads, queries, limit):
+    start = time.perf_counter()
+    store.upsert(vectors, payloads, ids=list(range(len(vectors))))
+    upsert_seconds = time.perf_counter() - start
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        store.search(query, limit=limit)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    store.search_many(queries, limit=limit)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        "upsert_per_s": len(vectors) / upsert_seconds,
+        "p50_ms": 1000 * float(np.percentile(latencies, 50)),
+        "p99_ms": 1000 * float(np.percentile(latencies, 99)),
+        "batch_qps": len(queries) / batch_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--qdrant-max-size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    queries = rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+    print(f"{'size':>9} {'backend':>8} {'upsert/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'batch QPS':>10}")
+    for size in args.sizes:
+        vectors = rng.standard_normal((size, args.dim)).astype(np.float32)
+        payloads = [{"text": str(i)} for i in range(size)]
+        backends = [("numpy", lambda: LocalVectorStore(dim=args.dim, batch_size=4096))]
+        if size <= args.qdrant_max_size and args.dim == 384:
+            backends.append(("qdrant", lambda: VectorStore(collection_name="bench", batch_size=4096)))
+
+        for name, factory in backends:
+            result = bench(factory(), vectors, payloads, queries, args.limit)
+            print(f"{size:>9} {name:>8} {result['upsert_per_s']:>10.0f} {result['p50_ms']:>8.2f} "
+                  f"{result['p99_ms']:>8.2f} {result['batch_qps']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,8 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
 class GenerationAgent:
     def generate_response(self, documents: list[str], query: str) -> str:
-        print(f"Generation agent: Generating response for query '{query}' using documents: {documents}")
+        logger.debug("Generating response.", extra={"query": query, "documents": documents})
         return f"Response based on {documents}"
@@ -1,5 +1,131 @@
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Any, Dict, List, Optional
+
+DEFAULT_SESSION = "default"
+
+logger = logging.getLogger(__name__)
+
+
 class MemoryManager:
-    def store_interaction(self, query: str, response: str):
-        print(f"Memory manager: Storing interaction for query '{query}'")
-        # In a real implementation, this would store the interaction in a database or file.
-        pass
+    """
+    Session-scoped conversation history.
+
+    Every session keeps its last `max_turns` turns in a bounded deque, and at most
+    `max_sessions` sessions are kept, evicting the least recently active one, so
+    memory stays capped however long the process runs. With `path`, every turn is
+    also appended to a JSON-lines log that is replayed on start-up. The log is
+    compacted down to the retained turns once it holds more than
+    `compact_factor` times as many lines (and at least `compact_min_lines`).
+    """
+
+    def __init__(self, path: Optional[str] = None, max_turns: int = 50, max_sessions: int = 10000,
+                 compact_factor: float = 2.0, compact_min_lines: int = 10000):
+        if max_turns < 1 or max_sessions < 1:
+            raise ValueError("max_turns and max_sessions must be at least 1.")
+        self.path = path
+        self.max_turns = max_turns
+        self.max_sessions = max_sessions
+        self.compact_factor = compact_factor
+        self.compact_min_lines = compact_min_lines
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()
+        self._log = None
+        self._log_lines = 0
+        self._retained = 0
+        if path is not None:
+            self._replay(path)
+            self._log = open(path, "a", encoding="utf-8")
+
+    def store_interaction(self, query: str, response: str, session_id: Optional[str] = None):
+        turn = {"session_id": session_id or DEFAULT_SESSION, "query": query, "response": response,
+                "timestamp": time.time()}
+        logger.debug("Storing interaction.", extra={"session_id": turn["session_id"]})
+        with self._lock:
+            self._add(turn)
+            if self._log is not None:
+                self._log.write(json.dumps(turn) + "\n")
+                self._log.flush()
+                self._log_lines += 1
+                if self._log_lines >= max(self.compact_min_lines, self.compact_factor * self._retained):
+                    self._compact()
+
+    def get_history(self, session_id: Optional[str] = None, n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Returns the last `n` turns of a session (all retained turns by default), oldest first."""
+        with self._lock:
+            turns = self._sessions.get(session_id or DEFAULT_SESSION)
+            if turns is None:
+                return []
+            if n is None or n >= len(turns):
+                return list(turns)
+            recent = list(islice(reversed(turns), max(n, 0)))
+        recent.reverse()
+        return recent
+
+    def sessions(self) -> List[str]:
+        with self._lock:
+            return list(self._sessions)
+
+    def compact(self):
+        """Rewrites the log so it only holds the retained turns."""
+        with self._lock:
+            if self._log is not None:
+                self._compact()
+
+    def close(self):
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    def _add(self, turn):
+        session_id = turn["session_id"]
+        turns = self._sessions.get(session_id)
+        if turns is None:
+            turns = self._sessions[session_id] = deque(maxlen=self.max_turns)
+            if len(self._sessions) > self.max_sessions:
+                _, evicted = self._sessions.popitem(last=False)
+                self._retained -= len(evicted)
+        else:
+            self._sessions.move_to_end(session_id)
+        if len(turns) < self.max_turns:
+            self._retained += 1
+        turns.append(turn)
+
+    def _replay(self, path):
+        if not os.path.exists(path):
+            return
+        complete = 0
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # a torn last line from an interrupted write
+                complete += len(line)
+                try:
+                    turn = json.loads(line)
+                except ValueError:
+                    continue
+                self._add(turn)
+                self._log_lines += 1
+        if complete < os.path.getsize(path):
+            # Drop the fragment so the next append starts on a line of its own.
+            logger.warning("Truncating a torn line at the end of the memory log.", extra={"path": path})
+            os.truncate(path, complete)
+
+    def _compact(self):
+        # Turns are written in arrival order so a replay restores the session LRU order.
+        turns = list(heapq.merge(*self._sessions.values(), key=lambda turn: turn["timestamp"]))
+        staging = f"{self.path}.tmp"
+        with open(staging, "w", encoding="utf-8") as f:
+            for turn in turns:
+                f.write(json.dumps(turn) + "\n")
+        self._log.close()
+        os.replace(staging, self.path)
+        self._log = open(self.path, "a", encoding="utf-8")
+        self._log_lines = len(turns)
@@ -1,4 +1,11 @@
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
 class PlanningAgent:
-    def analyze_query(self, query: str) -> str:
-        print(f"Planning agent: Analyzing query '{query}'")
-        return f"Plan for '{query}'"
+    def decompose(self, query: str) -> list[str]:
+        """Splits a compound query into sub-queries that can be retrieved independently."""
+        logger.debug("Decomposing query.", extra={"query": query})
+        parts = [part.strip() for part in re.split(r'(?<=\?)\s+|;\s*', query)]
+        return [part for part in parts if part] or [query]
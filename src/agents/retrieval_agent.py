@@ -1,4 +1,8 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
 class RetrievalAgent:
     def retrieve_documents(self, plan: str) -> list[str]:
-        print(f"Retrieval agent: Retrieving documents for plan '{plan}'")
+        logger.debug("Retrieving documents.", extra={"plan": plan})
         return ["doc1.txt", "doc2.txt"]
@@ -0,0 +1,181 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from app.embedding_cache import normalize_text
+from ..utils.metrics import ANSWER_CACHE_LOOKUPS
+
+
+class _Entry:
+    __slots__ = ("row", "result", "expires", "latency")
+
+    def __init__(self, row, result, expires, latency):
+        self.row = row
+        self.result = result
+        self.expires = expires
+        self.latency = latency
+
+
+class AnswerCache:
+    """
+    Caches query results so repeated questions skip retrieval and generation.
+
+    A question matches an entry when its normalized text (NFC, collapsed
+    whitespace, case-folded) hashes to the same key, or, failing that, when its
+    embedding has a cosine similarity of at least `similarity_threshold` with the
+    entry's question. Entries expire `ttl_seconds` after they are stored and the
+    least recently used entry is evicted beyond `max_entries`. Call `invalidate`
+    whenever the knowledge base changes; each call starts a new `generation`, and
+    a result computed in an earlier generation is not stored.
+
+    Embeddings of the cached questions are kept in one matrix, with their expiry
+    times alongside, so a similarity lookup is a single matrix-vector product
+    over the entries that are still live.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0,
+                 similarity_threshold: float = 0.95, clock: Callable[[], float] = time.monotonic):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.clock = clock
+        self.stats = {"hits": 0, "semantic_hits": 0, "misses": 0, "evictions": 0,
+                      "expirations": 0, "invalidations": 0, "stale_writes": 0, "saved_seconds": 0.0}
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._vectors = None
+        self._expires = np.zeros(max_entries)
+        self._row_keys = []
+
+    @staticmethod
+    def key(question: str) -> bytes:
+        return hashlib.blake2b(normalize_text(question).casefold().encode("utf-8"), digest_size=16).digest()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, question: str, embedding=None) -> Optional[Dict[str, Any]]:
+        """
+        Returns a copy of the cached result for `question`, or None on a miss.
+
+        Without `embedding` only exact (normalized) matches are found.
+        """
+        key = self.key(question)
+        with self._lock:
+            entry = self._live(key)
+            if entry is not None:
+                ANSWER_CACHE_LOOKUPS.inc(result="exact")
+            elif embedding is not None:
+                key = self._nearest(embedding)
+                entry = self._live(key) if key is not None else None
+                if entry is not None:
+                    self.stats["semantic_hits"] += 1
+                    ANSWER_CACHE_LOOKUPS.inc(result="semantic")
+            if entry is None:
+                self.stats["misses"] += 1
+                ANSWER_CACHE_LOOKUPS.inc(result="miss")
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            self.stats["saved_seconds"] += entry.latency
+            return copy.deepcopy(entry.result)
+
+    def put(self, question: str, embedding, result: Dict[str, Any], latency: float = 0.0,
+            generation: Optional[int] = None):
+        """
+        Stores `result` for `question`. `latency` is the time it took to compute, in
+        seconds; it is counted as saved on every hit. With the `generation` read
+        before computing the result, the write is dropped if the cache was
+        invalidated since.
+        """
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector = vector / norm
+        key = self.key(question)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                self.stats["stale_writes"] += 1
+                return
+            if self._vectors is None or self._vectors.shape[1] != len(vector):
+                self._clear()
+                self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    self._remove(next(iter(self._entries)))
+                    self.stats["evictions"] += 1
+                entry = _Entry(len(self._row_keys), None, 0.0, 0.0)
+                self._row_keys.append(key)
+                self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._vectors[entry.row] = vector
+            entry.result = copy.deepcopy(result)
+            entry.expires = self.clock() + self.ttl_seconds
+            self._expires[entry.row] = entry.expires
+            entry.latency = latency
+
+    def invalidate(self):
+        """Drops every entry, e.g. after documents were added."""
+        with self._lock:
+            self._clear()
+            self.generation += 1
+            self.stats["invalidations"] += 1
+
+    def info(self) -> Dict[str, Any]:
+        """Returns the counters plus the size and hit rate of the cache."""
+        with self._lock:
+            info = dict(self.stats, entries=len(self._entries))
+        lookups = info["hits"] + info["misses"]
+        info["hit_rate"] = info["hits"] / lookups if lookups else 0.0
+        return info
+
+    def _live(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires <= self.clock():
+            self._remove(key)
+            self.stats["expirations"] += 1
+            return None
+        return entry
+
+    def _nearest(self, embedding):
+        # Evict expired entries first so they can't shadow a live match.
+        expired = np.flatnonzero(self._expires[:len(self._row_keys)] <= self.clock())
+        for key in [self._row_keys[row] for row in expired]:
+            self._remove(key)
+            self.stats["expirations"] += 1
+        if not self._row_keys:
+            return None
+        query = np.asarray(embedding, dtype=np.float32).ravel()
+        if len(query) != self._vectors.shape[1]:
+            return None
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return None
+        scores = self._vectors[:len(self._row_keys)] @ (query / norm)
+        best = int(np.argmax(scores))
+        return self._row_keys[best] if scores[best] >= self.similarity_threshold else None
+
+    def _remove(self, key):
+        """Removes an entry, moving the last row of the matrix into its slot."""
+        entry = self._entries.pop(key)
+        last = len(self._row_keys) - 1
+        if entry.row != last:
+            moved = self._row_keys[last]
+            self._vectors[entry.row] = self._vectors[last]
+            self._expires[entry.row] = self._expires[last]
+            self._row_keys[entry.row] = moved
+            self._entries[moved].row = entry.row
+        self._row_keys.pop()
+
+    def _clear(self):
+        self._entries.clear()
+        self._row_keys = []
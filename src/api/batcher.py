@@ -0,0 +1,98 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class _Queue:
+    __slots__ = ("pending", "timer")
+
+    def __init__(self):
+        self.pending = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class MicroBatcher:
+    """
+    Collects items submitted by concurrent requests and processes them as one batch.
+
+    A batch is flushed when it holds `max_batch_size` items or `max_wait_ms` after
+    its first item arrived, whichever comes first. `process_batch` is an async
+    callable that takes the list of items and returns one result per item, in the
+    same order; each `submit` call gets its own result back, or the batch's
+    exception. With `max_batch_size=1` every item is processed on its own.
+
+    Items submitted from different event loops (e.g. `asyncio.run` in several
+    threads) are batched separately, each batch running on its own loop.
+    """
+
+    def __init__(self, process_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+                 max_batch_size: int = 32, max_wait_ms: float = 2.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms cannot be negative.")
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.stats = {"batches": 0, "items": 0, "max_batch_size": 0}
+        # Pending (item, future) pairs and the flush timer of each event loop with
+        # items waiting; futures are only ever resolved on their own loop.
+        self._queues: Dict[asyncio.AbstractEventLoop, _Queue] = {}
+        self._lock = threading.Lock()
+        self._tasks = set()
+
+    async def submit(self, item: Any) -> Any:
+        """Adds `item` to the current batch of the running event loop and waits for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = None
+        with self._lock:
+            queue = self._queues.get(loop)
+            if queue is None:
+                queue = self._queues[loop] = _Queue()
+            queue.pending.append((item, future))
+            if len(queue.pending) >= self.max_batch_size:
+                batch = self._take(loop)
+            elif queue.timer is None:
+                queue.timer = loop.call_later(self.max_wait_ms / 1000, self._flush, loop)
+        if batch:
+            self._start(loop, batch)
+        return await future
+
+    def _flush(self, loop):
+        with self._lock:
+            batch = self._take(loop)
+        if batch:
+            self._start(loop, batch)
+
+    def _take(self, loop):
+        """Removes and returns the pending batch of `loop`; call with the lock held."""
+        queue = self._queues.pop(loop, None)
+        if queue is None:
+            return []
+        if queue.timer is not None:
+            queue.timer.cancel()
+        return queue.pending
+
+    def _start(self, loop, batch):
+        task = loop.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        with self._lock:
+            self.stats["batches"] += 1
+            self.stats["items"] += len(batch)
+            self.stats["max_batch_size"] = max(self.stats["max_batch_size"], len(batch))
+        try:
+            results = await self.process_batch([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"process_batch returned {len(results)} results for {len(batch)} items.")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
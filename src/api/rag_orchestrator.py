@@ -1,36 +1,332 @@
+import asyncio
+import logging
+import re
+import threading
 import time
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
+
+import numpy as np
+
+from app.agents import RAGAgent
+from app.client_registry import REGISTRY as CLIENTS
+from app.context_builder import ContextBuilder
+from app.embedding_service import EmbeddingService
+from app.local_vector_store import LocalVectorStore
+from ..agents.memory_manager import MemoryManager
+from ..retrieval.lexical_index import LexicalIndex, reciprocal_rank_fusion
+from ..utils.ingestion import content_hash
+from ..utils.metrics import REGISTRY, TIME_TO_FIRST_TOKEN, span
+from .answer_cache import AnswerCache
+from .batcher import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+QUERIES = REGISTRY.counter("rag_queries_total", "Queries answered, by endpoint and whether the answer was cached.",
+                           ("endpoint", "cached"))
+QUERY_SECONDS = REGISTRY.histogram("rag_query_duration_seconds", "End-to-end query latency.", ("endpoint",))
+DOCUMENTS = REGISTRY.counter("rag_documents_added_total", "Documents added to the knowledge base.")
 
 class RAGOrchestrator:
     """
-    A placeholder for the RAG Orchestrator.
-    In a real implementation, this class would handle the logic
-    for retrieving documents, generating responses, etc.
+    Handles the logic behind the API: documents are embedded into a vector store
+    when added, and queries embed the question, search the store and generate a
+    response from the retrieved sources.
+
+    The query path is async end to end. Embedding and in-process search run in
+    worker threads and generation awaits the async Groq client, so one worker
+    process can hold many queries in flight. Without a Groq API key a templated
+    response is returned instead of calling the LLM.
+
+    Concurrent queries are micro-batched: questions arriving within `max_wait_ms`
+    of each other (up to `max_batch_size`) are embedded together, then searched
+    together.
+
+    With an `answer_cache`, a question that matches a cached one exactly or by
+    embedding similarity is answered from the cache without searching or
+    generating. The cache is invalidated whenever documents are added.
+
+    Retrieved sources are deduplicated and packed into the token budget of the
+    `context_builder` before they are sent to the LLM.
+
+    With a `memory`, every answered turn is stored under its session id in the
+    background, off the response path.
+
+    Retrieval is hybrid unless `hybrid` is False: documents are also indexed in a
+    BM25 `LexicalIndex`, so exact terms such as error codes and identifiers are
+    found, and the dense and lexical rankings are merged by reciprocal rank
+    fusion. Source scores are then fusion scores; the confidence is still the
+    mean cosine similarity of the dense hits.
+
+    Embedding, search, context assembly, generation and memory writes are timed
+    into the `rag_stage_duration_seconds` histogram, and queries are counted in
+    the process-wide metrics registry served on /metrics.
     """
-    def __init__(self):
+    def __init__(self, embedding_service: Optional[EmbeddingService] = None, vector_store=None,
+                 groq_api_key: Optional[str] = None, limit: int = 5,
+                 max_batch_size: int = 32, max_wait_ms: float = 2.0,
+                 answer_cache: Optional[AnswerCache] = None, memory: Optional[MemoryManager] = None,
+                 context_builder: Optional[ContextBuilder] = None, hybrid: bool = True):
         self.documents = []
+        self.embedding_service = embedding_service or EmbeddingService()
+        self.vector_store = vector_store or LocalVectorStore(dim=self.embedding_service.dim)
+        self.context_builder = context_builder or ContextBuilder()
+        self.rag_agent = (RAGAgent(groq_api_key, self.embedding_service, self.vector_store,
+                                   context_builder=self.context_builder) if groq_api_key else None)
+        # Estimated tokens of the retrieved sources and of the contexts built from them.
+        self.context_tokens = {"retrieved": 0, "sent": 0}
+        self.limit = limit
+        # Time-to-first-token of the most recent streamed queries, in milliseconds.
+        self.time_to_first_token_ms = deque(maxlen=1000)
+        self.embedding_batcher = MicroBatcher(self._embed_batch, max_batch_size, max_wait_ms)
+        self.search_batcher = MicroBatcher(self._search_batch, max_batch_size, max_wait_ms)
+        self.answer_cache = answer_cache
+        self.memory = memory
+        self._background = set()
+        # One writer thread, so a session's turns are stored in the order they were answered.
+        self._memory_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-writer")
+        self.lexical_index = LexicalIndex() if hybrid else None
+        self._payloads = {}
+        # Content hashes of the documents added so far, so adding one again is a no-op.
+        self._indexed = set()
+        # Serializes add_documents: deduplication and source numbering read what earlier calls added.
+        self._adding = threading.Lock()
 
     def add_documents(self, documents: List[str]):
-        """Simulates adding documents to the knowledge base."""
-        print(f"Adding {len(documents)} documents.")
+        """
+        Embeds documents and adds them to the knowledge base. Documents that are
+        already in it are skipped. Concurrent calls run one at a time.
+        """
+        with self._adding:
+            self._add_documents(documents)
+
+    def _add_documents(self, documents: List[str]):
+        hashes = {}
+        for doc in documents:
+            digest = content_hash(doc)
+            if digest not in self._indexed:
+                hashes.setdefault(digest, doc)
+        logger.info("Adding documents.", extra={"count": len(hashes), "skipped": len(documents) - len(hashes)})
+        if not hashes:
+            return
+        documents = list(hashes.values())
+        first = len(self.documents) + 1
+        with span("embedding"):
+            embeddings = self.embedding_service.create_embeddings(documents)
+        payloads = [{"text": doc, "source": f"Document {first + i}"} for i, doc in enumerate(documents)]
+        ids = self.vector_store.upsert(embeddings, payloads)
+        if self.lexical_index is not None:
+            self.lexical_index.add(documents, ids)
+            self._payloads.update(zip(ids, payloads))
         self.documents.extend(documents)
-        print(f"Total documents: {len(self.documents)}")
+        self._indexed.update(hashes)
+        if self.answer_cache is not None:
+            self.answer_cache.invalidate()
+        DOCUMENTS.inc(len(documents))
+        logger.info("Documents added.", extra={"total": len(self.documents)})
 
-    def query(self, query: str, session_id: str) -> Dict[str, Any]:
-        """Simulates a RAG query."""
-        print(f"Received query: '{query}' with session_id: '{session_id}'")
-        # Simulate a delay
-        time.sleep(1)
+    async def aadd_documents(self, documents: List[str]):
+        """Async version of `add_documents`; the embedding work runs in a worker thread."""
+        await asyncio.to_thread(self.add_documents, documents)
 
-        response = f"This is a simulated response to your query: '{query}'."
-        sources = [
-            {"source": "Document 1", "content": "This is a snippet from document 1."},
-            {"source": "Document 2", "content": "This is a snippet from document 2."}
-        ]
-        confidence = 0.85
+    def query(self, query: str, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Blocking wrapper around `aquery` for callers without an event loop."""
+        async def run():
+            try:
+                return await self.aquery(query, session_id)
+            finally:
+                # The loop ends with this call, so close the API clients bound to it.
+                await CLIENTS.aclose()
+
+        return asyncio.run(run())
 
-        return {
+    async def aquery(self, query: str, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Answers a query from the knowledge base."""
+        logger.debug("Received query.", extra={"session_id": session_id})
+        started = time.perf_counter()
+        embedding, cached, generation = await self._lookup(query)
+        if cached is not None:
+            self._remember(query, cached["response"], session_id)
+            self._count("query", True, started)
+            return cached
+
+        sources, confidence = await self._retrieve(query, embedding)
+        if self.rag_agent is not None:
+            context = self._context(sources)
+            with span("generation"):
+                response = await self.rag_agent.agenerate(query, context)
+        else:
+            response = self._simulated_response(query)
+
+        result = {
             "response": response,
             "sources": sources,
             "confidence": confidence
         }
+        self._store(query, embedding, result, started, generation)
+        self._remember(query, response, session_id)
+        self._count("query", False, started)
+        return result
+
+    async def astream_query(self, query: str, session_id: Optional[str] = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Answers a query as a stream of (event, data) pairs.
+
+        A 'sources' event with the retrieved sources and confidence comes first, then
+        one 'token' event per generated piece of text, then a 'done' event carrying
+        the time to first token and the total time in milliseconds.
+        """
+        logger.debug("Received streaming query.", extra={"session_id": session_id})
+        started = time.perf_counter()
+        embedding, cached, generation = await self._lookup(query)
+        if cached is not None:
+            sources, confidence = cached["sources"], cached["confidence"]
+            tokens = self._replay(cached["response"])
+        else:
+            sources, confidence = await self._retrieve(query, embedding)
+            if self.rag_agent is not None:
+                tokens = self.rag_agent.astream(query, self._context(sources))
+            else:
+                tokens = self._simulated_tokens(query)
+        yield "sources", {"sources": sources, "confidence": confidence}
+
+        first_token_ms = None
+        response = []
+        with span("generation"):
+            async for token in tokens:
+                if first_token_ms is None:
+                    first_token_ms = 1000 * (time.perf_counter() - started)
+                    self.time_to_first_token_ms.append(first_token_ms)
+                    TIME_TO_FIRST_TOKEN.observe(first_token_ms / 1000)
+                response.append(token)
+                yield "token", {"text": token}
+
+        if cached is None:
+            self._store(query, embedding, {"response": "".join(response), "sources": sources,
+                                           "confidence": confidence}, started, generation)
+        self._remember(query, "".join(response), session_id)
+        self._count("stream", cached is not None, started)
+        yield "done", {
+            "time_to_first_token_ms": first_token_ms,
+            "total_ms": 1000 * (time.perf_counter() - started),
+            "cached": cached is not None,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Summarizes the time to first token of recent streamed queries, the
+        embedding and search batches, the context token savings and the answer cache.
+        """
+        batching = {}
+        for name, batcher in (("embedding", self.embedding_batcher), ("search", self.search_batcher)):
+            batching[name] = dict(batcher.stats)
+            batching[name]["mean_batch_size"] = (batcher.stats["items"] / batcher.stats["batches"]
+                                                 if batcher.stats["batches"] else 0.0)
+        stats = {"time_to_first_token_ms": {"count": 0}, "batching": batching,
+                 "context_tokens": dict(self.context_tokens)}
+        samples = sorted(self.time_to_first_token_ms)
+        if samples:
+            stats["time_to_first_token_ms"] = {
+                "count": len(samples),
+                "p50": samples[len(samples) // 2],
+                "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+                "max": samples[-1],
+            }
+        if self.answer_cache is not None:
+            stats["answer_cache"] = self.answer_cache.info()
+        return stats
+
+    async def _embed_batch(self, queries: List[str]):
+        with span("embedding"):
+            return await self.embedding_service.acreate_embeddings(queries)
+
+    async def _search_batch(self, items: List[Tuple[str, Any]]) -> List[list]:
+        queries = [query for query, _ in items]
+        embeddings = np.stack([embedding for _, embedding in items])
+        with span("search"):
+            return await asyncio.to_thread(self._search_many, queries, embeddings)
+
+    def _search_many(self, queries: List[str], embeddings) -> List[list]:
+        """
+        Returns, for every query, its hits as (payload, score, dense score or None) tuples.
+        """
+        dense = self.vector_store.search_many(embeddings, self.limit)
+        if self.lexical_index is None:
+            return [[(hit.payload, hit.score, hit.score) for hit in hits] for hits in dense]
+
+        results = []
+        for query, hits in zip(queries, dense):
+            dense_hits = {hit.id: hit for hit in hits}
+            lexical = self.lexical_index.search(query, self.limit)
+            fused = reciprocal_rank_fusion([list(dense_hits), [doc_id for doc_id, _ in lexical]], limit=self.limit)
+            results.append([
+                (dense_hits[doc_id].payload, score, dense_hits[doc_id].score) if doc_id in dense_hits
+                else (self._payloads[doc_id], score, None)
+                for doc_id, score in fused
+            ])
+        return results
+
+    async def _lookup(self, query: str):
+        """
+        Embeds `query` and checks the answer cache. Returns (embedding, cached result
+        or None, cache generation); the generation is read first so that an answer
+        computed from a knowledge base that changed meanwhile is not cached.
+        """
+        if self.answer_cache is None:
+            return await self.embedding_batcher.submit(query), None, None
+        generation = self.answer_cache.generation
+        embedding = await self.embedding_batcher.submit(query)
+        return embedding, self.answer_cache.get(query, embedding), generation
+
+    def _store(self, query: str, embedding, result: Dict[str, Any], started: float, generation: Optional[int]):
+        if self.answer_cache is not None:
+            self.answer_cache.put(query, embedding, result, time.perf_counter() - started, generation=generation)
+
+    def _remember(self, query: str, response: str, session_id: Optional[str]):
+        if self.memory is not None:
+            task = asyncio.get_running_loop().run_in_executor(self._memory_writer, self._store_interaction,
+                                                              query, response, session_id)
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+    def _store_interaction(self, query: str, response: str, session_id: Optional[str]):
+        with span("memory_write"):
+            self.memory.store_interaction(query, response, session_id)
+
+    @staticmethod
+    def _count(endpoint: str, cached: bool, started: float):
+        QUERIES.inc(endpoint=endpoint, cached=str(cached).lower())
+        QUERY_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+
+    def history(self, session_id: Optional[str] = None, n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Returns the last `n` stored turns of a session, oldest first."""
+        return self.memory.get_history(session_id, n) if self.memory is not None else []
+
+    async def _retrieve(self, query: str, embedding) -> Tuple[List[Dict[str, Any]], float]:
+        hits = await self.search_batcher.submit((query, embedding))
+        sources = [
+            {"source": payload.get("source", "unknown"), "content": payload["text"], "score": score}
+            for payload, score, _ in hits
+        ]
+        dense_scores = [dense for _, _, dense in hits if dense is not None]
+        confidence = max(0.0, min(1.0, sum(dense_scores) / len(dense_scores))) if dense_scores else 0.0
+        return sources, confidence
+
+    def _context(self, sources: List[Dict[str, Any]]) -> str:
+        with span("context"):
+            context = self.context_builder.build((source["content"], source["score"]) for source in sources)
+        self.context_tokens["retrieved"] += context.input_tokens
+        self.context_tokens["sent"] += context.tokens
+        return context.text
+
+    def _simulated_response(self, query: str) -> str:
+        return f"This is a simulated response to your query: '{query}'."
+
+    async def _simulated_tokens(self, query: str) -> AsyncIterator[str]:
+        async for token in self._replay(self._simulated_response(query)):
+            yield token
+
+    async def _replay(self, response: str) -> AsyncIterator[str]:
+        for token in re.findall(r"\S+\s*", response):
+            yield token
@@ -1,8 +1,19 @@
+import json
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 
+from app.client_registry import REGISTRY as CLIENTS
+from app.context_builder import ContextBuilder
+from ..agents.memory_manager import MemoryManager
+from ..utils.metrics import REGISTRY
+from ..utils.structured_logging import configure_logging
+from .answer_cache import AnswerCache
 from .rag_orchestrator import RAGOrchestrator
 
 # --- Pydantic Models ---
@@ -18,11 +29,22 @@ class QueryResponse(BaseModel):
 class AddDocumentsRequest(BaseModel):
     documents: List[str]
 
+# --- Lifespan ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # JSON lines on stderr, written by a background thread; LOG_SAMPLE_RATE keeps that fraction of sub-WARNING records
+    configure_logging(level=os.environ.get("LOG_LEVEL", "INFO"),
+                      sample_rate=float(os.environ.get("LOG_SAMPLE_RATE", 1.0)))
+    yield
+    # Close the pooled async API clients bound to the server's event loop
+    await CLIENTS.aclose()
+
 # --- FastAPI App ---
 app = FastAPI(
     title="RAG API",
     description="A simple API for a RAG application.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # --- CORS Middleware ---
@@ -35,7 +57,23 @@ app.add_middleware(
 )
 
 # --- RAG Orchestrator Initialization ---
-rag_orchestrator = RAGOrchestrator()
+# Answers are generated with Groq when GROQ_API_KEY is set
+# Repeated and near-identical questions are answered from the cache; ANSWER_CACHE_SIZE=0 disables it
+answer_cache_size = int(os.environ.get("ANSWER_CACHE_SIZE", 1024))
+rag_orchestrator = RAGOrchestrator(
+    groq_api_key=os.environ.get("GROQ_API_KEY"),
+    max_batch_size=int(os.environ.get("BATCH_MAX_SIZE", 32)),
+    max_wait_ms=float(os.environ.get("BATCH_MAX_WAIT_MS", 2.0)),
+    answer_cache=AnswerCache(
+        max_entries=answer_cache_size,
+        ttl_seconds=float(os.environ.get("ANSWER_CACHE_TTL_SECONDS", 3600)),
+        similarity_threshold=float(os.environ.get("ANSWER_CACHE_SIMILARITY", 0.95)),
+    ) if answer_cache_size > 0 else None,
+    # Conversation turns are kept per session_id; MEMORY_LOG_PATH makes them persistent
+    memory=MemoryManager(path=os.environ.get("MEMORY_LOG_PATH")),
+    # Retrieved chunks are deduplicated and packed into this many prompt tokens
+    context_builder=ContextBuilder(max_tokens=int(os.environ.get("CONTEXT_MAX_TOKENS", 2000))),
+)
 
 # --- API Endpoints ---
 @app.get("/health")
@@ -44,19 +82,51 @@ def health_check():
     return {"status": "ok"}
 
 @app.post("/add_documents")
-def add_documents(request: AddDocumentsRequest):
+async def add_documents(request: AddDocumentsRequest):
     """Endpoint to add new documents to the knowledge base."""
     try:
-        rag_orchestrator.add_documents(request.documents)
+        await rag_orchestrator.aadd_documents(request.documents)
         return {"message": "Documents added successfully."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/query", response_model=QueryResponse)
-def query(request: QueryRequest):
+async def query(request: QueryRequest):
     """Main RAG query endpoint."""
     try:
-        result = rag_orchestrator.query(request.query, request.session_id)
+        result = await rag_orchestrator.aquery(request.query, request.session_id)
         return QueryResponse(**result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/query/stream")
+async def query_stream(request: QueryRequest):
+    """
+    Streaming RAG query endpoint (server-sent events).
+
+    Sends a 'sources' event first, then 'token' events as the answer is generated
+    and a final 'done' event with the time to first token.
+    """
+    async def events():
+        try:
+            async for event, data in rag_orchestrator.astream_query(request.query, request.session_id):
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.get("/stats")
+def stats():
+    """Query statistics: time to first token of streamed queries, batching and answer cache hit rate."""
+    return rag_orchestrator.stats()
+
+@app.get("/sessions/{session_id}/history")
+def session_history(session_id: str, limit: int = 10):
+    """The last `limit` turns of a conversation session, oldest first."""
+    return {"session_id": session_id, "turns": rag_orchestrator.history(session_id, limit)}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Counters and latency histograms in the Prometheus text exposition format."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
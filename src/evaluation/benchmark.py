@@ -0,0 +1,260 @@
+"""
+Retrieval benchmark and load-test harness.
+
+Measures, on a synthetic corpus:
+  - ingestion: MB/s through IngestionPipeline,
+  - embedding: texts/s through EmbeddingService,
+  - search: QPS and p50/p95/p99 latency of LocalVectorStore at several sizes,
+  - query: end-to-end /query load at a fixed concurrency, in process through the
+    ASGI app or against a running server with --url.
+
+Results are written as JSON. With --baseline, every metric is compared with an
+earlier run and the exit status is 1 if any regressed by more than --tolerance.
+Run from the repository root:
+
+    python -m src.evaluation.benchmark --sizes 10000 100000 --output bench.json
+    python -m src.evaluation.benchmark --baseline bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.embedding_service import EmbeddingService
+from app.local_vector_store import LocalVectorStore
+from src.evaluation.evaluator import SimpleEvaluator, latency_summary
+from src.utils.ingestion import IngestionPipeline
+
+# Metrics ending in one of these suffixes are better when higher; all timings are better when lower.
+HIGHER_IS_BETTER = ("_per_s", "qps", "throughput")
+
+
+def synthetic_corpus(n_documents: int, words_per_document: int = 200, vocabulary: int = 20000,
+                     seed: int = 0) -> List[str]:
+    """Random documents over a Zipf-distributed vocabulary, so term frequencies look like text."""
+    rng = np.random.default_rng(seed)
+    words = np.minimum(rng.zipf(1.2, size=(n_documents, words_per_document)), vocabulary)
+    documents = []
+    for row in words:
+        sentences = [" ".join(f"w{w}" for w in row[i:i + 12]) + "." for i in range(0, len(row), 12)]
+        documents.append(" ".join(sentences))
+    return documents
+
+
+def bench_ingestion(documents: List[str], chunk_size: int = 1000, overlap: int = 200) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, document in enumerate(documents):
+            with open(os.path.join(tmp, f"doc{i:06d}.txt"), "w") as f:
+                f.write(document)
+        pipeline = IngestionPipeline(chunk_size=chunk_size, overlap=overlap)
+        start = time.perf_counter()
+        chunks = sum(len(batch) for batch in pipeline.run(tmp))
+        seconds = time.perf_counter() - start
+    return {
+        "mb_per_s": pipeline.stats["bytes"] / seconds / 1e6,
+        "chunks_per_s": chunks / seconds,
+    }
+
+
+def bench_embedding(texts: List[str], service: EmbeddingService) -> Dict[str, float]:
+    start = time.perf_counter()
+    service.create_embeddings(texts)
+    return {"texts_per_s": len(texts) / (time.perf_counter() - start)}
+
+
+def bench_search(size: int, dim: int, n_queries: int, limit: int, seed: int = 0) -> Dict[str, float]:
+    rng = np.random.default_rng(seed)
+    store = LocalVectorStore(dim=dim, batch_size=65536)
+    vectors = rng.standard_normal((size, dim), dtype=np.float32)
+    start = time.perf_counter()
+    store.upsert(vectors, ({"text": str(i)} for i in range(size)), ids=range(size))
+    upsert_seconds = time.perf_counter() - start
+    del vectors
+    queries = rng.standard_normal((n_queries, dim), dtype=np.float32)
+
+    evaluator = SimpleEvaluator()
+    for query in queries:
+        start = time.perf_counter()
+        store.search(query, limit=limit)
+        evaluator.measure_system(start, time.perf_counter())
+    system = evaluator.generate_report()["system"]
+
+    start = time.perf_counter()
+    store.search_many(queries, limit=limit)
+    batch_seconds = time.perf_counter() - start
+    return {
+        "upsert_per_s": size / upsert_seconds,
+        "qps": system["throughput"],
+        "p50_ms": system["response_time_p50_ms"],
+        "p95_ms": system["response_time_p95_ms"],
+        "p99_ms": system["response_time_p99_ms"],
+        "batch_qps": n_queries / batch_seconds,
+    }
+
+
+async def _load(client, questions: List[str], concurrency: int) -> Dict[str, float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one(question):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post("/query", json={"query": question, "session_id": "benchmark"})
+            latencies.append(time.perf_counter() - start)
+            errors += response.status_code != 200
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(question) for question in questions))
+    seconds = time.perf_counter() - start
+    summary = latency_summary(latencies)
+    return {
+        "qps": len(questions) / seconds,
+        "p50_ms": summary["p50_ms"],
+        "p95_ms": summary["p95_ms"],
+        "p99_ms": summary["p99_ms"],
+        "error_rate": errors / len(questions),
+    }
+
+
+def bench_query_load(documents: List[str], questions: List[str], concurrency: int,
+                     url: Optional[str] = None) -> Dict[str, float]:
+    """Runs `questions` against /query, `concurrency` at a time."""
+    import httpx
+
+    async def run():
+        if url is not None:
+            async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+                await client.post("/add_documents", json={"documents": documents})
+                return await _load(client, questions, concurrency)
+
+        from src.api import server
+        from src.api.rag_orchestrator import RAGOrchestrator
+        previous, server.rag_orchestrator = server.rag_orchestrator, RAGOrchestrator()
+        try:
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+                await client.post("/add_documents", json={"documents": documents})
+                return await _load(client, questions, concurrency)
+        finally:
+            server.rag_orchestrator = previous
+
+    return asyncio.run(run())
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        else:
+            flat[name] = value
+    return flat
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """
+    Compares two runs metric by metric.
+
+    Returns one row per metric present in both, with the relative change and
+    whether it is a regression: worse than the baseline by more than `tolerance`.
+    """
+    current, previous = flatten(results), flatten(baseline)
+    rows = []
+    for name in sorted(current.keys() & previous.keys()):
+        if name.endswith("error_rate"):
+            regressed = current[name] > previous[name]
+            change = current[name] - previous[name]
+        elif previous[name]:
+            change = (current[name] - previous[name]) / previous[name]
+            better_higher = name.endswith(HIGHER_IS_BETTER)
+            regressed = -change > tolerance if better_higher else change > tolerance
+        else:
+            continue
+        rows.append({"metric": name, "baseline": previous[name], "current": current[name],
+                     "change": change, "regressed": regressed})
+    return rows
+
+
+def run(args) -> Dict[str, Any]:
+    documents = synthetic_corpus(args.documents, seed=args.seed)
+    results: Dict[str, Any] = {}
+
+    results["ingestion"] = bench_ingestion(documents)
+    print(f"ingestion: {results['ingestion']['mb_per_s']:.2f} MB/s", file=sys.stderr)
+
+    service = EmbeddingService()
+    chunks = [chunk for document in documents[:2000] for chunk in
+              (document[i:i + 1000] for i in range(0, len(document), 800))]
+    results["embedding"] = bench_embedding(chunks, service)
+    print(f"embedding: {results['embedding']['texts_per_s']:.0f} texts/s", file=sys.stderr)
+
+    results["search"] = {}
+    for size in args.sizes:
+        results["search"][str(size)] = bench_search(size, service.dim, args.queries, args.limit, seed=args.seed)
+        print(f"search {size}: {results['search'][str(size)]['qps']:.0f} QPS", file=sys.stderr)
+
+    rng = np.random.default_rng(args.seed)
+    questions = [" ".join(f"w{w}" for w in rng.integers(1, 2000, size=6)) for _ in range(args.load_queries)]
+    results["query"] = bench_query_load(documents[:args.load_documents], questions, args.concurrency, args.url)
+    print(f"query: {results['query']['qps']:.0f} QPS at concurrency {args.concurrency}", file=sys.stderr)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Retrieval benchmark and load-test harness.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--documents", type=int, default=1000, help="synthetic documents to ingest")
+    parser.add_argument("--queries", type=int, default=200, help="search queries per collection size")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--load-documents", type=int, default=1000)
+    parser.add_argument("--load-queries", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--url", help="run the /query load against this server instead of in process")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare with the results in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "args": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        },
+        "results": run(args),
+    }
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            rows = compare(report["results"], json.load(f)["results"], args.tolerance)
+        report["comparison"] = rows
+        for row in rows:
+            flag = "REGRESSION" if row["regressed"] else ""
+            print(f"{row['metric']:<32} {row['baseline']:>12.3f} {row['current']:>12.3f} "
+                  f"{100 * row['change']:>+8.1f}% {flag}", file=sys.stderr)
+        status = int(any(row["regressed"] for row in rows))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,32 @@
 import time
 from collections import defaultdict
 
+import numpy as np
+
+
+def latency_summary(latencies):
+    """
+    Summarizes latencies in seconds.
+
+    Args:
+        latencies (list): Latencies in seconds.
+
+    Returns:
+        dict: count, mean, p50, p95, p99 and max, in milliseconds.
+    """
+    if len(latencies) == 0:
+        return {'count': 0}
+    ms = 1000 * np.asarray(latencies, dtype=np.float64)
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        'count': len(ms),
+        'mean_ms': float(ms.mean()),
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'max_ms': float(ms.max()),
+    }
+
 class SimpleEvaluator:
     """
     A simple evaluator for RAG systems.
@@ -11,6 +37,7 @@ class SimpleEvaluator:
             'generation': [],
             'system': []
         }
+        self.spans = []
 
     def evaluate_retrieval(self, retrieved_docs, relevant_docs, k=5):
         """
@@ -74,11 +101,16 @@ class SimpleEvaluator:
             'error_rate': error_rate
         }
         self.results['system'].append(system_metrics)
+        self.spans.append((start_time, end_time))
         return system_metrics
 
     def generate_report(self):
         """
         Generates a summary report of all evaluations.
+
+        Metrics are averaged per category. The system category also gets
+        response time percentiles and the throughput: operations per second over
+        the span from the first start to the last end.
         """
         report = defaultdict(lambda: defaultdict(float))
 
@@ -96,4 +128,11 @@ class SimpleEvaluator:
             for key in metrics:
                 report[category][key] /= num_samples
 
+        if self.spans:
+            summary = latency_summary([end - start for start, end in self.spans])
+            for key in ('p50_ms', 'p95_ms', 'p99_ms', 'max_ms'):
+                report['system'][f'response_time_{key}'] = summary[key]
+            wall = max(end for _, end in self.spans) - min(start for start, _ in self.spans)
+            report['system']['throughput'] = len(self.spans) / wall if wall > 0 else 0.0
+
         return dict(report)
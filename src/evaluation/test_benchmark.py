@@ -0,0 +1,41 @@
+import unittest
+
+from src.evaluation.benchmark import bench_query_load, bench_search, compare, flatten, synthetic_corpus
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_synthetic_corpus_is_deterministic(self):
+        self.assertEqual(synthetic_corpus(3, seed=1), synthetic_corpus(3, seed=1))
+        self.assertEqual(len(synthetic_corpus(3)[0].split()), 200)
+
+    def test_bench_search(self):
+        results = bench_search(500, dim=16, n_queries=20, limit=5)
+        for key in ("upsert_per_s", "qps", "p50_ms", "p95_ms", "p99_ms", "batch_qps"):
+            self.assertGreater(results[key], 0)
+        self.assertLessEqual(results["p50_ms"], results["p99_ms"])
+
+    def test_bench_query_load_in_process(self):
+        from src.api import server
+
+        orchestrator = server.rag_orchestrator
+        results = bench_query_load(synthetic_corpus(20, words_per_document=30), ["w1 w2", "w3 w4"] * 5, concurrency=4)
+        self.assertEqual(results["error_rate"], 0.0)
+        self.assertGreater(results["qps"], 0)
+        self.assertIs(server.rag_orchestrator, orchestrator)
+
+    def test_flatten(self):
+        self.assertEqual(flatten({"search": {"1000": {"qps": 5.0}}, "x": 1}), {"search.1000.qps": 5.0, "x": 1})
+
+    def test_compare_flags_regressions_by_direction(self):
+        baseline = {"search": {"qps": 100.0, "p99_ms": 10.0}, "query": {"error_rate": 0.0}}
+        current = {"search": {"qps": 85.0, "p99_ms": 10.5}, "query": {"error_rate": 0.01}}
+        rows = {row["metric"]: row for row in compare(current, baseline, tolerance=0.1)}
+        self.assertTrue(rows["search.qps"].get("regressed"))
+        self.assertFalse(rows["search.p99_ms"]["regressed"])
+        self.assertTrue(rows["query.error_rate"]["regressed"])
+
+        rows = {row["metric"]: row for row in compare(baseline, current, tolerance=0.1)}
+        self.assertFalse(any(row["regressed"] for row in rows.values()))
+
+if __name__ == '__main__':
+    unittest.main()
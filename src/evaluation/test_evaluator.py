@@ -1,6 +1,6 @@
 import unittest
 import time
-from src.evaluation.evaluator import SimpleEvaluator
+from src.evaluation.evaluator import SimpleEvaluator, latency_summary
 
 class TestSimpleEvaluator(unittest.TestCase):
 
@@ -60,5 +60,24 @@ class TestSimpleEvaluator(unittest.TestCase):
         self.assertGreater(report['system']['response_time'], 0)
         self.assertAlmostEqual(report['system']['error_rate'], 0.5)
 
+    def test_latency_percentiles_and_throughput(self):
+        # Ten operations of 1..10 ms, back to back over 55 ms.
+        start = 100.0
+        for i in range(1, 11):
+            self.evaluator.measure_system(start, start + i / 1000)
+            start += i / 1000
+        report = self.evaluator.generate_report()
+        self.assertAlmostEqual(report['system']['response_time_p50_ms'], 5.5)
+        self.assertAlmostEqual(report['system']['response_time_max_ms'], 10.0)
+        self.assertLessEqual(report['system']['response_time_p95_ms'], report['system']['response_time_p99_ms'])
+        self.assertAlmostEqual(report['system']['throughput'], 10 / 0.055)
+
+    def test_latency_summary(self):
+        self.assertEqual(latency_summary([]), {'count': 0})
+        summary = latency_summary([0.001, 0.002, 0.003])
+        self.assertEqual(summary['count'], 3)
+        self.assertAlmostEqual(summary['p50_ms'], 2.0)
+        self.assertAlmostEqual(summary['mean_ms'], 2.0)
+
 if __name__ == '__main__':
     unittest.main()
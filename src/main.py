@@ -1,55 +1,80 @@
 import logging
+import os
+import time
+from itertools import chain
+from typing import Optional
 from agents.planning_agent import PlanningAgent
 from agents.retrieval_agent import RetrievalAgent
 from agents.generation_agent import GenerationAgent
 from agents.memory_manager import MemoryManager
+from utils.dag_executor import DAGExecutor, Step, fan_out
+from utils.metrics import span
+from utils.structured_logging import configure_logging
 
-# Configure basic logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
 
 class RAGOrchestrator:
-    def __init__(self):
+    def __init__(self, max_workers: int = 8, memory_path: Optional[str] = None):
         """Initializes all the agents."""
         self.planning_agent = PlanningAgent()
         self.retrieval_agent = RetrievalAgent()
         self.generation_agent = GenerationAgent()
-        self.memory_manager = MemoryManager()
-        logging.info("RAGOrchestrator initialized with all agents.")
+        self.memory_manager = MemoryManager(path=memory_path)
+        self.executor = DAGExecutor(max_workers=max_workers)
+        self.last_timings = {}
+        logger.info("RAGOrchestrator initialized with all agents.")
 
-    def process_query(self, query: str) -> str:
+    def process_query(self, query: str, session_id: Optional[str] = None) -> str:
         """
         Processes a user query by coordinating the agents.
-        1. Planning agent analyzes query.
-        2. Retrieval agent gets relevant docs.
-        3. Generation agent creates response.
-        4. Memory manager stores interaction.
+        1. Planning agent splits the query into sub-queries.
+        2. Retrieval agent gets relevant docs for every sub-query, concurrently.
+        3. Generation agent creates response from the merged docs.
+        4. Memory manager stores interaction in the background.
+
+        The per-stage latency breakdown (ms) is kept in `last_timings`.
         """
-        logging.info(f"Processing query: '{query}'")
+        logger.info("Processing query.", extra={"query": query, "session_id": session_id})
+        start = time.perf_counter()
         try:
-            # 1. Planning agent analyzes query
-            plan = self.planning_agent.analyze_query(query)
-            logging.info(f"Plan created: {plan}")
-
-            # 2. Retrieval agent gets relevant docs
-            documents = self.retrieval_agent.retrieve_documents(plan)
-            logging.info(f"Documents retrieved: {documents}")
+            # 1. Planning agent splits the query; the sub-queries are the plan retrieval follows
+            planned = self.executor.run({"decompose": Step(lambda: self.planning_agent.decompose(query))})
+            sub_queries = planned.results["decompose"]
+            logger.debug("Plan created.", extra={"sub_queries": sub_queries})
 
-            # 3. Generation agent creates response
-            response = self.generation_agent.generate_response(documents, query)
-            logging.info(f"Response generated: {response}")
+            # 2. Retrieval agent gets relevant docs, one step per sub-query
+            # 3. Generation agent creates response once every retrieval is done
+            retrievals = fan_out("retrieve", self.retrieval_agent.retrieve_documents, sub_queries)
+            steps = dict(retrievals)
+            steps["generate"] = Step(
+                lambda *documents: self.generation_agent.generate_response(
+                    list(dict.fromkeys(chain.from_iterable(documents))), query),
+                tuple(retrievals),
+            )
+            answered = self.executor.run(steps)
+            response = answered.results["generate"]
+            logger.debug("Response generated.", extra={"response": response})
 
-            # 4. Memory manager stores interaction
-            self.memory_manager.store_interaction(query, response)
-            logging.info("Interaction stored in memory.")
+            # 4. Memory manager stores interaction, off the critical path
+            self.executor.submit_background("store", self._store_interaction, query, response, session_id)
 
+            self.last_timings = {**planned.timings, **answered.timings,
+                                 "total": 1000 * (time.perf_counter() - start)}
+            logger.info("Query processed.", extra={"timings_ms": self.last_timings})
             return response
         except Exception as e:
-            logging.error(f"An error occurred during query processing: {e}", exc_info=True)
+            logger.error("An error occurred during query processing: %s", e, exc_info=True)
             return "I'm sorry, but I encountered an error while processing your request."
 
+    def _store_interaction(self, query: str, response: str, session_id: Optional[str]):
+        with span("memory_write"):
+            self.memory_manager.store_interaction(query, response, session_id)
+
 if __name__ == "__main__":
     """A simple command-line interface for testing the RAG orchestrator."""
-    orchestrator = RAGOrchestrator()
+    configure_logging(level=os.environ.get("LOG_LEVEL", "INFO"),
+                      sample_rate=float(os.environ.get("LOG_SAMPLE_RATE", 1.0)))
+    orchestrator = RAGOrchestrator(memory_path=os.environ.get("MEMORY_LOG_PATH"))
     print("RAG Orchestrator CLI is running. Type 'exit' to quit.")
 
     while True:
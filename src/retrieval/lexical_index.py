@@ -0,0 +1,219 @@
+import math
+import re
+import threading
+from array import array
+from collections import Counter
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Words, plus identifiers such as error codes joined by '-', '.', ':' or '/'.
+_WORD = re.compile(r"\w+")
+_COMPOUND = re.compile(r"\w+(?:[-.:/]\w+)+")
+_MAX_TF = 65535
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lower-cased word tokens of `text`. Compound identifiers such as 'ERR-1042' or
+    'pkg.module' are kept whole in addition to their parts, so exact-identifier
+    queries rank documents that contain the identifier above ones that only
+    contain its parts.
+    """
+    text = text.lower()
+    return _WORD.findall(text) + _COMPOUND.findall(text)
+
+
+class LexicalIndex:
+    """
+    An in-memory BM25 inverted index that grows incrementally.
+
+    Each term has a postings list of document ordinals and term frequencies, stored
+    in compact `array` buffers (4 + 2 bytes per posting) that are appended to as
+    documents arrive and scored as NumPy views without copying. A query only
+    touches the postings of its own terms, and common terms are pruned when they
+    cannot change the top results, so searches over a million documents with at
+    least one selective term take well under a millisecond. Queries made only of
+    very common terms cost time proportional to their postings.
+
+    Adding a document with an id that is already indexed replaces it; replaced and
+    removed documents stay in the postings but are skipped at search time, and
+    document frequencies only count live documents.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._terms: Dict[str, int] = {}
+        self._postings: List[array] = []
+        self._frequencies: List[array] = []
+        # Live documents per term, and each document's terms so removing it can lower them.
+        self._df = array("I")
+        self._doc_terms: List[Optional[array]] = []
+        self._lengths = array("I")
+        self._deleted = bytearray()
+        self._ids: List[Hashable] = []
+        self._ordinals: Dict[Hashable, int] = {}
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._ordinals)
+
+    def add(self, texts: Iterable[str], ids: Optional[Iterable[Hashable]] = None) -> List[Hashable]:
+        """
+        Indexes `texts` under `ids` (their running ordinals by default) and returns the ids.
+        """
+        texts = list(texts)
+        ids = list(ids) if ids is not None else list(range(len(self._ids), len(self._ids) + len(texts)))
+        if len(ids) != len(texts):
+            raise ValueError("texts and ids must have the same length.")
+
+        with self._lock:
+            for text, doc_id in zip(texts, ids):
+                self._remove(doc_id)
+                ordinal = len(self._ids)
+                self._ids.append(doc_id)
+                self._ordinals[doc_id] = ordinal
+                self._deleted.append(0)
+
+                counts = Counter(tokenize(text))
+                length = sum(counts.values())
+                self._lengths.append(length)
+                self._total_length += length
+                terms = array("I")
+                for term, count in counts.items():
+                    index = self._terms.get(term)
+                    if index is None:
+                        index = self._terms[term] = len(self._postings)
+                        self._postings.append(array("I"))
+                        self._frequencies.append(array("H"))
+                        self._df.append(0)
+                    self._postings[index].append(ordinal)
+                    self._frequencies[index].append(min(count, _MAX_TF))
+                    self._df[index] += 1
+                    terms.append(index)
+                self._doc_terms.append(terms)
+        return ids
+
+    def remove(self, ids: Iterable[Hashable]):
+        """Removes documents from the index; unknown ids are ignored."""
+        with self._lock:
+            for doc_id in ids:
+                self._remove(doc_id)
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[Hashable, float]]:
+        """
+        Returns up to `limit` (id, BM25 score) pairs for `query`, best first.
+
+        Terms are merged from the most to the least selective. Once the documents
+        found so far hold a top `limit` that the remaining terms could not beat on
+        their own (MaxScore pruning), those terms only add to the scores of the
+        documents already found instead of adding their whole postings.
+        """
+        with self._lock:
+            count = len(self._ordinals)
+            if count == 0 or limit <= 0:
+                return []
+            terms = self._query_terms(query)
+            if not terms:
+                return []
+            average_length = self._total_length / count
+            lengths = np.frombuffer(self._lengths, dtype=np.uint32)
+
+            # Terms from the rarest up, and the best score the terms from i on can add together.
+            terms.sort(key=lambda term: len(term[0]))
+            bounds = np.cumsum([idf * (self.k1 + 1) for _, _, idf in reversed(terms)])[::-1]
+
+            ordinals = np.empty(0, dtype=np.int64)
+            scores = np.empty(0, dtype=np.float64)
+            for i, (postings, frequencies, idf) in enumerate(terms):
+                if len(scores) >= limit and np.partition(scores, len(scores) - limit)[len(scores) - limit] >= bounds[i]:
+                    for postings, frequencies, idf in terms[i:]:
+                        # Postings are in ordinal order, so the found documents are a binary search away.
+                        positions = np.minimum(np.searchsorted(postings, ordinals), len(postings) - 1)
+                        found = postings[positions] == ordinals
+                        positions = positions[found]
+                        scores[found] += self._scores(postings[positions], frequencies[positions], idf,
+                                                      lengths, average_length)
+                    break
+                term_scores = self._scores(postings, frequencies, idf, lengths, average_length)
+                if len(ordinals):
+                    ordinals, scores = self._combine([ordinals, postings], [scores, term_scores])
+                else:
+                    ordinals, scores = postings.astype(np.int64), term_scores
+                if len(self._ordinals) < len(self._ids):
+                    live = np.frombuffer(self._deleted, dtype=np.uint8)[ordinals] == 0
+                    ordinals, scores = ordinals[live], scores[live]
+
+            if len(scores) > limit:
+                top = np.argpartition(-scores, limit - 1)[:limit]
+                ordinals, scores = ordinals[top], scores[top]
+            order = np.argsort(-scores, kind="stable")
+            return [(self._ids[ordinals[i]], float(scores[i])) for i in order]
+
+    def _query_terms(self, query):
+        """
+        The indexed terms of `query` as (postings, frequencies, idf). The parts of a
+        compound identifier that is itself indexed are dropped, so 'ERR-1042' is
+        matched exactly rather than through the very common 'err'.
+        """
+        tokens = set(tokenize(query))
+        for compound in _COMPOUND.findall(query.lower()):
+            if compound in self._terms:
+                tokens.difference_update(_WORD.findall(compound))
+                tokens.add(compound)
+
+        count = len(self._ordinals)
+        terms = []
+        for term in tokens:
+            index = self._terms.get(term)
+            if index is not None:
+                postings = np.frombuffer(self._postings[index], dtype=np.uint32)
+                frequencies = np.frombuffer(self._frequencies[index], dtype=np.uint16)
+                df = self._df[index]
+                idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                terms.append((postings, frequencies, idf))
+        return terms
+
+    def _scores(self, ordinals, frequencies, idf, lengths, average_length):
+        """BM25 contributions of one term to the documents at `ordinals`."""
+        frequencies = frequencies.astype(np.float64)
+        norm = self.k1 * (1 - self.b + self.b * lengths[ordinals] / average_length)
+        return idf * frequencies * (self.k1 + 1) / (frequencies + norm)
+
+    def _combine(self, ordinals, scores):
+        """Sums the per-term scores of every document."""
+        ordinals = np.concatenate(ordinals)
+        scores = np.concatenate(scores)
+        if len(ordinals) * 8 > len(self._ids):
+            # Dense enough that one pass over all documents beats sorting the postings.
+            totals = np.bincount(ordinals, weights=scores, minlength=len(self._ids))
+            matched = np.flatnonzero(totals)
+            return matched, totals[matched]
+        matched, inverse = np.unique(ordinals, return_inverse=True)
+        return matched.astype(np.int64), np.bincount(inverse, weights=scores)
+
+    def _remove(self, doc_id):
+        ordinal = self._ordinals.pop(doc_id, None)
+        if ordinal is not None:
+            self._deleted[ordinal] = 1
+            self._total_length -= self._lengths[ordinal]
+            for index in self._doc_terms[ordinal]:
+                self._df[index] -= 1
+            self._doc_terms[ordinal] = None
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Hashable]], k: int = 60,
+                           limit: Optional[int] = None) -> List[Tuple[Hashable, float]]:
+    """
+    Fuses ranked id lists: every id scores the sum of 1 / (k + rank) over the
+    rankings it appears in (rank starting at 1). Returns (id, score) pairs, best
+    first, ties kept in order of first appearance.
+    """
+    scores: Dict[Any, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    fused = sorted(scores.items(), key=lambda item: -item[1])
+    return fused[:limit] if limit is not None else fused
@@ -0,0 +1,219 @@
+import hashlib
+import heapq
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Dict, List, Optional
+
+from qdrant_client.http import models
+
+from .vector_store import QdrantClient
+
+logger = logging.getLogger(__name__)
+
+
+def _weight(shard: str, key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(f"{shard}\0{key}".encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _point_key(point_id) -> str:
+    """`point_id` as Qdrant reports it back, so routing by id is stable across a round trip."""
+    if isinstance(point_id, int):
+        return str(point_id)
+    try:
+        return str(uuid.UUID(str(point_id)))
+    except ValueError:
+        return str(point_id)
+
+
+def rendezvous(shards: List[str], key: str, count: int = 1) -> List[str]:
+    """
+    The `count` shards that own `key` under rendezvous (highest random weight)
+    hashing, best first. Adding a shard only moves the keys the new shard wins,
+    about 1 / (number of shards) of them, and removing one only moves its own.
+    """
+    return heapq.nlargest(count, shards, key=lambda shard: _weight(shard, str(key)))
+
+
+class ShardedCollection:
+    """
+    A logical collection split over several Qdrant collections ("shards").
+
+    Documents with a `tenant_field` in their metadata are routed by tenant: each
+    tenant lives on its `shards_per_tenant` rendezvous shards (spread over them by
+    point id), so its queries only touch those shards, and a large tenant can be
+    given more than one shard instead of becoming a hotspot. Documents without a
+    tenant are spread over all shards by point id.
+
+    Searches are sent to every relevant shard concurrently, on a thread pool
+    created on first use and shut down by `close` (or leaving a `with` block),
+    and the per-shard top hits, already sorted by score, are merged with a heap. Adding shards with
+    `add_shards` and moving the points they now own with `rebalance` grows ingest
+    and query capacity; with rendezvous hashing only those points move.
+    """
+
+    def __init__(self, client: QdrantClient, name: str, n_shards: int = 4, tenant_field: str = "tenant",
+                 shards_per_tenant: int = 1, max_workers: Optional[int] = None):
+        if n_shards <= 0 or shards_per_tenant <= 0:
+            raise ValueError("n_shards and shards_per_tenant must be positive integers.")
+        self.client = client
+        self.name = name
+        self.tenant_field = tenant_field
+        self.shards_per_tenant = shards_per_tenant
+        self.shards = [self._shard_name(i) for i in range(n_shards)]
+        self._collection = None
+        self.max_workers = max_workers or 16
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _shard_name(self, i: int) -> str:
+        return f"{self.name}_shard_{i:03d}"
+
+    def create(self, vector_size: int, quantization: str = None, indexed_fields: Dict[str, str] = None):
+        """Creates the shard collections that do not exist yet, with the tenant field indexed."""
+        indexed_fields = {self.tenant_field: "keyword", **(indexed_fields or {})}
+        self._map(lambda shard: self.client.create_collection(shard, vector_size, quantization=quantization,
+                                                              indexed_fields=indexed_fields), self.shards)
+        self._collection = (vector_size, quantization, indexed_fields)
+
+    def shard_for(self, point_id, tenant=None) -> str:
+        """The shard that stores the point `point_id` of `tenant`."""
+        if tenant is None:
+            return rendezvous(self.shards, _point_key(point_id))[0]
+        owners = self.shards_for_tenant(tenant)
+        return owners[0] if len(owners) == 1 else rendezvous(owners, _point_key(point_id))[0]
+
+    def shards_for_tenant(self, tenant) -> List[str]:
+        return rendezvous(self.shards, f"tenant:{tenant}", min(self.shards_per_tenant, len(self.shards)))
+
+    def add_documents(self, docs: List[str], embeddings: List[List[float]], metadata: List[dict],
+                      ids: List[str] = None) -> List[str]:
+        """
+        Routes documents to their shards and upserts every shard's share
+        concurrently. Returns the point ids (random UUIDs unless given).
+        """
+        if ids is None:
+            ids = [str(uuid.uuid4()) for _ in docs]
+        if not len(docs) == len(embeddings) == len(metadata) == len(ids):
+            raise ValueError("The lengths of docs, embeddings, metadata and ids must be the same.")
+
+        batches: Dict[str, List[tuple]] = {}
+        for item in zip(docs, embeddings, metadata, ids):
+            batches.setdefault(self.shard_for(item[3], item[2].get(self.tenant_field)), []).append(item)
+
+        def upsert(shard):
+            docs, embeddings, metadata, ids = map(list, zip(*batches[shard]))
+            self.client.add_documents(shard, docs, embeddings, metadata, ids=ids)
+
+        self._map(upsert, list(batches))
+        return ids
+
+    def delete_points(self, ids: List[str]):
+        """Deletes points by id from every shard."""
+        self._map(lambda shard: self.client.delete_points(shard, ids), self.shards)
+
+    def search(self, query_vector: List[float], limit: int = 10, score_threshold: float = 0.7,
+               filters: dict = None, tenant=None) -> list:
+        """
+        Searches the shards that can hold matches and returns the best `limit`
+        hits overall. With a `tenant` (or a filter on the tenant field) only that
+        tenant's shards are searched, and only its points are returned.
+        """
+        shards, filters = self._route(filters, tenant)
+        results = self._map(lambda shard: self.client.search(shard, query_vector, limit=limit,
+                                                             score_threshold=score_threshold, filters=filters),
+                            shards)
+        return self._merge(results, limit)
+
+    def search_many(self, query_vectors: List[List[float]], limit: int = 10, score_threshold: float = 0.7,
+                    filters: dict = None, tenant=None) -> List[list]:
+        """Batched version of `search`: one batched request per shard, one hit list per query."""
+        shards, filters = self._route(filters, tenant)
+        results = self._map(lambda shard: self.client.search_many(shard, query_vectors, limit=limit,
+                                                                  score_threshold=score_threshold,
+                                                                  filters=filters), shards)
+        return [self._merge(per_shard, limit) for per_shard in zip(*results)]
+
+    def add_shards(self, count: int = 1) -> List[str]:
+        """
+        Adds `count` shards (created like the existing ones) and returns their names.
+        Points whose owner changed stay where they are until `rebalance` moves
+        them; call it before searching by tenant again.
+        """
+        if self._collection is None:
+            raise ValueError("Call create() before adding shards.")
+        added = [self._shard_name(i) for i in range(len(self.shards), len(self.shards) + count)]
+        self.shards.extend(added)
+        vector_size, quantization, indexed_fields = self._collection
+        self._map(lambda shard: self.client.create_collection(shard, vector_size, quantization=quantization,
+                                                              indexed_fields=indexed_fields), added)
+        return added
+
+    def rebalance(self, batch_size: int = 256) -> int:
+        """
+        Moves every point that is not on the shard it is routed to. Shards are
+        scanned one at a time, so no shard is read while points are moved into it.
+        Returns the number of points moved.
+        """
+        def move(shard):
+            moved, offset = 0, None
+            while True:
+                points, offset = self.client.scroll_points(shard, limit=batch_size, offset=offset, with_vectors=True)
+                targets: Dict[str, list] = {}
+                for point in points:
+                    target = self.shard_for(point.id, (point.payload or {}).get(self.tenant_field))
+                    if target != shard:
+                        targets.setdefault(target, []).append(point)
+                for target, batch in targets.items():
+                    self.client.upsert_points(target, batch)
+                    self.client.delete_points(shard, [point.id for point in batch])
+                    moved += len(batch)
+                if offset is None:
+                    return moved
+
+        moved = sum(move(shard) for shard in list(self.shards))
+        logger.info("Rebalanced shards.", extra={"collection": self.name, "moved": moved})
+        return moved
+
+    def close(self):
+        """Shuts the thread pool down; a later call starts a new one."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _route(self, filters, tenant):
+        """The shards to search and the filter to send them: a filter spec or a models.Filter."""
+        if tenant is None and isinstance(filters, dict) and not isinstance(filters.get(self.tenant_field), dict):
+            tenant = filters.get(self.tenant_field)
+        if tenant is None:
+            return self.shards, filters
+        if isinstance(filters, models.Filter):
+            must = filters.must if isinstance(filters.must, list) else [filters.must] if filters.must else []
+            condition = models.FieldCondition(key=self.tenant_field, match=models.MatchValue(value=tenant))
+            return self.shards_for_tenant(tenant), filters.model_copy(update={"must": [*must, condition]})
+        return self.shards_for_tenant(tenant), {**(filters or {}), self.tenant_field: tenant}
+
+    def _map(self, func, shards: List[str]) -> List[Any]:
+        """Runs `func(shard)` for every shard concurrently; results in shard order."""
+        if len(shards) == 1:
+            return [func(shards[0])]
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix=f"shard-{self.name}")
+            executor = self._executor
+        return list(executor.map(func, shards))
+
+    @staticmethod
+    def _merge(results: List[list], limit: int) -> list:
+        """The best `limit` hits of per-shard hit lists that are each sorted by decreasing score."""
+        return list(islice(heapq.merge(*results, key=lambda hit: -hit.score), limit))
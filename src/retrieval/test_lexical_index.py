@@ -0,0 +1,108 @@
+import math
+import unittest
+
+from src.retrieval.lexical_index import LexicalIndex, reciprocal_rank_fusion, tokenize
+
+class TestLexicalIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = LexicalIndex()
+        self.index.add([
+            "The deploy failed with error ERR-1042 on node 7.",
+            "ERR-2001 means the disk is full.",
+            "Retry the deploy after clearing the cache.",
+            "The cache is warm.",
+        ], ids=["a", "b", "c", "d"])
+
+    def test_tokenize_keeps_identifiers(self):
+        self.assertEqual(tokenize("See ERR-1042 in pkg.module"),
+                         ["see", "err", "1042", "in", "pkg", "module", "err-1042", "pkg.module"])
+
+    def test_exact_identifier_hits(self):
+        results = self.index.search("what is ERR-2001?")
+        self.assertEqual(results[0][0], "b")
+        # 'err' alone is not searched for, so the other error code does not match.
+        self.assertNotIn("a", [doc_id for doc_id, _ in results])
+
+    def test_scores_are_ranked(self):
+        results = self.index.search("deploy cache")
+        self.assertEqual(results[0][0], "c")
+        scores = [score for _, score in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual({doc_id for doc_id, _ in results}, {"a", "c", "d"})
+
+    def test_limit_and_unknown_terms(self):
+        self.assertEqual(len(self.index.search("the", limit=2)), 2)
+        self.assertEqual(self.index.search("nothing matches"), [])
+        self.assertEqual(self.index.search("deploy", limit=0), [])
+
+    def test_incremental_add_replace_and_remove(self):
+        self.index.add(["ERR-2001 is fixed."], ids=["b"])
+        self.index.add(["Another ERR-2001 report."], ids=["e"])
+        self.assertEqual(len(self.index), 5)
+        self.assertEqual({doc_id for doc_id, _ in self.index.search("ERR-2001")}, {"b", "e"})
+
+        self.index.remove(["b", "unknown"])
+        self.assertEqual([doc_id for doc_id, _ in self.index.search("ERR-2001")], ["e"])
+        self.assertEqual(self.index.search("disk full"), [])
+
+    def test_pruned_search_matches_full_scoring(self):
+        index = LexicalIndex()
+        docs = [f"common filler words doc{i} " + ("rare " if i % 50 == 0 else "") for i in range(1000)]
+        index.add(docs)
+        pruned = index.search("rare common filler", limit=5)
+        full = index.search("rare common filler", limit=1000)[:5]
+        self.assertEqual(pruned, full)
+
+    def test_replace_and_remove_match_brute_force(self):
+        live = {"a": "The deploy failed with error ERR-1042 on node 7.",
+                "b": "ERR-2001 means the disk is full.",
+                "c": "Retry the deploy after clearing the cache.",
+                "d": "The cache is warm."}
+        for i in range(5):
+            live["a"] = f"The deploy failed again, attempt {i}."
+            self.index.add([live["a"]], ids=["a"])
+        self.index.add(["Another deploy report.", "A cache miss."], ids=["e", "f"])
+        live.update(e="Another deploy report.", f="A cache miss.")
+        self.index.remove(["b", "f"])
+        del live["b"], live["f"]
+
+        for query in ("deploy", "the cache", "failed attempt", "ERR-1042 node"):
+            expected = self.brute_force(live, query)
+            results = self.index.search(query, limit=10)
+            self.assertEqual([doc_id for doc_id, _ in results], [doc_id for doc_id, _ in expected])
+            for (_, score), (_, expected_score) in zip(results, expected):
+                self.assertAlmostEqual(score, expected_score)
+
+    def brute_force(self, documents, query):
+        """BM25 computed from scratch over the live documents."""
+        k1, b = self.index.k1, self.index.b
+        tokens = {doc_id: tokenize(text) for doc_id, text in documents.items()}
+        average_length = sum(map(len, tokens.values())) / len(tokens)
+        terms = set(tokenize(query))
+        for compound in [t for t in terms if "-" in t]:
+            if any(compound in doc_tokens for doc_tokens in tokens.values()):
+                terms.difference_update(compound.split("-"))
+        scores = {}
+        for term in terms:
+            df = sum(term in doc_tokens for doc_tokens in tokens.values())
+            idf = math.log(1 + (len(tokens) - df + 0.5) / (df + 0.5))
+            for doc_id, doc_tokens in tokens.items():
+                tf = doc_tokens.count(term)
+                if tf:
+                    norm = k1 * (1 - b + b * len(doc_tokens) / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: -item[1])
+
+    def test_mismatched_ids(self):
+        with self.assertRaises(ValueError):
+            self.index.add(["one", "two"], ids=["x"])
+
+    def test_reciprocal_rank_fusion(self):
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]], k=60)
+        self.assertEqual([doc_id for doc_id, _ in fused], ["a", "c", "b"])
+        self.assertAlmostEqual(fused[0][1], 1 / 61 + 1 / 62)
+        self.assertEqual(len(reciprocal_rank_fusion([["a", "b", "c"]], limit=2)), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import unittest
+from collections import Counter
+from unittest.mock import patch
+
+import numpy as np
+from qdrant_client import QdrantClient as LocalQdrant
+from qdrant_client.http import models
+
+# Set dummy environment variables for testing
+os.environ["QDRANT_URL"] = "http://localhost:6333"
+os.environ["QDRANT_API_KEY"] = "test_key"
+
+from src.retrieval.sharding import ShardedCollection, rendezvous
+from src.retrieval.vector_store import QdrantClient
+
+class TestShardedCollection(unittest.TestCase):
+
+    def setUp(self):
+        # Every shard lives in one in-process Qdrant instance.
+        patcher = patch('src.retrieval.vector_store.QC', side_effect=lambda **kwargs: LocalQdrant(":memory:"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = QdrantClient()
+        self.sharded = ShardedCollection(self.client, "docs", n_shards=4)
+        self.addCleanup(self.sharded.close)
+        self.sharded.create(8)
+
+        rng = np.random.default_rng(0)
+        self.vectors = rng.standard_normal((200, 8)).astype(np.float32)
+        self.vectors /= np.linalg.norm(self.vectors, axis=1, keepdims=True)
+        self.metadata = [{"tenant": f"t{i % 5}", "n": i} for i in range(200)]
+        self.ids = self.sharded.add_documents([f"doc {i}" for i in range(200)], self.vectors.tolist(),
+                                              self.metadata, ids=list(range(200)))
+
+    def count(self, shard):
+        return self.client.client.count(collection_name=shard).count
+
+    def exact(self, query, limit, allowed=range(200)):
+        allowed = np.array(list(allowed))
+        scores = self.vectors[allowed] @ query
+        return allowed[np.argsort(-scores)[:limit]].tolist()
+
+    def test_tenants_live_on_one_shard(self):
+        for tenant in ("t0", "t3"):
+            [owner] = self.sharded.shards_for_tenant(tenant)
+            self.assertEqual(self.sharded.shard_for(0, tenant), owner)
+        self.assertEqual(sum(self.count(shard) for shard in self.sharded.shards), 200)
+
+    def test_search_merges_all_shards(self):
+        for query in self.vectors[:5]:
+            hits = self.sharded.search(query.tolist(), limit=10, score_threshold=-1.0)
+            self.assertEqual([hit.id for hit in hits], self.exact(query, 10))
+            self.assertEqual([hit.score for hit in hits], sorted((hit.score for hit in hits), reverse=True))
+
+    def test_tenant_search_only_returns_tenant_points(self):
+        allowed = [i for i, meta in enumerate(self.metadata) if meta["tenant"] == "t2"]
+        with patch.object(self.client, 'search', wraps=self.client.search) as search:
+            hits = self.sharded.search(self.vectors[7].tolist(), limit=5, score_threshold=-1.0, tenant="t2")
+        self.assertEqual(search.call_count, 1)
+        self.assertEqual([hit.id for hit in hits], self.exact(self.vectors[7], 5, allowed))
+
+        by_filter = self.sharded.search(self.vectors[7].tolist(), limit=5, score_threshold=-1.0,
+                                        filters={"tenant": "t2"})
+        self.assertEqual([hit.id for hit in by_filter], [hit.id for hit in hits])
+
+    def test_tenant_search_with_qdrant_filter(self):
+        allowed = [i for i, meta in enumerate(self.metadata) if meta["tenant"] == "t2" and meta["n"] < 100]
+        filters = models.Filter(must=[models.FieldCondition(key="n", range=models.Range(lt=100))])
+        hits = self.sharded.search(self.vectors[7].tolist(), limit=5, score_threshold=-1.0, filters=filters,
+                                   tenant="t2")
+        self.assertEqual([hit.id for hit in hits], self.exact(self.vectors[7], 5, allowed))
+
+    def test_search_many_matches_search(self):
+        queries = self.vectors[:3].tolist()
+        batched = self.sharded.search_many(queries, limit=4, score_threshold=-1.0, filters={"n": {"lt": 100}})
+        for query, hits in zip(queries, batched):
+            single = self.sharded.search(query, limit=4, score_threshold=-1.0, filters={"n": {"lt": 100}})
+            self.assertEqual([hit.id for hit in hits], [hit.id for hit in single])
+
+    def test_add_shards_and_rebalance(self):
+        added = self.sharded.add_shards(2)
+        moved = self.sharded.rebalance(batch_size=32)
+
+        self.assertEqual(sum(self.count(shard) for shard in self.sharded.shards), 200)
+        self.assertEqual(moved, sum(self.count(shard) for shard in added))
+        for tenant in ("t0", "t1", "t2", "t3", "t4"):
+            hits = self.sharded.search(self.vectors[0].tolist(), limit=200, score_threshold=-1.0, tenant=tenant)
+            self.assertEqual(len(hits), 40)
+
+    def test_rebalance_goes_through_client_methods(self):
+        self.sharded.add_shards(1)
+        with patch.object(self.client, 'upsert_points', wraps=self.client.upsert_points) as upsert_points:
+            moved = self.sharded.rebalance(batch_size=32)
+        self.assertEqual(sum(len(call.args[1]) for call in upsert_points.call_args_list), moved)
+
+    def test_context_manager_shuts_the_pool_down(self):
+        with ShardedCollection(self.client, "docs", n_shards=4) as sharded:
+            sharded.search(self.vectors[0].tolist(), limit=3, score_threshold=-1.0)
+            executor = sharded._executor
+        self.assertIsNotNone(executor)
+        self.assertIsNone(sharded._executor)
+        self.assertTrue(executor._shutdown)
+
+    def test_delete_points(self):
+        self.sharded.delete_points(list(range(100)))
+        self.assertEqual(sum(self.count(shard) for shard in self.sharded.shards), 100)
+
+class TestRendezvous(unittest.TestCase):
+
+    def test_adding_a_shard_only_moves_keys_to_it(self):
+        shards = [f"s{i}" for i in range(4)]
+        keys = [str(i) for i in range(2000)]
+        before = {key: rendezvous(shards, key)[0] for key in keys}
+        after = {key: rendezvous(shards + ["s4"], key)[0] for key in keys}
+        moved = [key for key in keys if before[key] != after[key]]
+        self.assertTrue(all(after[key] == "s4" for key in moved))
+        self.assertAlmostEqual(len(moved) / len(keys), 1 / 5, delta=0.05)
+        self.assertLess(max(Counter(after.values()).values()), 1.3 * len(keys) / 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -18,6 +18,27 @@ class TestQdrantClient(unittest.TestCase):
         self.assertIsNotNone(client)
         mock_qdrant_client.assert_called_with(url="http://localhost:6333", api_key="test_key")
 
+    @patch('src.retrieval.vector_store.QC')
+    def test_instances_share_client(self, mock_qdrant_client):
+        """Test that QdrantClient instances for the same server share one pooled client."""
+        first, second = QdrantClient(), QdrantClient()
+        self.assertIs(first.client, second.client)
+        mock_qdrant_client.assert_called_once()
+
+    @patch('src.retrieval.vector_store.QC')
+    def test_search_retries_transient_errors(self, mock_qdrant_client):
+        """Test that a search is retried after a dropped connection."""
+        mock_client_instance = MagicMock()
+        mock_qdrant_client.return_value = mock_client_instance
+        mock_client_instance.search.side_effect = [ConnectionError("reset"), "search_results"]
+
+        client = QdrantClient()
+        with patch('app.client_registry.time.sleep'):
+            results = client.search("test_collection", [0.1, 0.2])
+
+        self.assertEqual(results, "search_results")
+        self.assertEqual(mock_client_instance.search.call_count, 2)
+
     @patch.dict(os.environ, {"QDRANT_URL": "", "QDRANT_API_KEY": ""})
     def test_init_missing_env_vars(self):
         """Test initialization with missing environment variables."""
@@ -47,9 +68,53 @@ class TestQdrantClient(unittest.TestCase):
         mock_qdrant_client.return_value = mock_client_instance
 
         client = QdrantClient()
-        client.create_collection("test_collection", 128)
+        client.create_collection("test_collection", 128, indexed_fields={"tenant": "keyword"})
 
         mock_client_instance.create_collection.assert_not_called()
+        mock_client_instance.create_payload_index.assert_called_once_with(
+            collection_name="test_collection", field_name="tenant", field_schema=models.PayloadSchemaType.KEYWORD)
+
+    @patch('src.retrieval.vector_store.QC')
+    def test_create_collection_quantized(self, mock_qdrant_client):
+        """Test that create_collection passes a quantization config when requested."""
+        mock_client_instance = MagicMock()
+        mock_client_instance.collection_exists.return_value = False
+        mock_qdrant_client.return_value = mock_client_instance
+
+        client = QdrantClient()
+        client.create_collection("test_collection", 128, quantization="int8")
+
+        args, kwargs = mock_client_instance.create_collection.call_args
+        self.assertIsInstance(kwargs['quantization_config'], models.ScalarQuantization)
+
+    @patch('src.retrieval.vector_store.QC')
+    def test_create_collection_payload_indexes(self, mock_qdrant_client):
+        """Test that create_collection indexes the declared payload fields."""
+        mock_client_instance = MagicMock()
+        mock_client_instance.collection_exists.return_value = False
+        mock_qdrant_client.return_value = mock_client_instance
+
+        client = QdrantClient()
+        client.create_collection("test_collection", 128, indexed_fields={"tenant": "keyword", "year": "integer"})
+
+        mock_client_instance.create_payload_index.assert_any_call(
+            collection_name="test_collection", field_name="tenant", field_schema=models.PayloadSchemaType.KEYWORD)
+        mock_client_instance.create_payload_index.assert_any_call(
+            collection_name="test_collection", field_name="year", field_schema=models.PayloadSchemaType.INTEGER)
+
+    @patch('src.retrieval.vector_store.QC')
+    def test_search_with_filters(self, mock_qdrant_client):
+        """Test that a filter spec is sent as a qdrant filter."""
+        mock_client_instance = MagicMock()
+        mock_qdrant_client.return_value = mock_client_instance
+
+        client = QdrantClient()
+        client.search("test_collection", [0.1, 0.2], filters={"tenant": "acme", "year": {"gte": 2020}})
+
+        args, kwargs = mock_client_instance.search.call_args
+        tenant, year = kwargs['query_filter'].must
+        self.assertEqual(tenant.match.value, "acme")
+        self.assertEqual(year.range.gte, 2020)
 
     @patch('src.retrieval.vector_store.QC')
     def test_add_documents(self, mock_qdrant_client):
@@ -69,6 +134,49 @@ class TestQdrantClient(unittest.TestCase):
         self.assertEqual(kwargs['collection_name'], "test_collection")
         self.assertEqual(len(kwargs['points']), 2)
 
+    @patch('src.retrieval.vector_store.QC')
+    def test_add_documents_with_ids(self, mock_qdrant_client):
+        """Test that add_documents upserts under the given ids."""
+        mock_client_instance = MagicMock()
+        mock_qdrant_client.return_value = mock_client_instance
+
+        client = QdrantClient()
+        ids = ["00000000-0000-0000-0000-000000000001", "00000000-0000-0000-0000-000000000002"]
+        client.add_documents("test_collection", ["doc1", "doc2"], [[0.1, 0.2], [0.3, 0.4]], [{}, {}], ids=ids)
+
+        args, kwargs = mock_client_instance.upsert.call_args
+        self.assertEqual([point.id for point in kwargs['points']], ids)
+
+    @patch('src.retrieval.vector_store.QC')
+    def test_delete_points(self, mock_qdrant_client):
+        """Test that delete_points deletes the given ids."""
+        mock_client_instance = MagicMock()
+        mock_qdrant_client.return_value = mock_client_instance
+
+        client = QdrantClient()
+        client.delete_points("test_collection", ["a", "b"])
+        client.delete_points("test_collection", [])
+
+        mock_client_instance.delete.assert_called_once()
+        args, kwargs = mock_client_instance.delete.call_args
+        self.assertEqual(kwargs['points_selector'].points, ["a", "b"])
+
+    @patch('src.retrieval.vector_store.QC')
+    def test_set_payloads(self, mock_qdrant_client):
+        """Test that set_payloads updates every point in one batched request."""
+        mock_client_instance = MagicMock()
+        mock_qdrant_client.return_value = mock_client_instance
+
+        client = QdrantClient()
+        client.set_payloads("test_collection", {"a": {"chunk_index": 0}, "b": {"chunk_index": 1}})
+        client.set_payloads("test_collection", {})
+
+        mock_client_instance.batch_update_points.assert_called_once()
+        args, kwargs = mock_client_instance.batch_update_points.call_args
+        operations = kwargs['update_operations']
+        self.assertEqual([op.set_payload.points for op in operations], [["a"], ["b"]])
+        self.assertEqual(operations[1].set_payload.payload, {"chunk_index": 1})
+
     @patch('src.retrieval.vector_store.QC')
     def test_search_with_threshold(self, mock_qdrant_client):
         """Test the search method with a score_threshold."""
@@ -87,6 +195,19 @@ class TestQdrantClient(unittest.TestCase):
         )
         self.assertEqual(results, "search_results")
 
+    @patch('src.retrieval.vector_store.QC')
+    def test_search_with_oversampling(self, mock_qdrant_client):
+        """Test that oversampling requests re-scoring of quantized candidates."""
+        mock_client_instance = MagicMock()
+        mock_qdrant_client.return_value = mock_client_instance
+
+        client = QdrantClient()
+        client.search("test_collection", [0.1, 0.2], oversampling=3.0)
+
+        args, kwargs = mock_client_instance.search.call_args
+        self.assertTrue(kwargs['search_params'].quantization.rescore)
+        self.assertEqual(kwargs['search_params'].quantization.oversampling, 3.0)
+
     @patch('src.retrieval.vector_store.QC')
     def test_search_no_results(self, mock_qdrant_client):
         """Test the search method when no results are found."""
@@ -99,6 +220,38 @@ class TestQdrantClient(unittest.TestCase):
 
         self.assertEqual(results, [])
 
+    @patch('src.retrieval.vector_store.QC')
+    def test_search_many_batches_requests(self, mock_qdrant_client):
+        """Test that search_many sends batched requests and keeps results aligned."""
+        mock_client_instance = MagicMock()
+        mock_qdrant_client.return_value = mock_client_instance
+        mock_client_instance.search_batch.side_effect = lambda collection_name, requests: [
+            [f"hit for {r.vector[0]}"] for r in requests
+        ]
+
+        client = QdrantClient()
+        queries = [[float(i), 0.0] for i in range(5)]
+        results = client.search_many("test_collection", queries, limit=3, batch_size=2)
+
+        self.assertEqual(mock_client_instance.search_batch.call_count, 3)
+        self.assertEqual(results, [[f"hit for {float(i)}"] for i in range(5)])
+        args, kwargs = mock_client_instance.search_batch.call_args_list[0]
+        self.assertEqual(kwargs['collection_name'], "test_collection")
+        self.assertEqual(kwargs['requests'][0].limit, 3)
+        self.assertEqual(kwargs['requests'][0].score_threshold, 0.7)
+
+    @patch('src.retrieval.vector_store.QC')
+    def test_search_many_error_keeps_alignment(self, mock_qdrant_client):
+        """Test that a failed batch yields empty results for its queries."""
+        mock_client_instance = MagicMock()
+        mock_qdrant_client.return_value = mock_client_instance
+        mock_client_instance.search_batch.side_effect = Exception("boom")
+
+        client = QdrantClient()
+        results = client.search_many("test_collection", [[0.1, 0.2], [0.3, 0.4]])
+
+        self.assertEqual(results, [[], []])
+
     @patch('src.retrieval.vector_store.QC')
     def test_delete_collection(self, mock_qdrant_client):
         """Test the delete_collection method."""
@@ -0,0 +1,121 @@
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Step(NamedTuple):
+    func: Callable[..., Any]
+    depends_on: Tuple[str, ...] = ()
+
+
+class DAGResult(NamedTuple):
+    results: Dict[str, Any]
+    timings: Dict[str, float]
+
+
+class DAGExecutor:
+    """
+    Runs a graph of named steps on a thread pool, each as soon as its dependencies are done.
+
+    A step is a function plus the names of the steps it depends on; it is called
+    with their results as positional arguments, in `depends_on` order. Independent
+    steps run concurrently. `run` records how long every step took, in
+    milliseconds, so callers can report a per-stage latency breakdown.
+
+    `submit_background` runs work off the critical path: the caller does not wait
+    for it, and errors are logged instead of raised.
+    """
+
+    def __init__(self, max_workers: int = 8):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dag")
+        self._lock = threading.Lock()
+        self._background: List[Future] = []
+        self.background_timings: Dict[str, float] = {}
+
+    def run(self, steps: Dict[str, Step]) -> DAGResult:
+        """
+        Runs `steps` and returns the result and duration (ms) of every step.
+
+        Raises ValueError for unknown dependencies or cycles. If a step raises,
+        steps that have not started are cancelled and the exception is re-raised.
+        """
+        steps = {name: Step(*step) if not isinstance(step, Step) else step for name, step in steps.items()}
+        self._check(steps)
+
+        results: Dict[str, Any] = {}
+        timings: Dict[str, float] = {}
+        waiting = dict(steps)
+        running: Dict[Future, str] = {}
+        try:
+            while waiting or running:
+                for name, step in list(waiting.items()):
+                    if all(dep in results for dep in step.depends_on):
+                        args = [results[dep] for dep in step.depends_on]
+                        running[self._pool.submit(self._timed, step.func, args)] = name
+                        del waiting[name]
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name], timings[name] = future.result()
+        except BaseException:
+            for future in running:
+                future.cancel()
+            raise
+        return DAGResult(results, timings)
+
+    def submit_background(self, name: str, func: Callable[..., Any], *args) -> Future:
+        """Runs `func(*args)` without waiting for it; its duration is kept in `background_timings`."""
+        def task():
+            try:
+                _, elapsed = self._timed(func, args)
+                self.background_timings[name] = elapsed
+            except Exception:
+                logger.exception("Background step '%s' failed.", name)
+
+        future = self._pool.submit(task)
+        with self._lock:
+            self._background = [f for f in self._background if not f.done()]
+            self._background.append(future)
+        return future
+
+    def wait_background(self, timeout: Optional[float] = None):
+        """Blocks until all background work submitted so far has finished."""
+        with self._lock:
+            pending = list(self._background)
+        wait(pending, timeout=timeout)
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
+
+    @staticmethod
+    def _timed(func, args):
+        start = time.perf_counter()
+        result = func(*args)
+        return result, 1000 * (time.perf_counter() - start)
+
+    @staticmethod
+    def _check(steps: Dict[str, Step]):
+        for name, step in steps.items():
+            unknown = [dep for dep in step.depends_on if dep not in steps]
+            if unknown:
+                raise ValueError(f"Step '{name}' depends on unknown steps: {unknown}")
+
+        # Kahn's algorithm: every step must be reachable without a cycle.
+        remaining = {name: set(step.depends_on) for name, step in steps.items()}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Steps form a cycle: {sorted(remaining)}")
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+
+def fan_out(name: str, func: Callable[[Any], Any], items: Iterable[Any]) -> Dict[str, Step]:
+    """Builds one independent step `name[i]` per item, calling `func(item)`."""
+    return {f"{name}[{i}]": Step(lambda item=item: func(item)) for i, item in enumerate(items)}
@@ -1,11 +1,33 @@
 import os
-from typing import List, Dict, Any
+import re
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List, Dict, Any, Iterator, NamedTuple, Tuple
+
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+
+class Chunk(NamedTuple):
+    """A chunk of text together with its character offsets in the source."""
+    text: str
+    start: int
+    end: int
+
 
 class DocumentProcessor:
     """
     A class to process text documents, including loading, chunking, and metadata extraction.
     """
 
+    allowed_extensions = ['.txt', '.md']
+
+    def _validate_path(self, filepath: str):
+        if not os.path.exists(filepath):
+            raise FileNotFoundError(f"File not found: {filepath}")
+
+        if not any(filepath.endswith(ext) for ext in self.allowed_extensions):
+            raise ValueError(f"Unsupported file type. Supported types are: {', '.join(self.allowed_extensions)}")
+
     def load_text_file(self, filepath: str) -> str:
         """
         Loads text content from a file.
@@ -16,16 +38,142 @@ class DocumentProcessor:
         Returns:
             The content of the file as a string.
         """
-        if not os.path.exists(filepath):
-            raise FileNotFoundError(f"File not found: {filepath}")
-
-        allowed_extensions = ['.txt', '.md']
-        if not any(filepath.endswith(ext) for ext in allowed_extensions):
-            raise ValueError(f"Unsupported file type. Supported types are: {', '.join(allowed_extensions)}")
+        self._validate_path(filepath)
 
         with open(filepath, 'r', encoding='utf-8') as f:
             return f.read()
 
+    def iter_chunks(self, filepath: str, chunk_size: int = 1000, overlap: int = 200, strategy: str = 'fixed',
+                    buffer_size: int = 1 << 20) -> Iterator[Chunk]:
+        """
+        Streams chunks from a file without loading it into memory.
+
+        The file is read in windows of `buffer_size` characters, so peak memory is
+        bounded by the buffer and the chunk currently being built (for the 'sentence'
+        strategy, by the longest sentence), not by the file size. The chunks are identical to `chunk_text(load_text_file(filepath), ...)`.
+
+        Args:
+            filepath: The path to the text file.
+            chunk_size: The desired size of each chunk.
+            overlap: The number of characters or sentences to overlap.
+            strategy: The chunking strategy ('fixed' or 'sentence').
+            buffer_size: The number of characters read from the file at a time.
+
+        Yields:
+            Chunk tuples of (text, start, end), where start/end are character offsets
+            into the file. For the 'sentence' strategy they span from the first
+            character of the first sentence to the end of the last one.
+        """
+        self._validate_path(filepath)
+        self._validate_chunk_args(chunk_size, overlap, strategy)
+        if buffer_size <= 0:
+            raise ValueError("Buffer size must be a positive integer.")
+
+        with open(filepath, 'r', encoding='utf-8') as f:
+            reads = iter(lambda: f.read(buffer_size), '')
+            if strategy == 'fixed':
+                yield from self._iter_fixed_chunks(reads, chunk_size, overlap)
+            else:
+                yield from self._iter_sentence_chunks(reads, chunk_size, overlap)
+
+    def _validate_chunk_args(self, chunk_size: int, overlap: int, strategy: str):
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be a positive integer.")
+        if overlap < 0:
+            raise ValueError("Overlap must be a non-negative integer.")
+        if strategy not in ('fixed', 'sentence'):
+            raise ValueError(f"Unknown strategy: {strategy}. Supported strategies are 'fixed' and 'sentence'.")
+        if strategy == 'fixed' and overlap >= chunk_size:
+            raise ValueError("Overlap must be less than chunk size for 'fixed' strategy.")
+
+    def _iter_fixed_chunks(self, reads: Iterator[str], chunk_size: int, overlap: int) -> Iterator[Chunk]:
+        step = chunk_size - overlap
+        buffer = ''
+        buffer_start = 0  # file offset of buffer[0]
+        start = 0  # file offset of the next chunk
+        for data in reads:
+            buffer += data
+            while start + chunk_size <= buffer_start + len(buffer):
+                offset = start - buffer_start
+                yield Chunk(buffer[offset:offset + chunk_size], start, start + chunk_size)
+                start += step
+            # Drop everything before the next chunk; it will never be needed again.
+            consumed = min(start - buffer_start, len(buffer))
+            buffer = buffer[consumed:]
+            buffer_start += consumed
+
+        end_of_file = buffer_start + len(buffer)
+        while start < end_of_file:
+            offset = start - buffer_start
+            text = buffer[offset:offset + chunk_size]
+            yield Chunk(text, start, start + len(text))
+            start += step
+
+    def _iter_sentences(self, reads: Iterator[str]) -> Iterator[Tuple[str, int, int]]:
+        """Yields (sentence, start, end) using the same splitting rules as chunk_text."""
+        buffer = ''
+        buffer_start = 0
+        sentence_start = None  # file offset of the sentence being read
+        for data in reads:
+            if sentence_start is None:
+                stripped = data.lstrip()
+                if not stripped:
+                    buffer_start += len(data)
+                    continue
+                sentence_start = buffer_start + len(data) - len(stripped)
+                buffer_start = sentence_start
+                data = stripped
+            buffer += data
+
+            position = sentence_start - buffer_start
+            for match in _SENTENCE_BOUNDARY.finditer(buffer, position):
+                # The whitespace run may continue in the next read.
+                if match.end() == len(buffer):
+                    break
+                yield buffer[position:match.start()], sentence_start, buffer_start + match.start()
+                position = match.end()
+                sentence_start = buffer_start + position
+            buffer = buffer[position:]
+            buffer_start = sentence_start
+
+        if sentence_start is None:
+            return
+        for match in _SENTENCE_BOUNDARY.finditer(buffer):
+            yield buffer[sentence_start - buffer_start:match.start()], sentence_start, buffer_start + match.start()
+            sentence_start = buffer_start + match.end()
+        tail = buffer[sentence_start - buffer_start:].rstrip()
+        if tail:
+            yield tail, sentence_start, sentence_start + len(tail)
+
+    def _iter_sentence_chunks(self, reads: Iterator[str], chunk_size: int, overlap: int) -> Iterator[Chunk]:
+        # Only the sentences of the chunk being built (plus its overlap) are kept in memory.
+        # `prefix` holds the running joined length in front of each window entry, exactly
+        # as in _sentence_aware_chunking, so chunk ends are found by bisection.
+        sentences = self._iter_sentences(reads)
+        window: List[Tuple[str, int, int]] = []
+        prefix = [0]
+        exhausted = False
+        while True:
+            limit = prefix[0] + chunk_size + 1
+            while not exhausted and (not window or prefix[-1] <= limit):
+                sentence = next(sentences, None)
+                if sentence is None:
+                    exhausted = True
+                else:
+                    window.append(sentence)
+                    prefix.append(prefix[-1] + len(sentence[0]) + 1)
+            if not window:
+                return
+
+            j = max(1, bisect_right(prefix, limit) - 1)
+            yield Chunk(" ".join(s[0] for s in window[:j]), window[0][1], window[j - 1][2])
+
+            if exhausted and j == len(window):
+                return
+            advance = max(1, j - overlap)
+            del window[:advance]
+            del prefix[:advance]
+
     def chunk_text(self, text: str, chunk_size: int = 1000, overlap: int = 200, strategy: str = 'fixed') -> List[str]:
         """
         Splits text into chunks based on a specified strategy.
@@ -41,17 +189,12 @@ class DocumentProcessor:
         """
         if not isinstance(text, str):
             raise TypeError("Input 'text' must be a string.")
-        if chunk_size <= 0:
-            raise ValueError("Chunk size must be a positive integer.")
-        if overlap < 0:
-            raise ValueError("Overlap must be a non-negative integer.")
+        self._validate_chunk_args(chunk_size, overlap, strategy)
 
         if strategy == 'fixed':
             return self._fixed_size_chunking(text, chunk_size, overlap)
-        elif strategy == 'sentence':
-            return self._sentence_aware_chunking(text, chunk_size, overlap)
         else:
-            raise ValueError(f"Unknown strategy: {strategy}. Supported strategies are 'fixed' and 'sentence'.")
+            return self._sentence_aware_chunking(text, chunk_size, overlap)
 
     def _fixed_size_chunking(self, text: str, chunk_size: int, overlap: int) -> List[str]:
         if overlap >= chunk_size:
@@ -67,39 +210,25 @@ class DocumentProcessor:
 
     def _sentence_aware_chunking(self, text: str, chunk_size: int, overlap: int) -> List[str]:
         # NOTE: For this strategy, 'overlap' is interpreted as the number of overlapping sentences.
-        import re
-        sentences = [s for s in re.split(r'(?<=[.!?])\s+', text.strip()) if s]
-        if not sentences:
-            return []
-
-        chunks = []
-        i = 0
-        while i < len(sentences):
-            chunk_sentences = []
-            current_len = 0
-
-            # Start building a chunk from index i
-            j = i
-            while j < len(sentences):
-                sentence = sentences[j]
-                # Add 1 for the space between sentences
-                if current_len + len(sentence) + (1 if chunk_sentences else 0) > chunk_size and chunk_sentences:
-                    break
-                chunk_sentences.append(sentence)
-                current_len += len(sentence) + (1 if len(chunk_sentences) > 1 else 0)
-                j += 1
-
-            chunks.append(" ".join(chunk_sentences))
-
-            # If the last chunk was formed, break
-            if j == len(sentences):
-                break
-
-            # Move the main index 'i' forward to create the next chunk with overlap
+        sentences = [s for s in _SENTENCE_BOUNDARY.split(text.strip()) if s]
+        # prefix[k] is the length of the first k sentences with one separator after each,
+        # so " ".join(sentences[i:j]) is prefix[j] - prefix[i] - 1 characters long.
+        prefix = list(accumulate((len(s) + 1 for s in sentences), initial=0))
+        return [" ".join(sentences[i:j]) for i, j in self._sentence_windows(prefix, chunk_size, overlap)]
+
+    def _sentence_windows(self, prefix: List[int], chunk_size: int, overlap: int) -> Iterator[Tuple[int, int]]:
+        """Yields the [i, j) sentence ranges of each chunk from the prefix sums in one pass."""
+        n = len(prefix) - 1
+        i = j = 0
+        while i < n:
+            # The longest run starting at i that fits, but always at least one sentence.
+            limit = prefix[i] + chunk_size + 1
+            j = max(i + 1, bisect_right(prefix, limit, j, n + 1) - 1)
+            yield i, j
+            if j == n:
+                return
             i = max(i + 1, j - overlap)
 
-        return chunks
-
     def extract_metadata(self, source: str) -> Dict[str, Any]:
         """
         Extracts basic metadata from a file path or a string.
@@ -111,9 +240,11 @@ class DocumentProcessor:
             A dictionary containing metadata.
         """
         if os.path.isfile(source):
+            stat = os.stat(source)
             return {
                 'source': source,
-                'size': os.path.getsize(source),
+                'size': stat.st_size,
+                'mtime': stat.st_mtime,
                 'type': 'file'
             }
         else:
@@ -0,0 +1,184 @@
+import glob
+import hashlib
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+from .document_processor import DocumentProcessor
+
+
+def content_hash(text: str) -> str:
+    """A hex digest identifying `text`; equal texts have equal hashes."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _process_file(filepath: str, chunk_size: int, overlap: int, strategy: str) -> Tuple[Optional[List[str]], Dict[str, Any], Dict[str, float]]:
+    """
+    Loads, chunks and describes one file. Runs inside a worker process.
+    Returns None chunks for a file that was removed before it could be read.
+    """
+    processor = DocumentProcessor()
+    timings = {}
+
+    # Stat before reading, so a write during the read shows up as a changed mtime or size.
+    start = time.perf_counter()
+    metadata = processor.extract_metadata(filepath)
+    timings['metadata'] = time.perf_counter() - start
+    if metadata['type'] != 'file':
+        return None, {'source': filepath}, {}
+
+    start = time.perf_counter()
+    try:
+        text = processor.load_text_file(filepath)
+        after = os.stat(filepath)
+    except FileNotFoundError:
+        return None, {'source': filepath}, {}
+    if (after.st_mtime, after.st_size) != (metadata['mtime'], metadata['size']):
+        metadata['mtime'] = None  # changed while being read: the chunks may be from either version
+    timings['read'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    chunks = processor.chunk_text(text, chunk_size=chunk_size, overlap=overlap, strategy=strategy)
+    timings['chunk'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    metadata['content_hash'] = content_hash(text)
+    timings['metadata'] += time.perf_counter() - start
+
+    return chunks, metadata, timings
+
+
+class IngestionPipeline:
+    """
+    Reads and chunks many files in a process pool and streams the chunks in batches.
+
+    Files are processed in sorted path order and results are yielded in that same
+    order regardless of which worker finishes first, so two runs over the same
+    files produce identical batches.
+    """
+
+    def __init__(self, chunk_size: int = 1000, overlap: int = 200, strategy: str = 'fixed',
+                 batch_size: int = 256, max_workers: Optional[int] = None, max_pending: Optional[int] = None):
+        """
+        Args:
+            chunk_size: The desired size of each chunk.
+            overlap: The number of characters or sentences to overlap.
+            strategy: The chunking strategy ('fixed' or 'sentence').
+            batch_size: The number of chunks per yielded batch.
+            max_workers: The number of worker processes. Defaults to the CPU count;
+                1 processes files in the calling process.
+            max_pending: The maximum number of files submitted but not yet consumed.
+                Bounds memory when the consumer is slower than the workers.
+                Defaults to four files per worker.
+        """
+        DocumentProcessor()._validate_chunk_args(chunk_size, overlap, strategy)
+        if batch_size <= 0:
+            raise ValueError("Batch size must be a positive integer.")
+
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.strategy = strategy
+        self.batch_size = batch_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * 4
+        self.stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, Any]:
+        return {
+            'files': 0,
+            'chunks': 0,
+            'bytes': 0,
+            'read_seconds': 0.0,
+            'chunk_seconds': 0.0,
+            'metadata_seconds': 0.0,
+            'wall_seconds': 0.0,
+        }
+
+    def discover(self, source: str) -> List[str]:
+        """
+        Lists the supported files under a directory or matching a glob pattern.
+
+        Args:
+            source: A directory (searched recursively) or a glob pattern such as 'docs/**/*.md'.
+
+        Returns:
+            The matching file paths, sorted.
+        """
+        if os.path.isdir(source):
+            paths = glob.glob(os.path.join(source, '**', '*'), recursive=True)
+        else:
+            paths = glob.glob(source, recursive=True)
+        return sorted(p for p in paths
+                      if os.path.isfile(p) and any(p.endswith(ext) for ext in DocumentProcessor.allowed_extensions))
+
+    def run(self, source: str) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Ingests every supported file under `source`.
+
+        Args:
+            source: A directory or a glob pattern, as accepted by `discover`.
+
+        Yields:
+            Lists of at most `batch_size` chunk records. Each record holds the chunk
+            'text', its 'chunk_index' within the file and the file's metadata.
+            Per-stage timings accumulate in `self.stats` while the run progresses.
+        """
+        self.stats = self._empty_stats()
+        started = time.perf_counter()
+        batch: List[Dict[str, Any]] = []
+        for chunks, metadata in self.process(self.discover(source)):
+            if chunks is None:
+                continue
+            for index, text in enumerate(chunks):
+                batch.append({'text': text, 'chunk_index': index, **metadata})
+                if len(batch) == self.batch_size:
+                    self.stats['wall_seconds'] = time.perf_counter() - started
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+        self.stats['wall_seconds'] = time.perf_counter() - started
+
+    def process(self, paths: List[str]) -> Iterator[Tuple[List[str], Dict[str, Any]]]:
+        """
+        Loads and chunks `paths` in the process pool.
+
+        Yields:
+            A (chunks, metadata) pair per file, in the order of `paths`. The metadata
+            is `DocumentProcessor.extract_metadata`, taken before the file is read,
+            plus the file's 'content_hash'; its 'mtime' is None if the file changed
+            while it was read. A file removed before it could be read yields
+            (None, {'source': path}).
+        """
+        args = (self.chunk_size, self.overlap, self.strategy)
+        if self.max_workers == 1:
+            for path in paths:
+                yield self._record(*_process_file(path, *args))
+            return
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = deque()
+            paths = iter(paths)
+            for path in paths:
+                pending.append(executor.submit(_process_file, path, *args))
+                if len(pending) >= self.max_pending:
+                    break
+            while pending:
+                result = pending.popleft().result()
+                next_path = next(paths, None)
+                if next_path is not None:
+                    pending.append(executor.submit(_process_file, next_path, *args))
+                yield self._record(*result)
+
+    def _record(self, chunks: Optional[List[str]], metadata: Dict[str, Any], timings: Dict[str, float]):
+        if chunks is None:
+            return chunks, metadata
+        self.stats['files'] += 1
+        self.stats['chunks'] += len(chunks)
+        self.stats['bytes'] += metadata['size']
+        for stage, seconds in timings.items():
+            self.stats[f'{stage}_seconds'] += seconds
+        return chunks, metadata
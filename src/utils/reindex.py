@@ -0,0 +1,151 @@
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from .ingestion import IngestionPipeline, content_hash
+
+
+def chunk_id(source: str, text: str) -> str:
+    """
+    A stable point id for a chunk: the same text from the same source always gets
+    the same id, so re-upserting it replaces the existing point.
+    """
+    return str(uuid.UUID(hex=content_hash(f"{source}\0{text}")))
+
+
+class Manifest:
+    """
+    What is already indexed, per source file: its mtime, size, content hash and
+    the ids of its chunks. Stored as one JSON file and replaced atomically on save,
+    so an interrupted save leaves the previous manifest intact.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.files: Dict[str, Dict[str, Any]] = {}
+        if path is not None and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.files = json.load(f)["files"]
+
+    def save(self):
+        if self.path is None:
+            return
+        staging = self.path + ".tmp"
+        with open(staging, "w", encoding="utf-8") as f:
+            json.dump({"files": self.files}, f)
+        os.replace(staging, self.path)
+
+
+class Reindexer:
+    """
+    Keeps a vector store collection in step with a set of files.
+
+    Each run compares the files with the manifest. Files whose mtime and size are
+    unchanged are skipped without being read; a file that changed while it was
+    read is recorded without an mtime, so the next run reads it again. For the others, only the chunks that
+    are new are embedded and upserted, under stable `chunk_id`s, the chunks they
+    still contain get their payload refreshed (file metadata and chunk_index), and
+    the chunks they no longer contain are deleted, as are all the chunks of files
+    that are gone. The manifest is saved after the run, and a run interrupted
+    before that is repaired by the next one because upserts are idempotent.
+
+    `store` is a `src.retrieval.vector_store.QdrantClient` or anything with its
+    `add_documents(collection, docs, embeddings, metadata, ids)`,
+    `set_payloads(collection, payloads)` and `delete_points(collection, ids)` methods.
+    """
+
+    def __init__(self, store, collection: str, embedding_service, manifest_path: Optional[str] = None,
+                 pipeline: Optional[IngestionPipeline] = None):
+        self.store = store
+        self.collection = collection
+        self.embedding_service = embedding_service
+        self.manifest = Manifest(manifest_path)
+        self.pipeline = pipeline or IngestionPipeline()
+
+    def run(self, source: str) -> Dict[str, Any]:
+        """
+        Re-indexes the files under `source` (a directory or glob pattern, see
+        `IngestionPipeline.discover`), which are taken to be the whole collection:
+        indexed files that no longer match are removed.
+
+        Returns counts of unchanged, changed, new and deleted files, of added,
+        deleted and kept chunks, and the wall time.
+        """
+        started = time.perf_counter()
+        stats = {"files_unchanged": 0, "files_changed": 0, "files_new": 0, "files_deleted": 0,
+                 "chunks_added": 0, "chunks_deleted": 0, "chunks_kept": 0}
+        paths = []
+        modified = []
+        for path in self.pipeline.discover(source):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue  # removed since it was discovered; its chunks are deleted below
+            paths.append(path)
+            entry = self.manifest.files.get(path)
+            if entry is not None and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                stats["files_unchanged"] += 1
+                stats["chunks_kept"] += len(entry["chunks"])
+            else:
+                modified.append(path)
+
+        removed = set()
+        for chunks, metadata in self.pipeline.process(modified):
+            path = metadata["source"]
+            if chunks is None:
+                removed.add(path)  # removed before it could be read; deleted below
+                continue
+            entry = self.manifest.files.get(path)
+            if entry is None:
+                stats["files_new"] += 1
+            else:
+                stats["files_unchanged" if entry["content_hash"] == metadata["content_hash"] else "files_changed"] += 1
+            entry = self._update(path, chunks, metadata, entry["chunks"] if entry is not None else [], stats)
+            self.manifest.files[path] = {**entry, "mtime": metadata["mtime"], "size": metadata["size"],
+                                         "content_hash": metadata["content_hash"]}
+
+        for path in set(self.manifest.files) - (set(paths) - removed):
+            self.store.delete_points(self.collection, self.manifest.files[path]["chunks"])
+            stats["chunks_deleted"] += len(self.manifest.files[path]["chunks"])
+            stats["files_deleted"] += 1
+            del self.manifest.files[path]
+
+        self.manifest.save()
+        stats["wall_seconds"] = time.perf_counter() - started
+        return stats
+
+    def _update(self, path: str, chunks: List[str], metadata: Dict[str, Any], previous: List[str],
+                stats: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Embeds and upserts the new chunks of a file, refreshes the payload of the
+        ones it kept and deletes its stale ones.
+        """
+        # Repeated chunks of a file share an id and are stored once.
+        new = {}
+        for index, text in enumerate(chunks):
+            new.setdefault(chunk_id(path, text), (index, text))
+        kept = set(previous)
+        added = [(point_id, index, text) for point_id, (index, text) in new.items() if point_id not in kept]
+
+        batch_size = self.pipeline.batch_size
+        for start in range(0, len(added), batch_size):
+            batch = added[start:start + batch_size]
+            texts = [text for _, _, text in batch]
+            embeddings = self.embedding_service.create_embeddings(texts)
+            self.store.add_documents(
+                self.collection, texts, [list(map(float, embedding)) for embedding in embeddings],
+                [{**metadata, "chunk_index": index} for _, index, _ in batch],
+                ids=[point_id for point_id, _, _ in batch],
+            )
+
+        self.store.set_payloads(self.collection, {point_id: {**metadata, "chunk_index": index}
+                                                  for point_id, (index, _) in new.items() if point_id in kept})
+
+        stale = [point_id for point_id in previous if point_id not in new]
+        self.store.delete_points(self.collection, stale)
+        stats["chunks_added"] += len(added)
+        stats["chunks_deleted"] += len(stale)
+        stats["chunks_kept"] += len(new) - len(added)
+        return {"chunks": list(new)}
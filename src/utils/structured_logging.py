@@ -0,0 +1,82 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+from typing import Optional, Union
+
+# Attributes every LogRecord has; anything else was passed through `extra=` and is logged as a field.
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, with `extra=` fields as top-level keys."""
+
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Passes every record at `always_level` or above and a random `rate` fraction
+    of the rest, so chatty per-request logs cost little under load.
+    """
+
+    def __init__(self, rate: float = 1.0, always_level: int = logging.WARNING):
+        super().__init__()
+        self.rate = rate
+        self.always_level = always_level
+
+    def filter(self, record):
+        return record.levelno >= self.always_level or self.rate >= 1.0 or random.random() < self.rate
+
+
+def configure_logging(level: Union[int, str] = logging.INFO, sample_rate: float = 1.0, stream=None):
+    """
+    Routes the root logger through a queue: callers only enqueue the record and a
+    background thread formats it as JSON and writes it to `stream` (stderr by
+    default). Records below WARNING are sampled at `sample_rate`. Calling it again
+    replaces the previous configuration.
+    """
+    global _listener
+    _flush()
+
+    records = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(records)
+    queue_handler.addFilter(SamplingFilter(sample_rate))
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JSONFormatter())
+
+    root = logging.getLogger()
+    for handler in [h for h in root.handlers if isinstance(h, logging.handlers.QueueHandler)]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+@atexit.register
+def _flush():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
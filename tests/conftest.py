@@ -29,3 +29,15 @@ def mock_groq(mocker):
 
     mocker.patch('app.agents.Groq', return_value=mock_groq_client)
     return mock_groq_client
+
+@pytest.fixture
+def mock_async_groq(mocker):
+    """Mocks the async Groq client."""
+    mock_completion = MagicMock()
+    mock_completion.choices[0].message.content = "The sky is indeed blue."
+
+    mock_groq_client = MagicMock()
+    mock_groq_client.chat.completions.create = mocker.AsyncMock(return_value=mock_completion)
+
+    mocker.patch('app.agents.AsyncGroq', return_value=mock_groq_client)
+    return mock_groq_client
@@ -0,0 +1,102 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from src.api import server
+from src.api.answer_cache import AnswerCache
+from src.agents.memory_manager import MemoryManager
+from src.api.rag_orchestrator import RAGOrchestrator
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(server, "rag_orchestrator", RAGOrchestrator())
+    return TestClient(server.app)
+
+def test_add_documents_and_query(client):
+    """
+    Tests the API end-to-end: documents added through /add_documents are returned as /query sources.
+    """
+    response = client.post("/add_documents", json={"documents": ["The sky is blue.", "The grass is green."]})
+    assert response.status_code == 200
+
+    response = client.post("/query", json={"query": "What color is the sky?", "session_id": "abc"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["sources"][0]["content"] == "The sky is blue."
+    assert body["response"]
+
+def test_health(client):
+    assert client.get("/health").json() == {"status": "ok"}
+
+def test_query_stream(client):
+    """
+    Tests that /query/stream sends the sources event first, then tokens, then done.
+    """
+    client.post("/add_documents", json={"documents": ["The sky is blue.", "The grass is green."]})
+
+    with client.stream("POST", "/query/stream", json={"query": "What color is the sky?"}) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = "".join(response.iter_text())
+
+    events = [block.split("\n")[0] for block in body.strip().split("\n\n")]
+    assert events[0] == "event: sources"
+    assert events[1] == "event: token"
+    assert events[-1] == "event: done"
+    assert client.get("/stats").json()["time_to_first_token_ms"]["count"] == 1
+
+def test_session_history(monkeypatch):
+    monkeypatch.setattr(server, "rag_orchestrator", RAGOrchestrator(memory=MemoryManager()))
+    client = TestClient(server.app)
+    client.post("/add_documents", json={"documents": ["The sky is blue."]})
+    client.post("/query", json={"query": "What color is the sky?", "session_id": "abc"})
+    client.post("/query", json={"query": "And the grass?", "session_id": "abc"})
+
+    # Turns are stored in the background, after the response is sent.
+    for _ in range(100):
+        turns = client.get("/sessions/abc/history", params={"limit": 1}).json()["turns"]
+        if turns and turns[0]["query"] == "And the grass?":
+            break
+        time.sleep(0.01)
+    assert [turn["query"] for turn in turns] == ["And the grass?"]
+
+def test_metrics(client):
+    """
+    Tests that /metrics exposes query counters and stage latency histograms in the Prometheus text format.
+    """
+    client.post("/add_documents", json={"documents": ["The sky is blue.", "The grass is green."]})
+    client.post("/query", json={"query": "What color is the sky?"})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'rag_queries_total{endpoint="query",cached="false"}' in response.text
+    for stage in ("embedding", "search"):
+        assert f'rag_stage_duration_seconds_count{{stage="{stage}"}}' in response.text
+
+def test_metrics_cover_time_to_first_token_and_answer_cache(monkeypatch):
+    """
+    Tests that /metrics exposes the time to first token and answer cache lookups reported by /stats.
+    """
+    monkeypatch.setattr(server, "rag_orchestrator", RAGOrchestrator(answer_cache=AnswerCache()))
+    client = TestClient(server.app)
+    client.post("/add_documents", json={"documents": ["The sky is blue."]})
+    client.post("/query", json={"query": "What color is the sky?"})
+    client.post("/query", json={"query": "What color is the sky?"})
+    with client.stream("POST", "/query/stream", json={"query": "Is the grass green?"}) as response:
+        response.read()
+
+    metrics = client.get("/metrics").text
+    assert "rag_time_to_first_token_seconds_count " in metrics
+    for result in ("exact", "miss"):
+        assert f'rag_answer_cache_lookups_total{{result="{result}"}}' in metrics
+
+def test_logging_is_configured_at_startup(monkeypatch):
+    """
+    Tests that importing the server leaves logging alone and starting it configures logging.
+    """
+    calls = []
+    monkeypatch.setattr(server, "configure_logging", lambda **kwargs: calls.append(kwargs))
+    monkeypatch.setenv("LOG_LEVEL", "DEBUG")
+    with TestClient(server.app):
+        assert calls == [{"level": "DEBUG", "sample_rate": 1.0}]
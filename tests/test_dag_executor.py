@@ -0,0 +1,61 @@
+import threading
+import time
+import unittest
+from src.utils.dag_executor import DAGExecutor, Step, fan_out
+
+class TestDAGExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = DAGExecutor(max_workers=4)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_dependencies_receive_results(self):
+        result = self.executor.run({
+            "a": Step(lambda: 2),
+            "b": Step(lambda: 3),
+            "sum": Step(lambda a, b: a + b, ("a", "b")),
+            "double": Step(lambda s: 2 * s, ("sum",)),
+        })
+        self.assertEqual(result.results["double"], 10)
+        self.assertEqual(set(result.timings), {"a", "b", "sum", "double"})
+
+    def test_independent_steps_run_concurrently(self):
+        started = time.perf_counter()
+        result = self.executor.run(fan_out("sleep", time.sleep, [0.2] * 3))
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(sorted(result.results), ["sleep[0]", "sleep[1]", "sleep[2]"])
+        self.assertTrue(all(ms >= 150 for ms in result.timings.values()))
+
+    def test_step_errors_are_raised(self):
+        def fail():
+            raise RuntimeError("boom")
+        with self.assertRaises(RuntimeError):
+            self.executor.run({"fail": Step(fail), "after": Step(lambda x: x, ("fail",))})
+
+    def test_invalid_graphs(self):
+        with self.assertRaises(ValueError):
+            self.executor.run({"a": Step(lambda x: x, ("missing",))})
+        with self.assertRaises(ValueError):
+            self.executor.run({"a": Step(lambda b: b, ("b",)), "b": Step(lambda a: a, ("a",))})
+
+    def test_background_work_does_not_block(self):
+        release = threading.Event()
+        done = []
+        self.executor.submit_background("store", lambda: (release.wait(), done.append(True)))
+        self.assertEqual(done, [])
+        release.set()
+        self.executor.wait_background()
+        self.assertEqual(done, [True])
+        self.assertIn("store", self.executor.background_timings)
+
+    def test_background_errors_are_logged(self):
+        def fail():
+            raise RuntimeError("boom")
+        with self.assertLogs("src.utils.dag_executor", level="ERROR"):
+            self.executor.submit_background("fail", fail)
+            self.executor.wait_background()
+
+if __name__ == '__main__':
+    unittest.main()
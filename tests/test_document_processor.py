@@ -58,11 +58,39 @@ class TestDocumentProcessor(unittest.TestCase):
         self.assertEqual(chunks[0], "This is the first sentence. This is the second sentence.")
         self.assertEqual(chunks[1], "This is the second sentence. This is the third sentence.")
 
+    def test_iter_chunks_fixed_matches_chunk_text(self):
+        text = self.processor.load_text_file(self.txt_file)
+        expected = self.processor.chunk_text(text, chunk_size=20, overlap=5, strategy='fixed')
+        chunks = list(self.processor.iter_chunks(self.txt_file, chunk_size=20, overlap=5,
+                                                 strategy='fixed', buffer_size=7))
+        self.assertEqual([c.text for c in chunks], expected)
+        for chunk in chunks:
+            self.assertEqual(text[chunk.start:chunk.end], chunk.text)
+
+    def test_iter_chunks_sentence_matches_chunk_text(self):
+        text = self.processor.load_text_file(self.txt_file)
+        expected = self.processor.chunk_text(text, chunk_size=50, overlap=1, strategy='sentence')
+        chunks = list(self.processor.iter_chunks(self.txt_file, chunk_size=50, overlap=1,
+                                                 strategy='sentence', buffer_size=4))
+        self.assertEqual([c.text for c in chunks], expected)
+        self.assertEqual(chunks[0].start, 0)
+        self.assertEqual(chunks[-1].end, len(text))
+        self.assertEqual(text[chunks[1].start:chunks[1].end], chunks[1].text)
+
+    def test_iter_chunks_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            list(self.processor.iter_chunks(self.txt_file, chunk_size=10, overlap=10, strategy='fixed'))
+        with self.assertRaises(ValueError):
+            list(self.processor.iter_chunks(self.txt_file, strategy='paragraph'))
+        with self.assertRaises(FileNotFoundError):
+            list(self.processor.iter_chunks("non_existent_file.txt"))
+
     def test_extract_metadata_file(self):
         metadata = self.processor.extract_metadata(self.txt_file)
         self.assertEqual(metadata['source'], self.txt_file)
         self.assertEqual(metadata['type'], 'file')
         self.assertGreater(metadata['size'], 0)
+        self.assertEqual(metadata['mtime'], os.path.getmtime(self.txt_file))
 
     def test_extract_metadata_string(self):
         text = "This is a string."
@@ -0,0 +1,70 @@
+import unittest
+import os
+import tempfile
+from src.utils.document_processor import DocumentProcessor
+from src.utils.ingestion import IngestionPipeline
+
+class TestIngestionPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.test_dir = self.tmp.name
+        os.makedirs(os.path.join(self.test_dir, "nested"))
+        self.files = {
+            "b.txt": "Second file. It has two sentences.",
+            "a.md": "# Title\n\nFirst file in sorted order.",
+            os.path.join("nested", "c.txt"): "A nested file that is long enough to produce several chunks.",
+            "ignored.csv": "not,a,document",
+        }
+        for name, content in self.files.items():
+            with open(os.path.join(self.test_dir, name), "w") as f:
+                f.write(content)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_discover_directory(self):
+        pipeline = IngestionPipeline()
+        paths = pipeline.discover(self.test_dir)
+        self.assertEqual([os.path.relpath(p, self.test_dir) for p in paths],
+                         ["a.md", "b.txt", os.path.join("nested", "c.txt")])
+
+    def test_discover_glob(self):
+        pipeline = IngestionPipeline()
+        paths = pipeline.discover(os.path.join(self.test_dir, "**", "*.txt"))
+        self.assertEqual(len(paths), 2)
+
+    def test_run_matches_sequential_processing(self):
+        processor = DocumentProcessor()
+        expected = []
+        for path in IngestionPipeline().discover(self.test_dir):
+            chunks = processor.chunk_text(processor.load_text_file(path), chunk_size=20, overlap=5)
+            expected.extend((chunk, path) for chunk in chunks)
+
+        for workers in (1, 2):
+            pipeline = IngestionPipeline(chunk_size=20, overlap=5, batch_size=3, max_workers=workers, max_pending=1)
+            batches = list(pipeline.run(self.test_dir))
+            self.assertTrue(all(len(batch) <= 3 for batch in batches))
+            records = [record for batch in batches for record in batch]
+            self.assertEqual([(r['text'], r['source']) for r in records], expected)
+            self.assertEqual(pipeline.stats['files'], 3)
+            self.assertEqual(pipeline.stats['chunks'], len(expected))
+            self.assertGreater(pipeline.stats['read_seconds'], 0)
+
+    def test_process_reports_removed_files(self):
+        pipeline = IngestionPipeline(max_workers=1)
+        missing = os.path.join(self.test_dir, "gone.txt")
+        [path] = pipeline.discover(os.path.join(self.test_dir, "*.txt"))
+        results = list(pipeline.process([missing, path]))
+        self.assertEqual(results[0], (None, {'source': missing}))
+        self.assertEqual(results[1][1]['source'], path)
+        self.assertEqual(pipeline.stats['files'], 1)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            IngestionPipeline(batch_size=0)
+        with self.assertRaises(ValueError):
+            IngestionPipeline(strategy='paragraph')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import sys
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+from main import RAGOrchestrator
+
+class TestProcessQuery(unittest.TestCase):
+
+    def setUp(self):
+        self.orchestrator = RAGOrchestrator(max_workers=4)
+        self.calls = []
+        lock = threading.Lock()
+
+        def record(name, result):
+            def call(*args):
+                with lock:
+                    self.calls.append((name,) + args)
+                return result(*args)
+            return call
+
+        self.orchestrator.planning_agent = MagicMock()
+        self.orchestrator.planning_agent.decompose.side_effect = record(
+            "decompose", lambda query: ["What is A?", "What is B?"])
+        self.orchestrator.retrieval_agent = MagicMock()
+        self.orchestrator.retrieval_agent.retrieve_documents.side_effect = record(
+            "retrieve", lambda sub_query: ["shared.txt", sub_query[-2] + ".txt"])
+        self.orchestrator.generation_agent = MagicMock()
+        self.orchestrator.generation_agent.generate_response.side_effect = record(
+            "generate", lambda documents, query: "answer")
+        self.orchestrator.memory_manager = MagicMock()
+        self.orchestrator.memory_manager.store_interaction.side_effect = record(
+            "store", lambda *args: None)
+
+    def tearDown(self):
+        self.orchestrator.executor.shutdown()
+
+    def test_decompose_then_retrieve_each_sub_query_then_generate(self):
+        response = self.orchestrator.process_query("What is A? What is B?", session_id="s1")
+        self.assertEqual(response, "answer")
+        self.orchestrator.executor.wait_background(timeout=5)
+
+        names = [call[0] for call in self.calls]
+        self.assertEqual(names[0], "decompose")
+        self.assertEqual(names[1:3], ["retrieve", "retrieve"])
+        self.assertEqual(names[3:], ["generate", "store"])
+        self.assertEqual(self.calls[0], ("decompose", "What is A? What is B?"))
+        self.assertCountEqual([call[1] for call in self.calls[1:3]], ["What is A?", "What is B?"])
+        # Generation sees the merged documents once each, in sub-query order
+        self.assertEqual(self.calls[3], ("generate", ["shared.txt", "A.txt", "B.txt"], "What is A? What is B?"))
+        self.assertEqual(self.calls[4], ("store", "What is A? What is B?", "answer", "s1"))
+        self.assertEqual(set(self.orchestrator.last_timings),
+                         {"decompose", "retrieve[0]", "retrieve[1]", "generate", "total"})
+
+    def test_store_runs_off_the_critical_path(self):
+        started, release, finished = threading.Event(), threading.Event(), threading.Event()
+
+        def store(*args):
+            started.set()
+            release.wait(5)
+            finished.set()
+        self.orchestrator.memory_manager.store_interaction.side_effect = store
+
+        # The answer comes back while the store is still blocked
+        self.assertEqual(self.orchestrator.process_query("What is A?"), "answer")
+        self.assertFalse(finished.is_set())
+        self.assertTrue(started.wait(5))
+        release.set()
+        self.orchestrator.executor.wait_background(timeout=5)
+        self.orchestrator.memory_manager.store_interaction.assert_called_once_with("What is A?", "answer", None)
+
+if __name__ == '__main__':
+    unittest.main()
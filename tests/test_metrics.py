@@ -0,0 +1,88 @@
+import io
+import json
+import logging
+import unittest
+from src.utils.metrics import MetricsRegistry, span
+from src.utils.structured_logging import SamplingFilter, configure_logging, _flush
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_renders_per_label(self):
+        counter = self.registry.counter("requests_total", "Requests.", ("endpoint",))
+        counter.inc(endpoint="query")
+        counter.inc(2, endpoint="query")
+        counter.inc(endpoint="stream")
+        self.assertEqual(counter.value(endpoint="query"), 3)
+        text = self.registry.render()
+        self.assertIn("# TYPE requests_total counter", text)
+        self.assertIn('requests_total{endpoint="query"} 3', text)
+        self.assertIn('requests_total{endpoint="stream"} 1', text)
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = self.registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value)
+        text = self.registry.render()
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{le="1"} 3', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 4', text)
+        self.assertIn("latency_seconds_count 4", text)
+        self.assertIn("latency_seconds_sum 6.05", text)
+
+    def test_registry_returns_existing_metric(self):
+        counter = self.registry.counter("hits_total")
+        self.assertIs(self.registry.counter("hits_total"), counter)
+        with self.assertRaises(ValueError):
+            self.registry.gauge("hits_total")
+
+    def test_wrong_labels_raise(self):
+        counter = self.registry.counter("hits_total", labelnames=("cache",))
+        with self.assertRaises(ValueError):
+            counter.inc()
+
+    def test_label_values_are_escaped(self):
+        gauge = self.registry.gauge("info", labelnames=("name",))
+        gauge.set(1, name='a "quoted"\nname')
+        self.assertIn('info{name="a \\"quoted\\"\\nname"} 1', self.registry.render())
+
+    def test_span_times_and_counts_errors(self):
+        histogram = self.registry.histogram("stage_seconds", labelnames=("stage",))
+        with span("embedding", histogram):
+            pass
+        with self.assertRaises(RuntimeError):
+            with span("search", histogram):
+                raise RuntimeError("boom")
+        self.assertEqual(histogram.count(stage="embedding"), 1)
+        self.assertEqual(histogram.count(stage="search"), 1)
+
+class TestStructuredLogging(unittest.TestCase):
+
+    def tearDown(self):
+        _flush()
+        root = logging.getLogger()
+        for handler in [h for h in root.handlers if isinstance(h, logging.handlers.QueueHandler)]:
+            root.removeHandler(handler)
+
+    def test_records_are_json_lines_with_extra_fields(self):
+        stream = io.StringIO()
+        configure_logging(stream=stream)
+        logging.getLogger("test").info("Added %d documents.", 3, extra={"collection": "docs"})
+        _flush()
+        entry = json.loads(stream.getvalue().splitlines()[-1])
+        self.assertEqual(entry["message"], "Added 3 documents.")
+        self.assertEqual(entry["collection"], "docs")
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["logger"], "test")
+
+    def test_sampling_keeps_warnings(self):
+        sampler = SamplingFilter(rate=0.0)
+        info = logging.LogRecord("test", logging.INFO, "", 0, "info", (), None)
+        warning = logging.LogRecord("test", logging.WARNING, "", 0, "warning", (), None)
+        self.assertFalse(sampler.filter(info))
+        self.assertTrue(sampler.filter(warning))
+
+if __name__ == '__main__':
+    unittest.main()
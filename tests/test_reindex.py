@@ -0,0 +1,165 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from src.utils.document_processor import DocumentProcessor
+from src.utils.ingestion import IngestionPipeline
+from src.utils.reindex import Reindexer, chunk_id
+
+class FakeStore:
+    """Records the points of one collection, like QdrantClient would store them."""
+
+    def __init__(self):
+        self.points = {}
+        self.upserts = 0
+
+    def add_documents(self, collection, docs, embeddings, metadata, ids=None):
+        self.upserts += len(docs)
+        for point_id, doc, meta in zip(ids, docs, metadata):
+            self.points[point_id] = {"document": doc, **meta}
+
+    def set_payloads(self, collection, payloads):
+        for point_id, payload in payloads.items():
+            self.points[point_id].update(payload)
+
+    def delete_points(self, collection, ids):
+        for point_id in ids:
+            self.points.pop(point_id, None)
+
+class TestReindexer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.docs = os.path.join(self.tmp.name, "docs")
+        os.makedirs(self.docs)
+        self.manifest_path = os.path.join(self.tmp.name, "manifest.json")
+        self.store = FakeStore()
+        self.embedding_service = MagicMock()
+        self.embedding_service.create_embeddings.side_effect = lambda texts: np.zeros((len(texts), 4))
+        self.write("a.txt", "alpha " * 30)
+        self.write("b.txt", "bravo " * 30)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text, mtime=None):
+        path = os.path.join(self.docs, name)
+        with open(path, "w") as f:
+            f.write(text)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def reindex(self):
+        pipeline = IngestionPipeline(chunk_size=50, overlap=10, max_workers=1)
+        return Reindexer(self.store, "docs", self.embedding_service, self.manifest_path, pipeline).run(self.docs)
+
+    def test_first_run_indexes_everything(self):
+        stats = self.reindex()
+        self.assertEqual(stats["files_new"], 2)
+        self.assertEqual(stats["chunks_added"], len(self.store.points))
+        self.assertTrue(all(point["type"] == "file" for point in self.store.points.values()))
+        with open(self.manifest_path) as f:
+            self.assertEqual(len(json.load(f)["files"]), 2)
+
+    def test_unchanged_files_are_not_read_or_embedded(self):
+        self.reindex()
+        self.embedding_service.create_embeddings.reset_mock()
+        stats = self.reindex()
+        self.assertEqual(stats["files_unchanged"], 2)
+        self.assertEqual(stats["chunks_added"], 0)
+        self.embedding_service.create_embeddings.assert_not_called()
+
+    def test_touched_file_with_same_content_is_not_embedded(self):
+        self.reindex()
+        self.write("a.txt", "alpha " * 30, mtime=1_000_000)
+        upserts = self.store.upserts
+        stats = self.reindex()
+        self.assertEqual(stats["files_unchanged"], 2)
+        self.assertEqual(self.store.upserts, upserts)
+        self.assertTrue(all(point["mtime"] == 1_000_000 for point in self.store.points.values()
+                            if point["source"].endswith("a.txt")))
+
+    def test_changed_file_upserts_new_chunks_and_deletes_stale_ones(self):
+        self.reindex()
+        before = set(self.store.points)
+        path = self.write("a.txt", "alpha " * 20 + "charlie " * 10, mtime=1_000_000)
+        stats = self.reindex()
+
+        self.assertEqual(stats["files_changed"], 1)
+        self.assertGreater(stats["chunks_kept"], 0)
+        self.assertGreater(stats["chunks_deleted"], 0)
+        self.assertEqual(stats["chunks_added"], len(set(self.store.points) - before))
+        texts = {point["document"] for point in self.store.points.values() if point["source"] == path}
+        pipeline = IngestionPipeline(chunk_size=50, overlap=10, max_workers=1)
+        [(chunks, metadata)] = pipeline.process([path])
+        self.assertEqual(texts, set(chunks))
+        for point in self.store.points.values():
+            if point["source"] == path:
+                self.assertEqual(point["content_hash"], metadata["content_hash"])
+                self.assertEqual(chunks[point["chunk_index"]], point["document"])
+
+    def test_file_removed_after_discovery_is_deleted(self):
+        self.reindex()
+        pipeline = IngestionPipeline(chunk_size=50, overlap=10, max_workers=1)
+        reindexer = Reindexer(self.store, "docs", self.embedding_service, self.manifest_path, pipeline)
+        discovered = pipeline.discover(self.docs)
+        os.remove(os.path.join(self.docs, "b.txt"))
+        with patch.object(pipeline, "discover", return_value=discovered):
+            stats = reindexer.run(self.docs)
+        self.assertEqual(stats["files_deleted"], 1)
+        self.assertFalse(any(point["source"].endswith("b.txt") for point in self.store.points.values()))
+
+    def test_deleted_file_removes_its_chunks(self):
+        self.reindex()
+        os.remove(os.path.join(self.docs, "b.txt"))
+        stats = self.reindex()
+        self.assertEqual(stats["files_deleted"], 1)
+        self.assertFalse(any(point["source"].endswith("b.txt") for point in self.store.points.values()))
+
+    def test_file_removed_after_stat_is_deleted(self):
+        self.reindex()
+        self.write("b.txt", "bravo " * 20 + "delta " * 10, mtime=1_000_000)
+        stat = os.stat
+
+        def stat_then_remove(path, *args, **kwargs):
+            result = stat(path, *args, **kwargs)
+            if path.endswith("b.txt"):
+                os.remove(path)
+            return result
+
+        with patch("src.utils.reindex.os.stat", side_effect=stat_then_remove):
+            stats = self.reindex()
+        self.assertEqual(stats["files_deleted"], 1)
+        self.assertFalse(any(point["source"].endswith("b.txt") for point in self.store.points.values()))
+        with open(self.manifest_path) as f:
+            self.assertEqual([os.path.basename(path) for path in json.load(f)["files"]], ["a.txt"])
+
+    def test_file_changed_while_read_is_read_again(self):
+        self.reindex()
+        path = self.write("a.txt", "alpha " * 20 + "charlie " * 10, mtime=1_000_000)
+        load_text_file = DocumentProcessor.load_text_file
+
+        def load_then_change(processor, filepath):
+            text = load_text_file(processor, filepath)
+            if filepath == path:
+                self.write("a.txt", "CHANGED " * 30, mtime=2_000_000)
+            return text
+
+        with patch.object(DocumentProcessor, "load_text_file", load_then_change):
+            self.reindex()
+        stats = self.reindex()
+        self.assertEqual(stats["files_changed"], 1)
+        texts = {point["document"] for point in self.store.points.values() if point["source"] == path}
+        self.assertTrue(texts and all("CHANGED" in text for text in texts))
+
+    def test_chunk_ids_are_stable(self):
+        self.assertEqual(chunk_id("a.txt", "text"), chunk_id("a.txt", "text"))
+        self.assertNotEqual(chunk_id("a.txt", "text"), chunk_id("b.txt", "text"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,7 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
 import pytest
 from app.agents import RAGAgent
 
@@ -23,3 +27,50 @@ def test_rag_agent_answer(mock_embedding_service, mock_vector_store, mock_groq):
 
     # Verify that the answer is what we expect from the mock
     assert answer == "The sky is indeed blue."
+
+def test_rag_agent_aanswer(mock_embedding_service, mock_vector_store, mock_async_groq):
+    """
+    Tests that the async answer path awaits the async Groq client with the retrieved context.
+    """
+    mock_embedding_service.acreate_embeddings = AsyncMock(return_value=np.random.rand(1, 384))
+    agent = RAGAgent(
+        groq_api_key="fake-api-key",
+        embedding_service=mock_embedding_service,
+        vector_store=mock_vector_store,
+    )
+
+    answer = asyncio.run(agent.aanswer("What color is the sky?"))
+
+    mock_embedding_service.acreate_embeddings.assert_awaited_once_with(["What color is the sky?"])
+    mock_vector_store.search.assert_called_once()
+    mock_async_groq.chat.completions.create.assert_awaited_once()
+    args, kwargs = mock_async_groq.chat.completions.create.call_args
+    assert "The sky is blue." in kwargs['messages'][0]['content']
+    assert answer == "The sky is indeed blue."
+
+def test_rag_agent_astream(mock_embedding_service, mock_vector_store, mock_async_groq):
+    """
+    Tests that streamed generation yields the non-empty deltas of the completion chunks.
+    """
+    def chunk(content):
+        mock_chunk = MagicMock()
+        mock_chunk.choices[0].delta.content = content
+        return mock_chunk
+
+    async def stream():
+        for content in ["The sky ", None, "is blue."]:
+            yield chunk(content)
+
+    mock_async_groq.chat.completions.create = AsyncMock(return_value=stream())
+    agent = RAGAgent(
+        groq_api_key="fake-api-key",
+        embedding_service=mock_embedding_service,
+        vector_store=mock_vector_store,
+    )
+
+    async def collect():
+        return [token async for token in agent.astream("What color is the sky?", "The sky is blue.")]
+
+    assert asyncio.run(collect()) == ["The sky ", "is blue."]
+    args, kwargs = mock_async_groq.chat.completions.create.call_args
+    assert kwargs['stream'] is True
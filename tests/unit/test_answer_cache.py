@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+from src.api.answer_cache import AnswerCache
+
+RESULT = {"response": "Blue.", "sources": [{"source": "Document 1", "content": "The sky is blue.", "score": 0.9}],
+          "confidence": 0.9}
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+def test_exact_match_ignores_case_and_whitespace():
+    cache = AnswerCache()
+    cache.put("What color is the sky?", unit([1, 0, 0]), RESULT, latency=0.5)
+
+    assert cache.get("what  color is the SKY?") == RESULT
+    assert cache.get("Something else?") is None
+    info = cache.info()
+    assert info["hits"] == 1 and info["misses"] == 1
+    assert info["hit_rate"] == 0.5
+    assert info["saved_seconds"] == 0.5
+
+def test_semantic_match_above_threshold():
+    cache = AnswerCache(similarity_threshold=0.9)
+    cache.put("What color is the sky?", unit([1, 0, 0]), RESULT)
+
+    assert cache.get("Which colour is the sky?", unit([1, 0.1, 0])) == RESULT
+    assert cache.get("How hot is the sun?", unit([0, 1, 0])) is None
+    assert cache.stats["semantic_hits"] == 1
+
+def test_entries_expire():
+    clock = FakeClock()
+    cache = AnswerCache(ttl_seconds=10, clock=clock)
+    cache.put("q", unit([1, 0]), RESULT)
+
+    clock.now = 9.9
+    assert cache.get("q") is not None
+    clock.now = 10.0
+    assert cache.get("q") is None
+    assert cache.stats["expirations"] == 1
+    assert len(cache) == 0
+
+def test_expired_entry_does_not_shadow_a_live_match():
+    clock = FakeClock()
+    cache = AnswerCache(ttl_seconds=10, similarity_threshold=0.9, clock=clock)
+    cache.put("closest", unit([1, 0, 0]), {"response": "expired"})
+    clock.now = 5.0
+    cache.put("close", unit([1, 0.2, 0]), {"response": "live"})
+
+    clock.now = 12.0
+    assert cache.get("query", unit([1, 0.05, 0])) == {"response": "live"}
+    assert cache.stats["expirations"] == 1
+    assert len(cache) == 1
+
+def test_lru_eviction_keeps_vectors_aligned():
+    cache = AnswerCache(max_entries=2, similarity_threshold=0.99)
+    cache.put("a", unit([1, 0, 0]), {"response": "a"})
+    cache.put("b", unit([0, 1, 0]), {"response": "b"})
+    cache.get("a")
+    cache.put("c", unit([0, 0, 1]), {"response": "c"})
+
+    assert cache.stats["evictions"] == 1
+    assert cache.get("b") is None
+    assert cache.get("x", unit([1, 0, 0])) == {"response": "a"}
+    assert cache.get("y", unit([0, 0, 1])) == {"response": "c"}
+
+def test_results_are_copied():
+    cache = AnswerCache()
+    result = {"response": "Blue.", "sources": []}
+    cache.put("q", unit([1, 0]), result)
+    result["sources"].append("mutated")
+    cache.get("q")["sources"].append("mutated")
+
+    assert cache.get("q") == {"response": "Blue.", "sources": []}
+
+def test_invalidate():
+    cache = AnswerCache()
+    cache.put("q", unit([1, 0]), RESULT)
+    cache.invalidate()
+
+    assert cache.get("q", unit([1, 0])) is None
+    assert cache.stats["invalidations"] == 1
+
+def test_put_after_invalidate_is_dropped():
+    cache = AnswerCache()
+    generation = cache.generation
+    cache.invalidate()  # documents added while the answer was being computed
+    cache.put("q", unit([1, 0]), RESULT, generation=generation)
+
+    assert cache.get("q") is None
+    assert cache.stats["stale_writes"] == 1
+    cache.put("q", unit([1, 0]), RESULT, generation=cache.generation)
+    assert cache.get("q") == RESULT
+
+def test_invalid_max_entries():
+    with pytest.raises(ValueError):
+        AnswerCache(max_entries=0)
@@ -0,0 +1,57 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from src.api.batcher import MicroBatcher
+def make_batcher(calls, **kwargs):
+    async def process_batch(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+    return MicroBatcher(process_batch, **kwargs)
+def test_concurrent_submits_are_batched():
+    calls = []
+    batcher = make_batcher(calls, max_batch_size=100, max_wait_ms=10)
+    async def run_all():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+
+    assert asyncio.run(run_all()) == [i * 2 for i in range(10)]
+    assert calls == [list(range(10))]
+    assert batcher.stats == {"batches": 1, "items": 10, "max_batch_size": 10}
+
+def test_batches_are_capped_at_max_batch_size():
+    calls = []
+    batcher = make_batcher(calls, max_batch_size=4, max_wait_ms=1000)
+
+    async def run_all():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+    # The last two items are flushed by the timer, but the full batches go out immediately.
+    assert asyncio.run(run_all()) == [i * 2 for i in range(10)]
+    assert [len(batch) for batch in calls] == [4, 4, 2]
+def test_batcher_survives_new_event_loops():
+    calls = []
+    batcher = make_batcher(calls, max_wait_ms=1)
+    assert asyncio.run(batcher.submit(1)) == 2
+    assert asyncio.run(batcher.submit(2)) == 4
+def test_event_loops_in_threads_are_batched_separately():
+    calls = []
+    batcher = make_batcher(calls, max_batch_size=4, max_wait_ms=20)
+    async def submit(i):
+        return await batcher.submit(i)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = [pool.submit(asyncio.run, submit(i)) for i in range(16)]
+        assert [future.result(timeout=5) for future in results] == [i * 2 for i in range(16)]
+    assert sorted(item for call in calls for item in call) == list(range(16))
+def test_batch_errors_reach_every_caller():
+    async def process_batch(items):
+        raise ValueError("backend down")
+    batcher = MicroBatcher(process_batch, max_wait_ms=1)
+    async def run_all():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run_all())
+    assert all(isinstance(r, ValueError) for r in results)
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        MicroBatcher(None, max_batch_size=0)
+    with pytest.raises(ValueError):
+        MicroBatcher(None, max_wait_ms=-1)
@@ -0,0 +1,103 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from app.client_registry import ClientRegistry, groq_client, qdrant_client, retry
+
+
+def test_registry_creates_one_client_per_key():
+    registry = ClientRegistry()
+    create = MagicMock(side_effect=lambda: object())
+
+    first = registry.get("a", create)
+    assert registry.get("a", create) is first
+    assert registry.get("b", create) is not first
+    assert create.call_count == 2
+
+
+def test_async_clients_are_per_event_loop():
+    registry = ClientRegistry()
+
+    async def get():
+        return registry.get_async("a", object)
+
+    async def get_twice():
+        return await get(), await get()
+
+    first, again = asyncio.run(get_twice())
+    assert first is again
+    assert asyncio.run(get()) is not first
+
+
+def test_close_closes_clients():
+    registry = ClientRegistry()
+    client = registry.get("a", MagicMock)
+    registry.close()
+    client.close.assert_called_once()
+    assert registry.get("a", MagicMock) is not client
+
+
+def test_groq_clients_are_shared_and_pooled():
+    factory = MagicMock()
+    assert groq_client(factory, "key") is groq_client(factory, "key")
+    factory.assert_called_once()
+    kwargs = factory.call_args.kwargs
+    assert kwargs["api_key"] == "key"
+    assert isinstance(kwargs["http_client"], httpx.Client)
+
+
+def test_qdrant_grpc_option(monkeypatch):
+    monkeypatch.setenv("QDRANT_PREFER_GRPC", "true")
+    factory = MagicMock()
+    qdrant_client(factory, "http://localhost:6333", "key")
+    factory.assert_called_once_with(url="http://localhost:6333", api_key="key", prefer_grpc=True)
+
+
+def test_retry_backs_off_on_transient_errors(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("app.client_registry.time.sleep", sleeps.append)
+    func = MagicMock(side_effect=[httpx.ConnectError("refused"), httpx.ReadTimeout("slow"), "ok"])
+
+    assert retry(func, 1, key="value", attempts=3, backoff=0.1) == "ok"
+    assert func.call_count == 3
+    func.assert_called_with(1, key="value")
+    assert len(sleeps) == 2 and all(0 <= s <= 0.2 for s in sleeps)
+
+
+def test_retry_gives_up_and_skips_other_errors(monkeypatch):
+    monkeypatch.setattr("app.client_registry.time.sleep", lambda seconds: None)
+    failing = MagicMock(side_effect=httpx.ConnectError("refused"))
+    with pytest.raises(httpx.ConnectError):
+        retry(failing, attempts=3)
+    assert failing.call_count == 3
+
+    invalid = MagicMock(side_effect=ValueError("bad request"))
+    with pytest.raises(ValueError):
+        retry(invalid, attempts=3)
+    assert invalid.call_count == 1
+
+
+def test_aclose_closes_the_loops_async_clients():
+    registry = ClientRegistry()
+    client = httpx.AsyncClient()
+
+    async def use_and_close():
+        registry.get_async("a", lambda: client)
+        await registry.aclose()
+        return registry.get_async("a", object)
+
+    assert asyncio.run(use_and_close()) is not client
+    assert client.is_closed
+
+
+def test_qdrant_timeout_is_parsed_as_seconds(monkeypatch):
+    monkeypatch.setenv("QDRANT_TIMEOUT_SECONDS", "2.5")
+    factory = MagicMock()
+    qdrant_client(factory, "http://localhost:6333", "key")
+    assert factory.call_args.kwargs["timeout"] == 2.5
+
+    monkeypatch.setenv("QDRANT_TIMEOUT_SECONDS", "soon")
+    with pytest.raises(ValueError, match="QDRANT_TIMEOUT_SECONDS"):
+        qdrant_client(MagicMock(), "http://localhost:6333", "key")
@@ -0,0 +1,46 @@
+from app.context_builder import ContextBuilder, estimate_tokens
+from src.utils.document_processor import DocumentProcessor
+
+TEXT = " ".join(f"Sentence number {i} talks about topic {i % 7}." for i in range(100))
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("The sky is blue.") == 5
+    assert estimate_tokens("a" * 40) == 10
+
+def test_orders_by_score_and_drops_duplicates():
+    context = ContextBuilder().build([
+        ("The grass is green.", 0.5),
+        ("The sky is blue.", 0.9),
+        ("the sky is blue", 0.8),
+        ("The sky is blue.", 0.7),
+        ("", 0.6),
+    ])
+    assert context.text == "The sky is blue.\n\nThe grass is green."
+    assert [score for _, score in context.chunks] == [0.9, 0.5]
+
+def test_contained_chunks_are_dropped():
+    context = ContextBuilder().build([("The sky is blue and the grass is green.", 0.9),
+                                      ("the grass is green", 0.95)])
+    assert context.text == "The sky is blue and the grass is green."
+
+def test_overlapping_chunks_are_trimmed():
+    chunks = DocumentProcessor().chunk_text(TEXT, chunk_size=300, overlap=60)[:3]
+    context = ContextBuilder(max_tokens=10000).build([(chunk, 1.0 - i / 10) for i, chunk in enumerate(chunks)])
+
+    assert len(context.chunks) == 3
+    covered = "".join(text for text, _ in context.chunks).replace(" ", "")
+    assert covered == TEXT[:len(chunks[0]) + 2 * (300 - 60)].replace(" ", "")
+    assert context.tokens < context.input_tokens
+
+def test_packs_into_token_budget():
+    chunks = [(f"Chunk {i} " + " ".join(f"w{i}x{j}" for j in range(50)), 1.0 - i / 100) for i in range(10)]
+    context = ContextBuilder(max_tokens=230).build(chunks)
+
+    assert context.tokens <= 230
+    assert [text.split()[1] for text, _ in context.chunks] == ["0", "1", "2"]
+
+def test_truncates_a_single_oversized_chunk():
+    context = ContextBuilder(max_tokens=20).build([(TEXT, 1.0)])
+    assert 0 < context.tokens <= 20
+    assert TEXT.startswith(context.text)
@@ -0,0 +1,82 @@
+import numpy as np
+from app.embedding_cache import EmbeddingCache
+from app.embedding_service import EmbeddingService
+from app.encoders import HashingEncoder
+
+class CountingEncoder:
+    dim = 4
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts):
+        self.encoded.extend(texts)
+        return np.array([[len(t), 1, 2, 3] for t in texts], dtype=np.float32)
+
+def test_key_normalizes_text_and_includes_model():
+    assert EmbeddingCache.key("m", "hello   world\n") == EmbeddingCache.key("m", "hello world")
+    assert EmbeddingCache.key("m", "hello world") != EmbeddingCache.key("other", "hello world")
+
+def test_lru_eviction_respects_byte_budget():
+    vector = np.ones(4, dtype=np.float32)
+    cache = EmbeddingCache(max_bytes=2 * vector.nbytes)
+    cache.put(b"a", vector)
+    cache.put(b"b", vector)
+    assert cache.get(b"a") is not None  # "b" is now least recently used
+    cache.put(b"c", vector)
+
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") is not None
+    info = cache.info()
+    assert info["evictions"] == 1
+    assert info["memory_bytes"] == 2 * vector.nbytes
+    assert info["hits"] == 2 and info["misses"] == 1
+
+def test_service_skips_cached_and_duplicate_texts():
+    encoder = CountingEncoder()
+    service = EmbeddingService(encoder=encoder, cache=EmbeddingCache())
+    first = service.create_embeddings(["one", "two", "one"])
+    assert sorted(encoder.encoded) == ["one", "two"]
+    np.testing.assert_array_equal(first[0], first[2])
+
+    second = service.create_embeddings(["two", "one", "three"])
+    assert sorted(encoder.encoded) == ["one", "three", "two"]
+    np.testing.assert_array_equal(second[:2], first[[1, 0]])
+
+def test_disk_tier_survives_restart(tmp_path):
+    encoder = CountingEncoder()
+    cache = EmbeddingCache(max_bytes=0, path=str(tmp_path))
+    expected = EmbeddingService(encoder=encoder, cache=cache).create_embeddings(["a", "bb", "ccc"])
+    cache.close()
+
+    reopened = EmbeddingCache(path=str(tmp_path))
+    encoder = CountingEncoder()
+    embeddings = EmbeddingService(encoder=encoder, cache=reopened).create_embeddings(["ccc", "a", "bb"])
+    assert encoder.encoded == []
+    np.testing.assert_array_equal(embeddings, expected[[2, 0, 1]])
+    assert reopened.info()["disk_hits"] == 3
+
+def test_new_dimension_invalidates_cache(tmp_path):
+    cache = EmbeddingCache(path=str(tmp_path))
+    cache.put(b"a", np.ones(4))
+    cache.close()
+
+    reopened = EmbeddingCache(path=str(tmp_path))
+    EmbeddingService(encoder=HashingEncoder(dim=8), cache=reopened).create_embeddings(["text"])
+    assert reopened.dim == 8
+    assert reopened.get(b"a") is None
+    assert reopened.info()["disk_entries"] == 1
+    reopened.close()
+
+    again = EmbeddingCache(path=str(tmp_path))
+    EmbeddingService(encoder=HashingEncoder(dim=8), cache=again).create_embeddings(["text"])
+    assert again.info()["disk_hits"] == 1
+
+def test_cache_keys_depend_on_encoder():
+    cache = EmbeddingCache()
+    EmbeddingService(encoder=HashingEncoder(dim=4), cache=cache).create_embeddings(["text"])
+    encoder = CountingEncoder()
+    embeddings = EmbeddingService(encoder=encoder, cache=cache).create_embeddings(["text"])
+
+    assert encoder.encoded == ["text"]
+    np.testing.assert_array_equal(embeddings, [[4, 1, 2, 3]])
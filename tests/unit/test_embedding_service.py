@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 from app.embedding_service import EmbeddingService
 
 def test_create_embedding():
@@ -9,3 +10,44 @@ def test_create_embedding():
     embedding = embedding_service.create_embedding("test text")
     assert isinstance(embedding, list)
     assert len(embedding) == 384
+
+def test_create_embeddings_returns_float32_matrix():
+    """
+    Tests that create_embeddings returns one contiguous float32 row per text.
+    """
+    embedding_service = EmbeddingService()
+    texts = ["a much longer piece of text than the others", "short", "medium length text"]
+    embeddings = embedding_service.create_embeddings(texts, batch_size=2)
+    assert embeddings.shape == (3, 384)
+    assert embeddings.dtype == np.float32
+    assert embeddings.flags["C_CONTIGUOUS"]
+
+    # Length bucketing must not change the row order.
+    for text, row in zip(texts, embeddings):
+        np.testing.assert_allclose(row, embedding_service.create_embedding(text), rtol=1e-6)
+
+def test_create_embeddings_is_deterministic_and_normalized():
+    embedding_service = EmbeddingService()
+    first = embedding_service.create_embeddings(["The sky is blue."])
+    second = EmbeddingService().create_embeddings(["The sky is blue."])
+    np.testing.assert_array_equal(first, second)
+    assert np.linalg.norm(first[0]) == pytest.approx(1.0, rel=1e-5)
+
+def test_create_embeddings_empty_input():
+    assert EmbeddingService().create_embeddings([]).shape == (0, 384)
+
+def test_create_embeddings_uses_custom_encoder():
+    class ConstantEncoder:
+        dim = 4
+
+        def __init__(self):
+            self.batches = []
+
+        def encode(self, texts):
+            self.batches.append(list(texts))
+            return np.ones((len(texts), self.dim), dtype=np.float32)
+
+    encoder = ConstantEncoder()
+    embeddings = EmbeddingService(encoder=encoder).create_embeddings(["bb", "a", "ccc"], batch_size=2)
+    assert embeddings.shape == (3, 4)
+    assert encoder.batches == [["a", "bb"], ["ccc"]]
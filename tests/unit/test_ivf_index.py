@@ -0,0 +1,45 @@
+import pytest
+import numpy as np
+from app.ivf_index import IVFIndex, kmeans, recall_at_k
+from app.local_vector_store import LocalVectorStore, normalize_rows
+
+def clustered(n, dim=32, clusters=16, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim))
+    points = centers[rng.integers(clusters, size=n)] + 0.1 * rng.standard_normal((n, dim))
+    return normalize_rows(points.astype(np.float32))
+
+def test_kmeans_returns_normalized_centroids():
+    centroids = kmeans(clustered(500), 8)
+    assert centroids.shape == (8, 32)
+    np.testing.assert_allclose(np.linalg.norm(centroids, axis=1), 1.0, rtol=1e-5)
+
+def test_recall_at_k():
+    assert recall_at_k([[1, 2], [3, 4]], [[1, 2], [3, 5]]) == pytest.approx(0.75)
+
+def test_ivf_with_all_lists_probed_is_exact():
+    vectors = clustered(2000)
+    queries = clustered(20, seed=1)
+    index = IVFIndex(n_lists=16).build(vectors)
+
+    for (rows, scores), query in zip(index.search(vectors, queries, 5, nprobe=16), queries):
+        expected = np.argsort(-(vectors @ query))[:5]
+        assert list(rows) == list(expected)
+        assert list(scores) == sorted(scores, reverse=True)
+
+def test_local_vector_store_ivf_recall_and_new_points():
+    vectors = clustered(3000)
+    store = LocalVectorStore(dim=32)
+    store.upsert(vectors, [{"text": str(i)} for i in range(len(vectors))])
+    store.build_index(n_lists=32, nprobe=8)
+
+    assert store.measure_recall(clustered(50, seed=2), limit=10) >= 0.9
+
+    # Points added after the build are still returned.
+    new_point = clustered(1, seed=3)
+    store.upsert(new_point, [{"text": "new"}])
+    assert store.search(new_point[0], limit=1)[0].payload["text"] == "new"
+
+def test_search_before_build_raises():
+    with pytest.raises(RuntimeError):
+        IVFIndex().search(clustered(10), clustered(1), 1)
@@ -0,0 +1,93 @@
+import pytest
+import numpy as np
+from app.local_vector_store import LocalVectorStore
+from app.vector_store import content_id
+
+def test_local_vector_store_upsert_and_search():
+    """
+    Tests that the LocalVectorStore can upsert and search for vectors like VectorStore.
+    """
+    vector_store = LocalVectorStore(collection_name="test_collection")
+
+    vector = np.random.rand(384).tolist()
+    payload = {"text": "test document"}
+    vector_store.upsert([vector], [payload])
+
+    search_result = vector_store.search(vector, limit=1)
+
+    assert len(search_result) == 1
+    assert search_result[0].payload["text"] == "test document"
+    assert search_result[0].id == content_id(payload)
+    assert search_result[0].score == pytest.approx(1.0, rel=1e-5)
+
+def test_local_vector_store_matches_exact_cosine_ranking():
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((3000, 384)).astype(np.float32)
+    vector_store = LocalVectorStore(batch_size=500)
+    vector_store.upsert(matrix, [{"text": f"doc {i}"} for i in range(len(matrix))])
+    queries = rng.standard_normal((7, 384)).astype(np.float32)
+
+    results = vector_store.search_many(queries, limit=10)
+
+    normalized = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    for query, hits in zip(queries, results):
+        expected = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:10]
+        assert [hit.payload["text"] for hit in hits] == [f"doc {i}" for i in expected]
+        assert [hit.score for hit in hits] == sorted((hit.score for hit in hits), reverse=True)
+
+def test_local_vector_store_overwrites_existing_ids():
+    vector_store = LocalVectorStore(dim=4)
+    vector_store.upsert([[1, 0, 0, 0]], [{"text": "a"}], ids=["x"])
+    vector_store.upsert([[0, 1, 0, 0], [0, 0, 1, 0]], [{"text": "b"}, {"text": "c"}], ids=["x", "y"])
+
+    assert len(vector_store) == 2
+    hits = vector_store.search([0, 1, 0, 0], limit=5)
+    assert [(hit.id, hit.payload["text"]) for hit in hits][0] == ("x", "b")
+
+def test_local_vector_store_limit_and_empty():
+    vector_store = LocalVectorStore(dim=4)
+    assert vector_store.search([1, 0, 0, 0]) == []
+    vector_store.upsert([[1, 0, 0, 0], [0, 1, 0, 0]], [{"text": "a"}, {"text": "b"}])
+    assert len(vector_store.search([1, 0, 0, 0], limit=10)) == 2
+
+def test_local_vector_store_rejects_wrong_dimension():
+    vector_store = LocalVectorStore(dim=4)
+    with pytest.raises(ValueError):
+        vector_store.upsert([[1, 0, 0]], [{"text": "a"}])
+
+@pytest.mark.parametrize("indexed_fields", [(), ("tenant", "year")])
+def test_local_vector_store_filtered_search(indexed_fields):
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((300, 384)).astype(np.float32)
+    payloads = [{"text": f"doc {i}", "tenant": f"t{i % 5}", "year": 2000 + i % 20} for i in range(300)]
+    vector_store = LocalVectorStore(indexed_fields=indexed_fields)
+    vector_store.upsert(matrix, payloads, ids=range(300))
+    filters = {"tenant": "t3", "year": {"gte": 2010}}
+
+    results = vector_store.search_many(matrix[:4], limit=5, filters=filters)
+
+    allowed = np.array([i for i, p in enumerate(payloads) if p["tenant"] == "t3" and p["year"] >= 2010])
+    for query, hits in zip(matrix[:4], results):
+        scores = vector_store.vectors[allowed] @ (query / np.linalg.norm(query))
+        assert [h.id for h in hits] == allowed[np.argsort(-scores)[:5]].tolist()
+
+def test_local_vector_store_filter_follows_overwrites():
+    vector_store = LocalVectorStore(dim=2, indexed_fields=("tenant",))
+    vector_store.upsert([[1.0, 0.0]], [{"text": "a", "tenant": "x"}], ids=["a"])
+    vector_store.upsert([[1.0, 0.0]], [{"text": "a", "tenant": "y"}], ids=["a"])
+
+    assert vector_store.search([1.0, 0.0], filters={"tenant": "x"}) == []
+    assert [h.id for h in vector_store.search([1.0, 0.0], filters={"tenant": "y"})] == ["a"]
+
+def test_local_vector_store_rejected_batch_leaves_store_unchanged():
+    vector_store = LocalVectorStore(dim=2, indexed_fields=("tenant",))
+    vector_store.upsert([[1.0, 0.0]], [{"text": "a", "tenant": "x"}], ids=["a"])
+
+    with pytest.raises(ValueError):
+        vector_store.upsert([[0.0, 1.0], [0.0, 1.0]], [{"text": "a2", "tenant": "y"}, {"text": "b", "tenant": {"k": 1}}],
+                            ids=["a", "b"])
+
+    assert len(vector_store) == 1
+    assert [(h.id, h.payload["text"]) for h in vector_store.search([1.0, 0.0])] == [("a", "a")]
+    assert [h.id for h in vector_store.search([1.0, 0.0], filters={"tenant": "x"})] == ["a"]
+    assert vector_store.search([1.0, 0.0], filters={"tenant": "y"}) == []
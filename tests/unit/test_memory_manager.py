@@ -0,0 +1,72 @@
+import json
+import pytest
+from src.agents.memory_manager import MemoryManager
+
+def test_last_n_turns_per_session():
+    memory = MemoryManager(max_turns=3)
+    for i in range(5):
+        memory.store_interaction(f"q{i}", f"r{i}", session_id="a")
+    memory.store_interaction("other", "reply", session_id="b")
+
+    assert [t["query"] for t in memory.get_history("a")] == ["q2", "q3", "q4"]
+    assert [t["query"] for t in memory.get_history("a", 2)] == ["q3", "q4"]
+    assert [t["query"] for t in memory.get_history("b")] == ["other"]
+    assert memory.get_history("missing") == []
+
+def test_least_recently_active_session_is_evicted():
+    memory = MemoryManager(max_sessions=2)
+    memory.store_interaction("q", "r", session_id="a")
+    memory.store_interaction("q", "r", session_id="b")
+    memory.store_interaction("q", "r", session_id="a")
+    memory.store_interaction("q", "r", session_id="c")
+
+    assert memory.sessions() == ["a", "c"]
+
+def test_log_is_replayed(tmp_path):
+    path = str(tmp_path / "memory.jsonl")
+    memory = MemoryManager(path=path)
+    memory.store_interaction("What color is the sky?", "Blue.", session_id="abc")
+    memory.close()
+
+    with open(path, "a") as f:
+        f.write('{"session_id": "abc", "que')  # torn write
+
+    reopened = MemoryManager(path=path)
+    assert [(t["query"], t["response"]) for t in reopened.get_history("abc")] == [("What color is the sky?", "Blue.")]
+
+def test_torn_tail_is_truncated_before_appending(tmp_path):
+    path = str(tmp_path / "memory.jsonl")
+    memory = MemoryManager(path=path)
+    memory.store_interaction("q1", "r1", session_id="abc")
+    memory.close()
+    with open(path, "a") as f:
+        f.write('{"session_id": "abc", "que')  # torn write
+
+    reopened = MemoryManager(path=path)
+    reopened.store_interaction("q2", "r2", session_id="abc")
+    reopened.close()
+
+    with open(path) as f:
+        assert [json.loads(line)["query"] for line in f] == ["q1", "q2"]
+    assert [t["query"] for t in MemoryManager(path=path).get_history("abc")] == ["q1", "q2"]
+
+def test_log_is_compacted(tmp_path):
+    path = str(tmp_path / "memory.jsonl")
+    memory = MemoryManager(path=path, max_turns=2, compact_factor=2.0, compact_min_lines=10)
+    for i in range(25):
+        memory.store_interaction(f"q{i}", f"r{i}", session_id=f"s{i % 2}")
+
+    with open(path) as f:
+        lines = [json.loads(line) for line in f]
+    assert len(lines) < 10
+    memory.compact()
+    with open(path) as f:
+        assert [json.loads(line)["query"] for line in f] == ["q21", "q22", "q23", "q24"]
+
+    memory.close()
+    reopened = MemoryManager(path=path, max_turns=2)
+    assert [t["query"] for t in reopened.get_history("s0")] == ["q22", "q24"]
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        MemoryManager(max_turns=0)
@@ -0,0 +1,48 @@
+import pytest
+from qdrant_client import models
+from app.payload_filter import PayloadIndex, matches, qdrant_filter, qdrant_payload_schema
+
+PAYLOADS = [{"tenant": f"t{i % 3}", "year": 2000 + i, "tags": ["even"] if i % 2 == 0 else ["odd"]}
+            for i in range(12)]
+SPEC = {"tenant": {"in": ["t0", "t1"]}, "year": {"gte": 2002, "lt": 2010}, "tags": "even"}
+
+def test_matches():
+    assert matches({"tenant": "t0", "year": 2004, "tags": ["even"]}, SPEC)
+    assert not matches({"tenant": "t2", "year": 2004, "tags": ["even"]}, SPEC)
+    assert not matches({"tenant": "t0", "year": 2010, "tags": ["even"]}, SPEC)
+    assert not matches({"tenant": "t0", "year": 2004}, SPEC)
+    assert not matches({"tenant": "t0", "year": "soon", "tags": ["even"]}, SPEC)
+
+def test_unknown_operator_raises():
+    with pytest.raises(ValueError):
+        matches({}, {"year": {"between": [1, 2]}})
+
+def test_qdrant_filter():
+    query_filter = qdrant_filter(SPEC)
+    tenant, year, tags = query_filter.must
+    assert tenant.match == models.MatchAny(any=["t0", "t1"])
+    assert year.range == models.Range(gte=2002, lt=2010)
+    assert tags.match == models.MatchValue(value="even")
+    assert qdrant_filter(None) is None
+    assert qdrant_filter(query_filter) is query_filter
+
+def test_qdrant_payload_schema():
+    assert qdrant_payload_schema("keyword") == models.PayloadSchemaType.KEYWORD
+    with pytest.raises(ValueError):
+        qdrant_payload_schema("text_blob")
+
+@pytest.mark.parametrize("fields", [(), ("tenant",), ("tenant", "year", "tags")])
+def test_index_select_matches_predicate(fields):
+    index = PayloadIndex(fields)
+    for row, payload in enumerate(PAYLOADS):
+        index.add(row, payload)
+    expected = [row for row, payload in enumerate(PAYLOADS) if matches(payload, SPEC)]
+    assert index.select(SPEC, len(PAYLOADS), PAYLOADS.__getitem__).tolist() == expected == [4, 6]
+
+def test_index_replaces_previous_payload_and_round_trips():
+    index = PayloadIndex(["tenant"])
+    index.add(0, {"tenant": "a"})
+    index.add(0, {"tenant": "b"}, previous={"tenant": "a"})
+    assert index.select({"tenant": "a"}, 1, None).tolist() == []
+    restored = PayloadIndex.from_state(index.state())
+    assert restored.select({"tenant": "b"}, 1, None).tolist() == [0]
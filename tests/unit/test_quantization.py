@@ -0,0 +1,70 @@
+import pytest
+import numpy as np
+from qdrant_client import models
+from app.local_vector_store import LocalVectorStore, normalize_rows
+from app.quantization import ProductQuantizer, ScalarQuantizer, make_quantizer, qdrant_quantization_config
+from app.segment import Segment
+from app.vector_store import VectorStore
+
+def random_vectors(n, dim=32, seed=0):
+    return normalize_rows(np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32))
+
+def test_scalar_quantizer_round_trip_and_scores():
+    vectors = random_vectors(1000)
+    quantizer = ScalarQuantizer().fit(vectors)
+    codes = quantizer.encode(vectors)
+    assert codes.dtype == np.uint8 and codes.nbytes == vectors.nbytes // 4
+    assert np.abs(quantizer.decode(codes) - vectors).max() < 0.01
+
+    queries = random_vectors(3, seed=1)
+    np.testing.assert_allclose(quantizer.scores(codes, queries), queries @ quantizer.decode(codes).T, atol=1e-4)
+
+def test_product_quantizer_compression_and_scores():
+    vectors = random_vectors(2000)
+    quantizer = ProductQuantizer(iterations=5).fit(vectors)
+    codes = quantizer.encode(vectors)
+    assert codes.shape == (2000, 8) and codes.nbytes == vectors.nbytes // 16
+
+    queries = random_vectors(3, seed=1)
+    np.testing.assert_allclose(quantizer.scores(codes, queries), queries @ quantizer.decode(codes).T, atol=1e-4)
+    # Reconstruction is much closer than a random vector would be.
+    assert np.mean(np.sum((quantizer.decode(codes) - vectors) ** 2, axis=1)) < 0.5
+
+def test_product_quantizer_rejects_indivisible_dimension():
+    with pytest.raises(ValueError):
+        ProductQuantizer(m=5).fit(random_vectors(10))
+
+@pytest.mark.parametrize("kind", ["int8", "pq"])
+def test_quantized_segment_rescoring_keeps_recall(tmp_path, kind):
+    vectors = random_vectors(3000)
+    store = LocalVectorStore(dim=32)
+    store.upsert(vectors, [{"text": str(i)} for i in range(len(vectors))])
+    path = str(tmp_path / kind)
+    store.save(path, quantization=kind)
+
+    segment = Segment(path, block_size=500, oversample=10)
+    queries = random_vectors(20, seed=1)
+    exact = segment.search_many(queries, limit=5, exact=True)
+    approximate = segment.search_many(queries, limit=5)
+    recall = np.mean([len({p.id for p in a} & {p.id for p in e}) / 5 for a, e in zip(approximate, exact)])
+    assert recall >= 0.9
+    # Re-scored hits carry exact scores.
+    assert approximate[0][0].score == pytest.approx(float(vectors[store._rows[approximate[0][0].id]] @ queries[0]), rel=1e-5)
+
+def test_unknown_quantization():
+    with pytest.raises(ValueError):
+        make_quantizer("int4")
+    with pytest.raises(ValueError):
+        qdrant_quantization_config("int4")
+
+def test_qdrant_quantization_config():
+    assert qdrant_quantization_config(None) is None
+    assert isinstance(qdrant_quantization_config("int8"), models.ScalarQuantization)
+    assert isinstance(qdrant_quantization_config("pq"), models.ProductQuantization)
+
+def test_vector_store_with_quantization_searches():
+    vector_store = VectorStore(collection_name="test_collection", quantization="int8")
+    vector = np.random.rand(384)
+    vector_store.upsert([vector], [{"text": "quantized"}])
+    assert vector_store.search(vector, limit=1)[0].payload["text"] == "quantized"
+    assert vector_store.search_many([vector], limit=1)[0][0].payload["text"] == "quantized"
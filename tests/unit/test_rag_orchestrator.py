@@ -0,0 +1,123 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from src.api.answer_cache import AnswerCache
+from src.api.rag_orchestrator import RAGOrchestrator
+
+DOCUMENTS = [
+    "The sky is blue.",
+    "The grass is green.",
+    "The sun is bright.",
+]
+
+def test_aquery_returns_relevant_sources():
+    orchestrator = RAGOrchestrator()
+    orchestrator.add_documents(DOCUMENTS)
+
+    result = asyncio.run(orchestrator.aquery("What color is the sky?", "session-1"))
+
+    assert result["sources"][0]["content"] == "The sky is blue."
+    assert result["sources"][0]["source"] == "Document 1"
+    assert "What color is the sky?" in result["response"]
+    assert 0.0 < result["confidence"] <= 1.0
+def test_query_on_empty_knowledge_base():
+    result = RAGOrchestrator().query("Anything?")
+    assert result["sources"] == []
+    assert result["confidence"] == 0.0
+
+def test_aquery_uses_async_llm(mock_async_groq):
+    orchestrator = RAGOrchestrator(groq_api_key="fake-api-key")
+    asyncio.run(orchestrator.aadd_documents(DOCUMENTS))
+
+    result = asyncio.run(orchestrator.aquery("What color is the sky?"))
+
+    assert result["response"] == "The sky is indeed blue."
+    args, kwargs = mock_async_groq.chat.completions.create.call_args
+    assert "The sky is blue." in kwargs['messages'][0]['content']
+
+def test_concurrent_aqueries():
+    orchestrator = RAGOrchestrator()
+    orchestrator.add_documents(DOCUMENTS)
+
+    async def run_all():
+        questions = [f"Is the grass green? ({i})" for i in range(50)]
+        return await asyncio.gather(*(orchestrator.aquery(q) for q in questions))
+
+    results = asyncio.run(run_all())
+    assert len(results) == 50
+    assert all(r["sources"][0]["content"] == "The grass is green." for r in results)
+    # Concurrent questions are embedded and searched in a few batches, not one by one.
+    batching = orchestrator.stats()["batching"]
+    assert batching["embedding"]["items"] == batching["search"]["items"] == 50
+    assert batching["embedding"]["batches"] < 50
+    assert batching["search"]["batches"] < 50
+def test_astream_query_sends_sources_before_tokens():
+    orchestrator = RAGOrchestrator()
+    orchestrator.add_documents(DOCUMENTS)
+    async def collect():
+        return [event async for event in orchestrator.astream_query("What color is the sky?")]
+
+    events = asyncio.run(collect())
+
+    names = [name for name, _ in events]
+    assert names[0] == "sources" and names[-1] == "done"
+    assert set(names[1:-1]) == {"token"}
+    assert events[0][1]["sources"][0]["content"] == "The sky is blue."
+    text = "".join(data["text"] for name, data in events if name == "token")
+    assert text == orchestrator.query("What color is the sky?")["response"]
+    assert events[-1][1]["time_to_first_token_ms"] <= events[-1][1]["total_ms"]
+    assert orchestrator.stats()["time_to_first_token_ms"]["count"] == 1
+def test_answer_cache_skips_generation(mock_async_groq):
+    orchestrator = RAGOrchestrator(groq_api_key="fake-api-key", answer_cache=AnswerCache(similarity_threshold=0.9))
+    orchestrator.add_documents(DOCUMENTS)
+    first = orchestrator.query("What color is the sky?")
+    again = orchestrator.query("  what color is the SKY?")
+
+    assert again == first
+    assert mock_async_groq.chat.completions.create.await_count == 1
+    info = orchestrator.stats()["answer_cache"]
+    assert info["hits"] == 1 and info["hit_rate"] == 0.5
+    assert info["saved_seconds"] > 0
+
+    orchestrator.add_documents(["The sea is blue."])
+    orchestrator.query("What color is the sky?")
+    assert mock_async_groq.chat.completions.create.await_count == 2
+
+def test_hybrid_retrieval_finds_exact_terms():
+    documents = [f"Routine log line number {i} from the scheduler." for i in range(50)]
+    documents.append("Incident: the scheduler crashed with code ZX-9041.")
+    orchestrator = RAGOrchestrator(limit=3)
+    orchestrator.add_documents(documents)
+
+    result = orchestrator.query("ZX-9041")
+
+    assert result["sources"][0]["content"] == documents[-1]
+    dense_only = RAGOrchestrator(limit=3, hybrid=False)
+    dense_only.add_documents(documents)
+    assert result["confidence"] == pytest.approx(dense_only.query("ZX-9041")["confidence"])
+def test_add_documents_skips_indexed_documents():
+    orchestrator = RAGOrchestrator()
+    orchestrator.add_documents(DOCUMENTS)
+    orchestrator.add_documents(DOCUMENTS + ["The sea is blue.", "The sea is blue."])
+
+    assert orchestrator.documents == DOCUMENTS + ["The sea is blue."]
+    assert len(orchestrator.vector_store) == len(DOCUMENTS) + 1
+def test_concurrent_add_documents_are_serialized():
+    orchestrator = RAGOrchestrator()
+    batches = [[f"Fact {i}-{j}." for j in range(5)] for i in range(8)] + [DOCUMENTS, DOCUMENTS]
+    async def add_all():
+        await asyncio.gather(*(orchestrator.aadd_documents(batch) for batch in batches))
+
+    asyncio.run(add_all())
+
+    store = orchestrator.vector_store
+    assert len(store) == len(orchestrator.documents) == 43
+    sources = [store.search(vector, limit=1)[0].payload["source"] for vector in store.vectors]
+    assert sorted(sources) == sorted(f"Document {n}" for n in range(1, 44))
+def test_query_from_worker_threads():
+    orchestrator = RAGOrchestrator(max_wait_ms=20)
+    orchestrator.add_documents(DOCUMENTS)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(orchestrator.query, f"What color is the sky? {i}") for i in range(16)]
+        results = [future.result(timeout=10) for future in futures]
+    assert all(result["sources"][0]["content"] == "The sky is blue." for result in results)
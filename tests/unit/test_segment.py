@@ -0,0 +1,80 @@
+import json
+import os
+import pytest
+import numpy as np
+from app.local_vector_store import LocalVectorStore
+from app.segment import Segment, write_segment
+
+def test_segment_round_trip_matches_local_store(tmp_path):
+    """
+    Tests that a saved segment returns the same hits as the store it was saved from.
+    """
+    rng = np.random.default_rng(0)
+    store = LocalVectorStore(dim=16)
+    store.upsert(rng.standard_normal((500, 16)), [{"text": f"doc {i}", "n": i} for i in range(500)])
+    store.upsert(rng.standard_normal((1, 16)), [{"text": "int id"}], ids=[7])
+    path = str(tmp_path / "segment")
+    store.save(path)
+
+    segment = Segment(path, block_size=64)
+    queries = rng.standard_normal((5, 16))
+    assert len(segment) == 501
+    for expected, hits in zip(store.search_many(queries, limit=8), segment.search_many(queries, limit=8)):
+        assert [(h.id, h.payload) for h in hits] == [(h.id, h.payload) for h in expected]
+        np.testing.assert_allclose([h.score for h in hits], [h.score for h in expected], rtol=1e-5)
+    assert segment.id(500) == 7
+    assert isinstance(segment.vectors, np.memmap)
+
+def test_write_segment_replaces_existing(tmp_path):
+    path = str(tmp_path / "segment")
+    write_segment(path, [[1.0, 0.0]], ["a"], [{"text": "old"}])
+    old = Segment(path)
+    write_segment(path, [[0.0, 1.0], [1.0, 0.0]], ["b", "c"], [{"text": "new"}, {"text": "newer"}])
+
+    new = Segment(path)
+    assert len(new) == 2
+    assert new.search([0.0, 1.0], limit=1)[0].payload["text"] == "new"
+    # Readers of the replaced segment keep their mapping.
+    assert old.search([1.0, 0.0], limit=1)[0].payload["text"] == "old"
+    # `path` is swapped atomically to the new version and the old one is removed.
+    assert os.path.islink(path)
+    assert sorted(os.listdir(tmp_path)) == sorted(["segment", os.readlink(path)])
+
+def test_write_segment_replaces_unversioned_segment(tmp_path):
+    path = tmp_path / "segment"
+    path.mkdir()
+    with open(path / "meta.json", "w") as f:
+        json.dump({"version": 1, "count": 0, "dim": 2}, f)
+    write_segment(str(path), [[1.0, 0.0]], ["a"], [{"text": "new"}])
+
+    assert Segment(str(path)).search([1.0, 0.0])[0].id == "a"
+    assert len(os.listdir(tmp_path)) == 2
+
+def test_empty_segment(tmp_path):
+    path = str(tmp_path / "segment")
+    LocalVectorStore(dim=4).save(path)
+    assert Segment(path).search([1, 0, 0, 0]) == []
+
+def test_segment_rejects_unknown_version(tmp_path):
+    path = str(tmp_path / "segment")
+    write_segment(path, [[1.0, 0.0]], ["a"], [{}])
+    with open(tmp_path / "segment" / "meta.json", "w") as f:
+        json.dump({"version": 99, "count": 1, "dim": 2}, f)
+    with pytest.raises(ValueError):
+        Segment(path)
+
+@pytest.mark.parametrize("exact", [False, True])
+def test_segment_filtered_search_matches_local_store(tmp_path, exact):
+    rng = np.random.default_rng(0)
+    store = LocalVectorStore(dim=16, indexed_fields=("tenant",))
+    store.upsert(rng.standard_normal((400, 16)), [{"text": f"doc {i}", "tenant": f"t{i % 4}", "n": i}
+                                                  for i in range(400)])
+    path = str(tmp_path / "segment")
+    store.save(path, quantization="int8")
+    segment = Segment(path, block_size=64)
+    queries = rng.standard_normal((3, 16))
+
+    for filters in ({"tenant": "t1"}, {"tenant": "t2", "n": {"lt": 100}}):
+        expected = store.search_many(queries, limit=5, filters=filters)
+        hits = segment.search_many(queries, limit=5, filters=filters, exact=exact)
+        assert [[h.id for h in q] for q in hits] == [[h.id for h in q] for q in expected]
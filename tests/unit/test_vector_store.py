@@ -1,5 +1,5 @@
 import pytest
-from app.vector_store import VectorStore
+from app.vector_store import VectorStore, content_id
 import numpy as np
 
 def test_vector_store_upsert_and_search():
@@ -18,3 +18,65 @@ def test_vector_store_upsert_and_search():
 
     assert len(search_result) == 1
     assert search_result[0].payload["text"] == "test document"
+
+def test_vector_store_upsert_calls_do_not_overwrite():
+    """
+    Tests that separate upsert calls add points instead of overwriting ids 0..n.
+    """
+    vector_store = VectorStore(collection_name="test_collection")
+    vector_store.upsert([np.random.rand(384)], [{"text": "first"}])
+    vector_store.upsert([np.random.rand(384)], [{"text": "second"}])
+
+    assert vector_store.client.count(vector_store.collection_name).count == 2
+
+def test_vector_store_upsert_is_idempotent_for_same_content():
+    vector_store = VectorStore(collection_name="test_collection")
+    first_ids = vector_store.upsert([np.random.rand(384)], [{"text": "same"}])
+    second_ids = vector_store.upsert([np.random.rand(384)], [{"text": "same"}])
+
+    assert first_ids == second_ids == [content_id({"text": "same"})]
+    assert vector_store.client.count(vector_store.collection_name).count == 1
+
+def test_content_id_includes_source():
+    assert content_id({"text": "same", "source": "a.md"}) == content_id({"text": "same", "source": "a.md", "n": 1})
+    assert content_id({"text": "same", "source": "a.md"}) != content_id({"text": "same", "source": "b.md"})
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_vector_store_upsert_rejects_extra_payloads_and_ids(lazy):
+    vector_store = VectorStore(collection_name="test_collection", batch_size=2)
+    vectors, payloads, ids = np.random.rand(3, 384), [{"text": f"doc {i}"} for i in range(4)], list(range(4))
+    wrap = iter if lazy else list
+    with pytest.raises(ValueError):
+        vector_store.upsert(wrap(vectors), wrap(payloads))
+    with pytest.raises(ValueError):
+        vector_store.upsert(wrap(vectors), wrap(payloads[:3]), ids=wrap(ids))
+
+def test_vector_store_upsert_matrix_and_iterator_in_batches():
+    vector_store = VectorStore(collection_name="test_collection", batch_size=3)
+    matrix = np.random.rand(10, 384).astype(np.float32)
+    payloads = [{"text": f"doc {i}"} for i in range(10)]
+
+    ids = vector_store.upsert(matrix, payloads)
+    assert len(ids) == 10
+    more = vector_store.upsert(iter(np.random.rand(5, 384)), iter({"text": f"more {i}"} for i in range(5)))
+    assert len(more) == 5
+    assert vector_store.client.count(vector_store.collection_name).count == 15
+
+    search_result = vector_store.search(matrix[4], limit=1)
+    assert search_result[0].payload["text"] == "doc 4"
+
+def test_vector_store_upsert_length_mismatch():
+    vector_store = VectorStore(collection_name="test_collection")
+    with pytest.raises(ValueError):
+        vector_store.upsert(np.random.rand(2, 384), [{"text": "only one"}])
+
+def test_vector_store_search_many_aligned_with_queries():
+    vector_store = VectorStore(collection_name="test_collection", search_batch_size=4)
+    matrix = np.random.rand(10, 384).astype(np.float32)
+    vector_store.upsert(matrix, [{"text": f"doc {i}"} for i in range(10)])
+
+    results = vector_store.search_many(matrix[::-1], limit=2)
+
+    assert len(results) == 10
+    assert [hits[0].payload["text"] for hits in results] == [f"doc {i}" for i in reversed(range(10))]
+    assert all(len(hits) == 2 for hits in results)